@@ -13,10 +13,25 @@ import re
 import urllib.parse
 import calendar
 import json
+import copy
 import os
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor
+import io
 import gzip
 import base64
+import bisect
+import threading
+import time
+import hashlib
+import sqlite3
+import mmap
+import struct
+import codecs
+import functools
+import tempfile
 
 # ==================== CONFIG ====================
 st.set_page_config(
@@ -404,6 +419,18 @@ for group in RUGBY_POSITIONS.values():
 
 ALL_LINES = list(RUGBY_POSITIONS['Avants'].keys()) + list(RUGBY_POSITIONS['Trois-quarts'].keys())
 
+# Table plate poste -> (groupe, ligne, code groupe, code ligne), construite une seule fois
+ALL_GROUPS = list(RUGBY_POSITIONS.keys())
+GROUP_CODES = {g: i for i, g in enumerate(ALL_GROUPS)}
+LINE_CODES = {l: i for i, l in enumerate(ALL_LINES)}
+POSITION_TABLE = {}
+for group_name, lines in RUGBY_POSITIONS.items():
+    for line_name, positions in lines.items():
+        for position in positions:
+            POSITION_TABLE[position] = (group_name, line_name, GROUP_CODES[group_name], LINE_CODES[line_name])
+# Poste inconnu : rattaché à la 1ère ligne des Avants
+DEFAULT_POSITION_INFO = ('Avants', '1ère ligne', GROUP_CODES['Avants'], LINE_CODES['1ère ligne'])
+
 INJURY_ZONES = {
     'Ischio-jambiers': {'icon': '🦵', 1: 14, 2: 28, 3: 56},
     'Quadriceps': {'icon': '🦵', 1: 10, 2: 21, 3: 42},
@@ -461,21 +488,840 @@ def init_session():
 init_session()
 
 
+# ==================== STORE COLONNAIRE ====================
+# Les 5 métriques + le poids, dans l'ordre des colonnes des tableaux du store
+STORE_KEYS = [m['key'] for m in METRICS] + ['weight']
+WEIGHT_IDX = len(METRICS)
+
+
+class WellnessStore:
+    """
+    Vue colonnaire de st.session_state.data.
+
+    values[date, joueur, clé] contient les 5 métriques + le poids (NaN si absent),
+    present[...] est le masque explicite des valeurs renseignées et has_entry[date, joueur]
+    indique qu'une entrée existe (même sans métrique).
+    """
+
+    def __init__(self, data):
+        self.source = data
+        self.version = 0
+        self.rebuild()
+
+    def rebuild(self):
+        """Reconstruit tous les tableaux depuis le dict date -> liste d'entrées"""
+        self.dates = sorted(self.source.keys())
+        self.date_index = {d: i for i, d in enumerate(self.dates)}
+        self.players = []
+        self.player_index = {}
+        for entries in self.source.values():
+            for e in entries:
+                self._register_name(e.get('name'))
+
+        shape = (len(self.dates), len(self.players))
+        self.values = np.full(shape + (len(STORE_KEYS),), np.nan)
+        self.present = np.zeros(shape + (len(STORE_KEYS),), dtype=bool)
+        self.has_entry = np.zeros(shape, dtype=bool)
+        for d_idx, date in enumerate(self.dates):
+            self._fill_day(d_idx, self.source[date])
+        self._touch()
+
+    @classmethod
+    def from_snapshot(cls, snapshot, data):
+        """
+        Store équivalent à WellnessStore(data), rempli directement depuis les colonnes
+        d'un instantané binaire (`data` doit en être issu), sans parcourir les entrées.
+        """
+        store = cls.__new__(cls)
+        store.source = data
+        store.version = 0
+        store.dates = sorted(data.keys())
+        store.date_index = {d: i for i, d in enumerate(store.dates)}
+        # Ordre d'apparition des noms dans data, comme _register_name
+        store.players = [name for name in snapshot.names if name is not None]
+        store.player_index = {name: i for i, name in enumerate(store.players)}
+        
+        shape = (len(store.dates), len(store.players))
+        store.values = np.full(shape + (len(STORE_KEYS),), np.nan)
+        store.present = np.zeros(shape + (len(STORE_KEYS),), dtype=bool)
+        store.has_entry = np.zeros(shape, dtype=bool)
+        
+        date_pos = np.array([store.date_index[d] for d in snapshot.dates], dtype=np.int64)
+        name_pos = np.array([store.player_index.get(name, -1) if name is not None else -1 for name in snapshot.names] + [-1], dtype=np.int64)
+        d_idx = date_pos[snapshot.array('date_idx')] if snapshot.n else np.zeros(0, dtype=np.int64)
+        p_idx = name_pos[snapshot.array('name_idx')] if snapshot.n else np.zeros(0, dtype=np.int64)
+        named = p_idx >= 0
+        store.has_entry[d_idx[named], p_idx[named]] = True
+        for k, key in enumerate(STORE_KEYS):
+            col = snapshot.column(key)
+            mask = named & ~np.isnan(col)
+            store.values[d_idx[mask], p_idx[mask], k] = col[mask]
+            store.present[d_idx[mask], p_idx[mask], k] = True
+        # Valeurs hors colonnes (entiers, chaînes numériques) : même conversion que _fill_day
+        for i, extra, _ in snapshot.extras():
+            if p_idx[i] < 0:
+                continue
+            for k, key in enumerate(STORE_KEYS):
+                if extra.get(key) is None:
+                    continue
+                try:
+                    store.values[d_idx[i], p_idx[i], k] = float(extra[key])
+                    store.present[d_idx[i], p_idx[i], k] = True
+                except (TypeError, ValueError):
+                    pass
+        store._touch()
+        return store
+
+    def set_day(self, date_key, entries):
+        """Met à jour (ou insère) une date après un import ou une modification"""
+        new_names = [e.get('name') for e in entries if e.get('name') is not None and e.get('name') not in self.player_index]
+        if new_names:
+            for name in new_names:
+                self._register_name(name)
+            extra = len(self.players) - self.values.shape[1]
+            n_dates = len(self.dates)
+            self.values = np.concatenate([self.values, np.full((n_dates, extra, len(STORE_KEYS)), np.nan)], axis=1)
+            self.present = np.concatenate([self.present, np.zeros((n_dates, extra, len(STORE_KEYS)), dtype=bool)], axis=1)
+            self.has_entry = np.concatenate([self.has_entry, np.zeros((n_dates, extra), dtype=bool)], axis=1)
+
+        if date_key not in self.date_index:
+            pos = bisect.bisect_left(self.dates, date_key)
+            self.dates.insert(pos, date_key)
+            self.date_index = {d: i for i, d in enumerate(self.dates)}
+            self.values = np.insert(self.values, pos, np.nan, axis=0)
+            self.present = np.insert(self.present, pos, False, axis=0)
+            self.has_entry = np.insert(self.has_entry, pos, False, axis=0)
+
+        self._fill_day(self.date_index[date_key], entries)
+        self._touch()
+
+    def _register_name(self, name):
+        if name is not None and name not in self.player_index:
+            self.player_index[name] = len(self.players)
+            self.players.append(name)
+
+    def _fill_day(self, d_idx, entries):
+        self.values[d_idx] = np.nan
+        self.present[d_idx] = False
+        self.has_entry[d_idx] = False
+        for e in entries:
+            p_idx = self.player_index.get(e.get('name'))
+            if p_idx is None:
+                continue
+            self.has_entry[d_idx, p_idx] = True
+            for k, key in enumerate(STORE_KEYS):
+                val = e.get(key)
+                if val is None:
+                    continue
+                try:
+                    self.values[d_idx, p_idx, k] = float(val)
+                    self.present[d_idx, p_idx, k] = True
+                except (TypeError, ValueError):
+                    pass
+
+    def _touch(self):
+        self.version += 1
+        self._cache = {}
+
+    def averages(self):
+        """Moyenne des 5 métriques par (date, joueur), NaN si aucune métrique"""
+        if 'averages' not in self._cache:
+            counts = self.present[:, :, :WEIGHT_IDX].sum(axis=2)
+            sums = np.where(self.present[:, :, :WEIGHT_IDX], self.values[:, :, :WEIGHT_IDX], 0.0).sum(axis=2)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                self._cache['averages'] = np.where(counts > 0, sums / counts, np.nan)
+        return self._cache['averages']
+
+    def matrix(self, metric):
+        """Matrice (date, joueur) d'une métrique, 'global' pour la moyenne joueur"""
+        if metric == 'global':
+            return self.averages()
+        return self.values[:, :, STORE_KEYS.index(metric)]
+
+    def player_columns(self, registry):
+        """
+        Attributs joueur par colonne, mis en cache par version du registre :
+        (enregistré, code groupe, code ligne, poste). Les codes valent -1 hors registre.
+        """
+        cached = self._cache.get('columns')
+        if cached is None or cached[0] is not registry or cached[1] != registry.version:
+            n = len(self.players)
+            registered = np.zeros(n, dtype=bool)
+            group_codes = np.full(n, -1, dtype=np.int8)
+            line_codes = np.full(n, -1, dtype=np.int8)
+            positions = np.empty(n, dtype=object)
+            for j, name in enumerate(self.players):
+                p = registry.by_name.get(name)
+                if p:
+                    registered[j] = True
+                    group_codes[j], line_codes[j] = registry.codes[name]
+                    positions[j] = p['position']
+            cached = (registry, registry.version, registered, group_codes, line_codes, positions)
+            self._cache['columns'] = cached
+        return cached[2:]
+
+    def player_mask(self, registry, group=None, line=None, position=None):
+        """Colonnes correspondant à des joueurs enregistrés, avec filtres optionnels"""
+        registered, group_codes, line_codes, positions = self.player_columns(registry)
+        mask = registered.copy()
+        if group:
+            mask &= group_codes == GROUP_CODES.get(group, -2)
+        if line:
+            mask &= line_codes == LINE_CODES.get(line, -2)
+        if position:
+            mask &= positions == position
+        return mask
+
+    def daily_means(self, metric, cols, days=None):
+        """
+        Moyenne par date d'une métrique sur les colonnes `cols`.
+        Retourne (dates, moyennes, effectifs) sur les `days` dernières dates.
+        """
+        start = max(0, len(self.dates) - days) if days else 0
+        block = self.matrix(metric)[start:, cols]
+        valid = ~np.isnan(block)
+        counts = valid.sum(axis=1)
+        sums = np.where(valid, block, 0.0).sum(axis=1)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(counts > 0, sums / counts, np.nan)
+        return self.dates[start:], means, counts
+
+
+def get_store():
+    """Retourne le store colonnaire, reconstruit si st.session_state.data a été remplacé"""
+    store = st.session_state.get('wellness_store')
+    if store is None or store.source is not st.session_state.data:
+        store = get_shared_dataset().store_for(st.session_state.data) or WellnessStore(st.session_state.data)
+        st.session_state.wellness_store = store
+    return store
+
+
+def _nan_mean(values):
+    """Moyenne des valeurs non-NaN, None si aucune"""
+    values = values[~np.isnan(values)]
+    return float(values.mean()) if values.size else None
+
+
+# ==================== REGISTRE JOUEURS ====================
+class PlayerRegistry:
+    """
+    Index des joueurs de st.session_state.players par nom et par id,
+    avec groupe et ligne précalculés pour chaque joueur.
+    """
+
+    def __init__(self, players):
+        self.source = players
+        self.version = 0
+        self.rebuild()
+
+    def rebuild(self):
+        """Reconstruit les index (ajout, modification de poste, suppression)"""
+        self.by_name = {}
+        self.by_id = {}
+        self.groups = {}
+        self.lines = {}
+        self.codes = {}
+        for p in self.source:
+            self._index(p)
+        self.version += 1
+
+    def add(self, player):
+        """Ajoute un joueur à la liste et aux index"""
+        self.source.append(player)
+        self._index(player)
+        self.version += 1
+
+    def _index(self, p):
+        # En cas de doublon, le premier joueur de la liste gagne (comme l'ancien next(...))
+        if p['name'] not in self.by_name:
+            group, line, group_code, line_code = get_position_info(p['position'])
+            self.by_name[p['name']] = p
+            self.groups[p['name']] = group
+            self.lines[p['name']] = line
+            self.codes[p['name']] = (group_code, line_code)
+        self.by_id.setdefault(p['id'], p)
+
+
+def get_registry():
+    """Retourne le registre des joueurs, reconstruit si st.session_state.players a été remplacé"""
+    registry = st.session_state.get('player_registry')
+    if registry is None or registry.source is not st.session_state.players:
+        registry = get_shared_dataset().registry_for(st.session_state.players) or PlayerRegistry(st.session_state.players)
+        st.session_state.player_registry = registry
+    return registry
+
+
+# ==================== Z-SCORE GLISSANT ====================
+ZSCORE_MIN_PERIODS = 3
+
+
+def rolling_window_stats(series, window):
+    """
+    Moyenne, variance et effectif des `window` observations précédant chaque point de sa colonne.
+
+    series: tableau (dates, séries) avec NaN pour les dates sans valeur.
+    Les sommes et sommes des carrés glissantes sont lues dans des sommes cumulées
+    par rang d'observation, soit O(1) par point et un seul passage pour toutes les séries.
+    """
+    valid = ~np.isnan(series)
+    filled = np.where(valid, series, 0.0)
+    rank = np.cumsum(valid, axis=0) - 1
+
+    # Observations compactées en tête de colonne (ordre chronologique conservé)
+    order = np.argsort(~valid, axis=0, kind='stable')
+    packed = np.take_along_axis(filled, order, axis=0)
+    zeros = np.zeros((1, series.shape[1]))
+    csum = np.concatenate([zeros, np.cumsum(packed, axis=0)])
+    csq = np.concatenate([zeros, np.cumsum(packed ** 2, axis=0)])
+
+    hi = np.maximum(rank, 0)
+    n = np.minimum(hi, window)
+    lo = hi - n
+    win_sum = np.take_along_axis(csum, hi, axis=0) - np.take_along_axis(csum, lo, axis=0)
+    win_sq = np.take_along_axis(csq, hi, axis=0) - np.take_along_axis(csq, lo, axis=0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = win_sum / n
+        var = win_sq / n - mean ** 2
+    return mean, var, n
+
+
+def rolling_zscores(series, window, min_periods=ZSCORE_MIN_PERIODS):
+    """
+    Z-Score de chaque point par rapport aux `window` observations précédentes de sa colonne.
+    Retourne NaN hors observations et 0 si l'historique est trop court ou constant.
+    """
+    valid = ~np.isnan(series)
+    mean, var, n = rolling_window_stats(series, window)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        z = (series - mean) / np.sqrt(var)
+    usable = (n >= min_periods) & (var > 1e-12)
+    return np.where(valid, np.where(usable, z, 0.0), np.nan)
+
+
+def previous_values(series):
+    """Valeur de l'observation précédente de chaque point de sa colonne (NaN si aucune)"""
+    valid = ~np.isnan(series)
+    rows = np.arange(series.shape[0])[:, None]
+    last = np.maximum.accumulate(np.where(valid, rows, -1), axis=0)
+    prev = np.vstack([np.full((1, series.shape[1]), -1), last[:-1]])
+    values = np.take_along_axis(series, np.maximum(prev, 0), axis=0)
+    return np.where(prev >= 0, values, np.nan)
+
+
+class ZScoreTable:
+    """
+    Moyennes journalières et Z-Scores d'une métrique pour toutes les séries :
+    équipe, groupes, lignes, postes et chaque joueur (colonnes de `zscores`).
+    """
+
+    def __init__(self, dates, labels, values, window):
+        self.dates = dates
+        self.index = {label: i for i, label in enumerate(labels)}
+        self.values = values
+        self.zscores = rolling_zscores(values, window)
+
+    def series(self, label, days=None):
+        """Liste {date, value, zscore} des `days` dernières dates pour une série"""
+        col = self.index.get(label)
+        if col is None:
+            return []
+        start = max(0, len(self.dates) - days) if days else 0
+        return [
+            {'date': date, 'value': float(v), 'zscore': round(float(z), 2)}
+            for date, v, z in zip(self.dates[start:], self.values[start:, col], self.zscores[start:, col])
+            if not np.isnan(v)
+        ]
+
+
+def get_zscore_window():
+    """Nombre d'observations de la fenêtre Z-Score (paramètre zscoreDays)"""
+    return int(st.session_state.settings.get('zscoreDays', DEFAULT_SETTINGS['zscoreDays']))
+
+
+def get_zscore_table(metric='global'):
+    """Table des Z-Scores d'une métrique, mise en cache par version des données, du registre et de la fenêtre"""
+    store = get_store()
+    registry = get_registry()
+    window = get_zscore_window()
+    cache_key = ('zscores', metric)
+    cached = store._cache.get(cache_key)
+    if cached and cached[0] is registry and cached[1] == registry.version and cached[2] == window:
+        return cached[3]
+
+    registered, group_codes, line_codes, positions = store.player_columns(registry)
+    labels = [('team', None)]
+    members = [registered]
+    for group, code in GROUP_CODES.items():
+        labels.append(('group', group))
+        members.append(registered & (group_codes == code))
+    for line, code in LINE_CODES.items():
+        labels.append(('line', line))
+        members.append(registered & (line_codes == code))
+    for position in sorted(set(positions[registered])):
+        labels.append(('position', position))
+        members.append(registered & (positions == position))
+
+    # Moyennes de toutes les séries agrégées en un produit matriciel
+    matrix = store.matrix(metric)
+    valid = ~np.isnan(matrix)
+    membership = np.array(members, dtype=float).T
+    sums = np.where(valid, matrix, 0.0) @ membership
+    counts = valid.astype(float) @ membership
+    with np.errstate(invalid='ignore', divide='ignore'):
+        aggregates = np.where(counts > 0, sums / counts, np.nan)
+
+    labels += [('player', name) for name in store.players]
+    table = ZScoreTable(store.dates, labels, np.concatenate([aggregates, matrix], axis=1), window)
+    store._cache[cache_key] = (registry, registry.version, window, table)
+    return table
+
+
+# Ordre des métriques dans le tenseur effectif : les 5 métriques puis la moyenne globale
+SQUAD_ZSCORE_KEYS = [m['key'] for m in METRICS] + ['global']
+
+
+def squad_values(store):
+    """Valeurs (dates, joueurs, métriques) dans l'ordre de SQUAD_ZSCORE_KEYS"""
+    return np.concatenate([store.values[:, :, :WEIGHT_IDX], store.averages()[:, :, None]], axis=2)
+
+
+def get_squad_zscores():
+    """
+    Tenseur (joueurs, dates, métriques) des Z-Scores individuels de tout l'effectif,
+    calculé en un seul passage et mis en cache par version des données et fenêtre.
+    Les joueurs suivent store.players, les métriques SQUAD_ZSCORE_KEYS.
+    """
+    store = get_store()
+    window = get_zscore_window()
+    cached = store._cache.get('squad_zscores')
+    if cached and cached[0] == window:
+        return cached[1]
+
+    stacked = squad_values(store)
+    n_dates, n_players, n_metrics = stacked.shape
+    zscores = rolling_zscores(stacked.reshape(n_dates, n_players * n_metrics), window)
+    tensor = zscores.reshape(n_dates, n_players, n_metrics).transpose(1, 0, 2)
+    store._cache['squad_zscores'] = (window, tensor)
+    return tensor
+
+
+def get_most_deviant_players(date_key):
+    """Tableau des Z-Scores du jour par joueur, trié du plus déviant (Z le plus bas) au moins déviant"""
+    store = get_store()
+    d_idx = store.date_index.get(date_key)
+    if d_idx is None:
+        return pd.DataFrame()
+
+    registry = get_registry()
+    tensor = get_squad_zscores()
+    registered = store.player_columns(registry)[0]
+    cols = np.flatnonzero(store.has_entry[d_idx] & registered)
+    if not cols.size:
+        return pd.DataFrame()
+
+    day = tensor[cols, d_idx, :]
+    labels = {m['key']: f"{m['icon']} {m['label']}" for m in METRICS}
+    labels['global'] = "⚡ Global"
+    df = pd.DataFrame(np.round(day, 2), columns=[labels[k] for k in SQUAD_ZSCORE_KEYS])
+    df.insert(0, 'Poste', [registry.by_name[store.players[j]]['position'] for j in cols])
+    df.insert(0, 'Joueur', [store.players[j] for j in cols])
+
+    # Métrique individuelle la plus basse (hors moyenne globale)
+    metric_z = np.where(np.isnan(day[:, :len(METRICS)]), np.inf, day[:, :len(METRICS)])
+    worst_idx = metric_z.argmin(axis=1)
+    worst = metric_z[np.arange(len(cols)), worst_idx]
+    has_metric = np.isfinite(worst)
+    df['Z min'] = np.round(np.where(has_metric, worst, np.nan), 2)
+    df['Métrique la plus basse'] = [METRICS[k]['label'] if ok else '-' for k, ok in zip(worst_idx, has_metric)]
+    return df.sort_values('Z min', na_position='last').reset_index(drop=True)
+
+
+# ==================== MOTEUR D'ALERTES ====================
+ALERT_TYPES = ['critical', 'weight', 'zscore', 'variation']
+VARIATION_REFS = ['dernière saisie', 'moyenne récente']
+
+
+def get_alert_settings_key():
+    """Seuils dont dépend la table d'alertes"""
+    settings = st.session_state.settings
+    keys = ('lowValueThreshold', 'weightThreshold', 'zscoreAlert', 'variationThreshold')
+    return tuple(float(settings[k]) for k in keys) + (get_zscore_window(),)
+
+
+def get_alert_table():
+    """
+    Toutes les alertes de la saison, évaluées par masques booléens (dates × joueurs) sur le store.
+    Une ligne par alerte : d_idx, p_idx, type, metric_idx (-1 si non applicable), value,
+    ref (référence de la baisse pour les variations, -1 sinon).
+    Mémoïsée par version des données, du registre et des seuils.
+    """
+    store = get_store()
+    registry = get_registry()
+    settings_key = get_alert_settings_key()
+    cached = store._cache.get('alerts')
+    if cached and cached[0] is registry and cached[1] == registry.version and cached[2] == settings_key:
+        return cached[3]
+
+    low_threshold, weight_threshold, zscore_alert, variation_threshold, window = settings_key
+    registered = store.player_columns(registry)[0]
+    entry = store.has_entry & registered[None, :]
+    parts = []
+
+    # Métriques basses
+    metric_vals = store.values[:, :, :WEIGHT_IDX]
+    low = entry[:, :, None] & store.present[:, :, :WEIGHT_IDX] & (metric_vals <= low_threshold)
+    d_idx, p_idx, m_idx = np.nonzero(low)
+    parts.append(pd.DataFrame({'d_idx': d_idx, 'p_idx': p_idx, 'type': 'critical', 'metric_idx': m_idx,
+                               'value': metric_vals[d_idx, p_idx, m_idx]}))
+
+    # Poids vs poids de forme (poids et cible non nuls)
+    targets = np.array([float(registry.by_name[name].get('targetWeight') or np.nan) if registered[j] else np.nan
+                        for j, name in enumerate(store.players)])
+    weights = store.values[:, :, WEIGHT_IDX]
+    with np.errstate(invalid='ignore'):
+        diff = weights - targets[None, :]
+        heavy = entry & store.present[:, :, WEIGHT_IDX] & (weights != 0) & (np.abs(diff) > weight_threshold)
+    d_idx, p_idx = np.nonzero(heavy)
+    parts.append(pd.DataFrame({'d_idx': d_idx, 'p_idx': p_idx, 'type': 'weight', 'metric_idx': -1,
+                               'value': diff[d_idx, p_idx]}))
+
+    # Z-Score individuel de la moyenne globale
+    global_z = get_squad_zscores()[:, :, -1].T
+    with np.errstate(invalid='ignore'):
+        low_z = entry & (global_z < zscore_alert)
+    d_idx, p_idx = np.nonzero(low_z)
+    parts.append(pd.DataFrame({'d_idx': d_idx, 'p_idx': p_idx, 'type': 'zscore', 'metric_idx': -1,
+                               'value': global_z[d_idx, p_idx]}))
+
+    # Baisse vs dernière saisie ou vs moyenne des `window` saisies précédentes (métriques + global)
+    stacked = squad_values(store)
+    flat = stacked.reshape(stacked.shape[0], -1)
+    baseline, _, n = rolling_window_stats(flat, window)
+    baseline = np.where(n >= ZSCORE_MIN_PERIODS, baseline, np.nan)
+    prev_drop = (previous_values(flat) - flat).reshape(stacked.shape)
+    baseline_drop = (baseline - flat).reshape(stacked.shape)
+    drop = np.fmax(prev_drop, baseline_drop)
+    ref = (np.isnan(prev_drop) | (baseline_drop > prev_drop)).astype(int)
+    with np.errstate(invalid='ignore'):
+        falling = entry[:, :, None] & (drop > variation_threshold + 1e-9)
+    d_idx, p_idx, m_idx = np.nonzero(falling)
+    parts.append(pd.DataFrame({'d_idx': d_idx, 'p_idx': p_idx, 'type': 'variation', 'metric_idx': m_idx,
+                               'value': drop[d_idx, p_idx, m_idx], 'ref': ref[d_idx, p_idx, m_idx]}))
+
+    table = pd.concat(parts, ignore_index=True)
+    table['ref'] = table['ref'].fillna(-1).astype(int)
+    table['type_order'] = table['type'].map({t: i for i, t in enumerate(ALERT_TYPES)})
+    table = table.sort_values(['d_idx', 'p_idx', 'type_order', 'metric_idx'], kind='stable').reset_index(drop=True)
+    store._cache['alerts'] = (registry, registry.version, settings_key, table)
+    return table
+
+
+def get_alert_counts(end_date=None, days=7):
+    """Nombre d'alertes par joueur sur les `days` jours calendaires se terminant à end_date"""
+    store = get_store()
+    table = get_alert_table()
+    if not store.dates:
+        return pd.DataFrame()
+    end_date = end_date or store.dates[-1]
+    start_date = (datetime.strptime(end_date, '%Y-%m-%d') - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+    lo = bisect.bisect_left(store.dates, start_date)
+    hi = bisect.bisect_right(store.dates, end_date)
+    window = table[(table['d_idx'] >= lo) & (table['d_idx'] < hi)]
+    if window.empty:
+        return pd.DataFrame()
+
+    counts = pd.crosstab(window['p_idx'], window['type']).reindex(columns=ALERT_TYPES, fill_value=0)
+    counts.columns = ['🔴 Critiques', '⚖️ Poids', '📉 Z-Score', '↘️ Baisse']
+    counts.insert(0, 'Total', counts.sum(axis=1))
+    counts.insert(0, 'Jours', window.groupby('p_idx')['d_idx'].nunique())
+    counts.insert(0, 'Joueur', [store.players[j] for j in counts.index])
+    return counts.sort_values(['Total', 'Joueur'], ascending=[False, True]).reset_index(drop=True)
+
+
 # ==================== SAUVEGARDE / CHARGEMENT DONNÉES ====================
 DATA_FILE = "wellness_data.json"
+JOURNAL_FILE = "wellness_journal.jsonl"
+JOURNAL_COMPACT_BYTES = 1_000_000  # Au-delà, le journal est compacté dans DATA_FILE
+DB_FILE = "wellness_data.db"        # Présent = stockage local SQLite (au lieu de DATA_FILE + journal)
+SNAPSHOT_CACHE_FILE = "wellness_data.wts"  # Copie binaire de DATA_FILE pour un chargement rapide
+
+def persistable_settings(settings=None):
+    """Paramètres sauvegardables (sans les identifiants cloud) de la session, ou de `settings`"""
+    settings = st.session_state.settings if settings is None else settings
+    return {k: v for k, v in settings.items() if not k.startswith('cloud_') and isinstance(v, (str, int, float, bool, list, dict, type(None)))}
+
+SYNC_STATE_FILE = "wellness_sync.json"
+
+def section_hash(value):
+    """Empreinte SHA-256 d'une section (JSON canonique)"""
+    payload = json.dumps(value, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+class ContentHashes:
+    """
+    Empreintes par section du contenu d'une session : joueurs, entrées de chaque date,
+    blessures et paramètres. apply() ne rehache que les sections touchées par des
+    enregistrements du journal et écarte ceux qui ne changent rien.
+    Les sections sont liées aux objets de la session (players, data, injuries) ;
+    un remplacement de ces objets impose un recalcul (voir get_content_hashes).
+    """
+
+    def __init__(self, players, data, injuries, settings):
+        self.source = (players, data, injuries)
+        self.players = section_hash(players)
+        self.injuries = section_hash(injuries)
+        self.dates = self._date_hashes(data)
+        self.settings = section_hash(settings)
+        self.persisted = None    # Empreinte complète de la dernière écriture locale
+        # False si calculées après d'éventuelles modifications non enregistrées : apply() ne filtre rien
+        self.tracked = True
+
+    @staticmethod
+    def _date_hashes(data):
+        # Saisons archivées non chargées : empreintes de l'index (voir SeasonData)
+        hashes = {d: h for season in getattr(data, 'archived', {}).values() for d, h in season.items()}
+        # Dates d'un instantané binaire pas encore construites : empreintes de l'instantané (SnapshotDays)
+        pending = getattr(data, 'pending_hashes', dict)()
+        hashes.update((d, pending.get(d) or section_hash(data[d])) for d in data)
+        return hashes
+
+    def matches(self, players, data, injuries):
+        return self.source[0] is players and self.source[1] is data and self.source[2] is injuries
+
+    def copy(self, players, data, injuries):
+        """Mêmes empreintes liées à une copie du contenu (copy-on-write)"""
+        other = copy.copy(self)
+        other.source = (players, data, injuries)
+        other.dates = dict(self.dates)
+        return other
+
+    def digest(self):
+        """Empreinte du contenu (joueurs, entrées, blessures), indépendante de la date de sauvegarde"""
+        h = hashlib.sha256(f"{self.players};{self.injuries}".encode())
+        for d in sorted(self.dates):
+            h.update(f";{d}={self.dates[d]}".encode())
+        return h.hexdigest()
+
+    def full_digest(self, settings=None):
+        """Empreinte du contenu et des paramètres (rehachés si `settings` est fourni)"""
+        if settings is not None:
+            self.settings = section_hash(settings)
+        return hashlib.sha256(f"{self.digest()};{self.settings}".encode()).hexdigest()
+
+    def apply(self, records, settings):
+        """Met à jour les sections touchées ; retourne les enregistrements qui modifient réellement le contenu"""
+        if not self.tracked:
+            self.tracked = True
+            return list(records)
+        players, data, injuries = self.source
+        changed = []
+        rehashed = {}
+        for record in records:
+            op = record.get('op')
+            if op == 'day':
+                h = section_hash(record['entries']) if record['entries'] else None
+                if h != self.dates.get(record['date']):
+                    changed.append(record)
+                    if h is None:
+                        self.dates.pop(record['date'], None)
+                    else:
+                        self.dates[record['date']] = h
+                continue
+            # Sections entières : rehachées une seule fois par appel
+            section, value = {'player': ('players', players), 'player_delete': ('players', players),
+                              'injury': ('injuries', injuries), 'settings': ('settings', settings)}.get(op, (None, None))
+            if section is None:
+                changed.append(record)
+                continue
+            if section not in rehashed:
+                rehashed[section] = section_hash(value)
+            if rehashed[section] != getattr(self, section):
+                changed.append(record)
+            if op == 'player_delete':
+                # Les entrées du joueur supprimé ont été retirées de toutes les dates
+                self.dates = self._date_hashes(data)
+        for section, h in rehashed.items():
+            setattr(self, section, h)
+        return changed
+
+def content_hash(state):
+    """Empreinte du contenu (joueurs, entrées, blessures), indépendante de la date de sauvegarde"""
+    return ContentHashes(state['players'], state['data'], state['injuries'], {}).digest()
+
+def get_content_hashes():
+    """Empreintes de la session, recalculées si players, data ou injuries ont été remplacés"""
+    hashes = st.session_state.get('content_hashes')
+    players, data, injuries = st.session_state.players, st.session_state.data, st.session_state.injuries
+    if hashes is None or not hashes.matches(players, data, injuries):
+        hashes = get_shared_dataset().hashes_for(players, data, injuries)
+        if hashes is None:
+            # Contenu remplacé (chargement, import) et peut-être déjà modifié depuis
+            hashes = ContentHashes(players, data, injuries, persistable_settings())
+            hashes.tracked = False
+        st.session_state.content_hashes = hashes
+    return hashes
+
+def read_sync_marker():
+    """Dernier point de synchronisation avec le cloud : {hash, cloud_version, synced_at} ou {}"""
+    try:
+        with open(SYNC_STATE_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def write_sync_marker(synced_hash, cloud_version=None, settings_hash=None, target=None, etag=None):
+    """
+    Mémorise l'empreinte du contenu identique en local et dans le cloud, avec le jeton
+    de version du cloud (version Apps Script ou ETag JSONBlob) et la cible qu'il concerne.
+    """
+    try:
+        atomic_write(SYNC_STATE_FILE, json.dumps({'hash': synced_hash, 'settings_hash': settings_hash, 'cloud_version': cloud_version,
+                                                  'target': target, 'etag': etag,
+                                                  'synced_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')}))
+    except OSError:
+        pass
+
+# --- Écritures atomiques ---
+WAL_FILE = "wellness_data.wal"  # Intention d'une sauvegarde en cours (renommages et suppressions)
+
+def _fsync_dir(path):
+    """Synchronise le répertoire de `path` (renommage durable) ; sans effet là où ce n'est pas possible"""
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+def _write_synced(path, payload):
+    if isinstance(payload, str):
+        payload = payload.encode('utf-8')
+    with open(path, 'wb') as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+
+def atomic_write(path, payload):
+    """Écrit `payload` (str ou bytes) dans un fichier temporaire synchronisé puis le renomme sur `path`"""
+    _write_synced(path + '.tmp', payload)
+    os.replace(path + '.tmp', path)
+    _fsync_dir(path)
+
+class FileCommit:
+    """
+    Écriture de plusieurs fichiers en tout ou rien (DATA_FILE, saisons archivées, journal).
+
+    Chaque fichier est écrit et synchronisé à côté de sa cible (`.pending`), puis WAL_FILE
+    liste les renommages et suppressions à faire : une fois le WAL écrit, la sauvegarde est
+    acquise et recover_pending_commit() la termine si le processus s'arrête avant la fin.
+    """
+
+    def __init__(self):
+        self.replace = []
+        self.remove = []
+
+    def write(self, path, payload):
+        _write_synced(path + '.pending', payload)
+        self.replace.append([path + '.pending', path])
+
+    def write_json(self, path, value, **kwargs):
+        self.write(path, json.dumps(value, ensure_ascii=False, default=str, **kwargs))
+
+    def delete(self, path):
+        self.remove.append(path)
+
+    def commit(self):
+        if not (self.replace or self.remove):
+            return
+        atomic_write(WAL_FILE, json.dumps({'replace': self.replace, 'remove': self.remove}))
+        finish_commit(self.replace, self.remove)
+        os.remove(WAL_FILE)
+
+def finish_commit(replace, remove):
+    """Renommages puis suppressions d'un FileCommit (rejouables : une étape déjà faite est ignorée)"""
+    for pending, path in replace:
+        if os.path.exists(pending):
+            os.replace(pending, path)
+    for path in remove:
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+    for directory in {os.path.dirname(path) for _, path in replace} | {os.path.dirname(path) for path in remove}:
+        _fsync_dir(os.path.join(directory, '.'))
+
+def recover_pending_commit():
+    """Termine une sauvegarde interrompue après l'écriture de son WAL ; True si une reprise a eu lieu"""
+    try:
+        with open(WAL_FILE, 'r', encoding='utf-8') as f:
+            plan = json.load(f)
+    except FileNotFoundError:
+        return False
+    except ValueError:
+        # WAL écrit par renommage : illisible = jamais validé
+        os.remove(WAL_FILE)
+        return False
+    finish_commit(plan.get('replace', []), plan.get('remove', []))
+    os.remove(WAL_FILE)
+    return True
+
+def write_state_file(state):
+    """
+    Écrit un état {players, data, injuries, settings} dans DATA_FILE et vide le journal (sans session).
+    Les saisons anciennes vont dans PARTITION_DIR : seules celles qui ont changé sont réécrites.
+    L'ensemble est validé d'un bloc (FileCommit) : un arrêt en cours d'écriture laisse l'ancien état.
+    """
+    data_to_save = {
+        'players': list(state['players']) if state['players'] else [],
+        'data': {},
+        'injuries': list(state['injuries']) if state['injuries'] else [],
+        'settings': state['settings'],
+        'saved_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+    if use_sqlite():
+        data_to_save['data'] = complete_data(state['data'])
+        SqliteStorage().write_state(data_to_save, data_to_save['saved_at'])
+        return
+    commit = FileCommit()
+    data_to_save['data'] = write_partitions(state['data'], commit)
+    commit.write_json(DATA_FILE, data_to_save, separators=(',', ':'))
+    commit.delete(JOURNAL_FILE)
+    commit.commit()
+
+def write_snapshot():
+    """
+    Écrit l'état complet de la session dans DATA_FILE et vide le journal, désormais inclus dans l'instantané.
+    L'écriture est mémorisée dans les empreintes : save_data_to_file ne la refait pas sans modification.
+    """
+    settings = persistable_settings()
+    with get_shared_dataset().file_lock:
+        write_state_file({
+            'players': st.session_state.players,
+            'data': st.session_state.data,
+            'injuries': st.session_state.injuries,
+            'settings': settings,
+        })
+    hashes = get_content_hashes()
+    hashes.persisted = hashes.full_digest(settings)
+    hashes.tracked = True
 
 def save_data_to_file():
-    """Sauvegarde les données dans un fichier JSON"""
+    """Sauvegarde les données dans un fichier JSON (aucune écriture si rien n'a changé)"""
     try:
-        data_to_save = {
-            'players': list(st.session_state.players) if st.session_state.players else [],
-            'data': dict(st.session_state.data) if st.session_state.data else {},
-            'injuries': list(st.session_state.injuries) if st.session_state.injuries else [],
-            'settings': {k: v for k, v in st.session_state.settings.items() if not k.startswith('cloud_') and isinstance(v, (str, int, float, bool, list, dict, type(None)))},
-            'saved_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        }
-        with open(DATA_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data_to_save, f, ensure_ascii=False, indent=2, default=str)
+        hashes = get_content_hashes()
+        current = hashes.full_digest(persistable_settings())
+        if current == hashes.persisted:
+            # Le cloud est vérifié de la même façon (envoi ignoré s'il est déjà à jour)
+            cloud_save()
+            return True, "Aucune modification depuis la dernière sauvegarde"
+        
+        write_snapshot()
+        publish_session_data()
         st.session_state.last_save_time = datetime.now()
         
         # Auto-save to cloud (Google Sheets ou JSONBlob)
@@ -485,20 +1331,894 @@ def save_data_to_file():
     except Exception as e:
         return False, f"Erreur: {str(e)}"
 
+# --- Journal des modifications (une ligne JSON par mutation) ---
+def day_record(date_key):
+    """Remplacement des entrées d'une date"""
+    return {'op': 'day', 'date': date_key, 'entries': st.session_state.data.get(date_key, [])}
+
+def player_record(player):
+    """Ajout ou modification d'un joueur (par id)"""
+    return {'op': 'player', 'player': player}
+
+def player_delete_record(player):
+    """Suppression d'un joueur et de ses entrées"""
+    return {'op': 'player_delete', 'id': player['id'], 'name': player['name']}
+
+def injury_record(injury):
+    """Ajout ou modification d'une blessure (par id)"""
+    return {'op': 'injury', 'injury': injury}
+
+def settings_record(keys=None):
+    """Valeurs courantes des paramètres `keys` (tous si None)"""
+    settings = persistable_settings()
+    return {'op': 'settings', 'settings': settings if keys is None else {k: settings[k] for k in keys if k in settings}}
+
+def journal_record_key(record):
+    """Clé de l'objet modifié (date, joueur, blessure) ; None pour les paramètres"""
+    op = record.get('op')
+    if op == 'day':
+        return ('day', record['date'])
+    if op == 'player':
+        return ('player', record['player'].get('id'))
+    if op == 'player_delete':
+        return ('player', record['id'])
+    if op == 'injury':
+        return ('injury', record['injury'].get('id'))
+    return None
+
+def append_journal(records):
+    """Ajoute des enregistrements au journal, puis compacte s'il devient trop gros"""
+    if not records:
+        return
+    at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    if use_sqlite():
+        with get_shared_dataset().file_lock:
+            SqliteStorage().apply_records(records, at)
+        return
+    lines = ''.join(json.dumps({**r, 'at': at}, ensure_ascii=False, separators=(',', ':'), default=str) + '\n' for r in records)
+    with get_shared_dataset().file_lock:
+        with open(JOURNAL_FILE, 'a+b') as f:
+            # Repartir sur une ligne neuve si la dernière écriture a été interrompue
+            if f.seek(0, os.SEEK_END):
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b'\n':
+                    lines = '\n' + lines
+            f.write(lines.encode('utf-8'))
+            f.flush()
+            os.fsync(f.fileno())
+        # Une suppression de joueur touche aussi les saisons archivées : instantané immédiat
+        compact = os.path.getsize(JOURNAL_FILE) > JOURNAL_COMPACT_BYTES or (
+            os.path.exists(PARTITION_INDEX_FILE) and any(r.get('op') == 'player_delete' for r in records))
+    if compact:
+        write_snapshot()
+
+def save_changes(records, cloud=True):
+    """
+    Enregistre des modifications dans le journal (au lieu de réécrire DATA_FILE) puis synchronise le cloud.
+    Les enregistrements qui ne changent pas le contenu (empreinte de section identique) sont ignorés.
+    """
+    try:
+        hashes = get_content_hashes()
+        records = hashes.apply(records, persistable_settings())
+        if not records:
+            return True, "Aucune modification"
+        append_journal(records)
+        hashes.persisted = hashes.full_digest()
+        publish_session_data()
+        st.session_state.last_save_time = datetime.now()
+        if is_gsheet_configured():
+            get_gsheet_sync().add(records)
+        if cloud:
+            cloud_save(delta=True)
+        return True, f"{len(records)} modification(s) enregistrée(s)"
+    except Exception as e:
+        return False, f"Erreur: {str(e)}"
+
+def apply_journal_record(state, record):
+    """Rejoue un enregistrement du journal sur un état {players, data, injuries, settings}"""
+    op = record.get('op')
+    if op == 'day':
+        if record['entries']:
+            state['data'][record['date']] = record['entries']
+        else:
+            state['data'].pop(record['date'], None)
+    elif op == 'player':
+        player = record['player']
+        for i, p in enumerate(state['players']):
+            if p.get('id') == player.get('id'):
+                state['players'][i] = player
+                break
+        else:
+            state['players'].append(player)
+    elif op == 'player_delete':
+        # Les entrées du joueur sont retirées de toutes les saisons, archivées comprises
+        load_partitions(state['data'])
+        state['players'] = [p for p in state['players'] if p.get('id') != record['id']]
+        for date in state['data']:
+            state['data'][date] = [e for e in state['data'][date] if e.get('name') != record['name']]
+    elif op == 'injury':
+        injury = record['injury']
+        for i, inj in enumerate(state['injuries']):
+            if inj.get('id') == injury.get('id'):
+                state['injuries'][i] = injury
+                break
+        else:
+            state['injuries'].append(injury)
+    elif op == 'settings':
+        state['settings'].update(record['settings'])
+
+def read_local_state(snapshots=None):
+    """
+    État local = instantané DATA_FILE + rejeu du journal (ou base SQLite si elle existe),
+    sans les saisons archivées (SeasonData).
+    Retourne None si aucune sauvegarde locale. Une dernière ligne tronquée (écriture interrompue) est ignorée,
+    et une sauvegarde complète interrompue après son WAL est d'abord terminée (recover_pending_commit).
+    `snapshots` reçoit la copie binaire de DATA_FILE si l'état en est issu sans modification du journal.
+    """
+    recover_pending_commit()
+    if use_sqlite():
+        return SqliteStorage().read_state()
+    if not os.path.exists(DATA_FILE) and not os.path.exists(JOURNAL_FILE):
+        return None
+    state = {'players': [], 'data': {}, 'injuries': [], 'settings': {}}
+    if os.path.exists(DATA_FILE):
+        loaded = read_data_file(snapshots)
+        state.update({k: loaded.get(k, state[k]) for k in state})
+        state['saved_at'] = loaded.get('saved_at', 'inconnue')
+    # Saisons archivées : chargées à la demande (ensure_history)
+    if isinstance(state['data'], SeasonData):
+        state['data'].archived = read_partition_index()
+    else:
+        state['data'] = SeasonData(state['data'], archived=read_partition_index())
+    if os.path.exists(JOURNAL_FILE):
+        with open(JOURNAL_FILE, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                apply_journal_record(state, record)
+                state['saved_at'] = record.get('at', state.get('saved_at'))
+                if snapshots:
+                    snapshots.clear()
+    return state
+
+# --- Partitions par saison (archives chargées à la demande) ---
+PARTITION_DIR = "wellness_archive"  # Un fichier JSON par saison archivée + index des empreintes
+PARTITION_INDEX_FILE = os.path.join(PARTITION_DIR, "index.json")
+SEASON_START_MONTH = 7              # Une saison va de juillet à juin
+PARTITION_LIVE_DAYS = 60            # Saisons couvrant les 60 derniers jours : gardées dans DATA_FILE
+
+class SeasonData(dict):
+    """
+    Dict date -> entrées dont certaines saisons archivées ne sont pas chargées.
+
+    `archived` : {saison: {date: empreinte}} des saisons restées dans PARTITION_DIR.
+    Leurs empreintes complètent celles des dates chargées (ContentHashes), si bien que
+    le contenu reste identifié comme complet. Un dict simple est un contenu complet.
+    """
+
+    def __init__(self, items=(), archived=None):
+        super().__init__(items)
+        self.archived = dict(archived or {})
+
+def season_of(date_key):
+    """Saison d'une date 'AAAA-MM-JJ' ('2024-2025'), None si la clé n'est pas une date"""
+    try:
+        d = datetime.strptime(date_key, '%Y-%m-%d')
+    except (TypeError, ValueError):
+        return None
+    start = d.year if d.month >= SEASON_START_MONTH else d.year - 1
+    return f"{start}-{start + 1}"
+
+def live_seasons(dates):
+    """Saisons gardées dans DATA_FILE : celles qui couvrent les PARTITION_LIVE_DAYS derniers jours"""
+    valid = [d for d in dates if season_of(d)]
+    if not valid:
+        return set()
+    last = max(valid)
+    horizon = (datetime.strptime(last, '%Y-%m-%d') - timedelta(days=PARTITION_LIVE_DAYS)).strftime('%Y-%m-%d')
+    return {season_of(last), season_of(horizon)}
+
+def partition_path(season):
+    return os.path.join(PARTITION_DIR, f"{season}.json")
+
+def read_partition_index():
+    """{saison: {date: empreinte}} des saisons archivées ({} sans archive)"""
+    try:
+        with open(PARTITION_INDEX_FILE, 'r', encoding='utf-8') as f:
+            return json.load(f).get('seasons', {})
+    except FileNotFoundError:
+        return {}
+
+def read_partition(season):
+    """Entrées {date: entrées} d'une saison archivée ({} si le fichier n'existe pas)"""
+    try:
+        with open(partition_path(season), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return {}
+
+def load_partitions(data, seasons=None):
+    """
+    Charge en place dans `data` les saisons archivées `seasons` (toutes si None) ;
+    les dates déjà présentes (modifiées en mémoire) sont conservées. Retourne les saisons chargées.
+    """
+    archived = getattr(data, 'archived', None)
+    if not archived:
+        return []
+    loaded = sorted(archived if seasons is None else set(seasons) & set(archived))
+    for season in loaded:
+        for date_key, entries in read_partition(season).items():
+            data.setdefault(date_key, entries)
+        del archived[season]
+    return loaded
+
+def complete_data(data):
+    """Contenu complet {date: entrées} : saisons archivées relues du disque, complétées par `data`"""
+    archived = getattr(data, 'archived', None)
+    if not archived:
+        return dict(data)
+    full = {}
+    for season in sorted(archived):
+        full.update(read_partition(season))
+    full.update(data)
+    return full
+
+def data_dates(data):
+    """Toutes les dates de `data`, y compris celles des saisons archivées non chargées (index)"""
+    return frozenset(data).union(*getattr(data, 'archived', {}).values())
+
+def write_partitions(data, commit):
+    """
+    Prépare dans `commit` l'écriture dans PARTITION_DIR les saisons anciennes de `data` qui ont changé (empreintes
+    comparées à l'index) et retourne les dates à garder dans DATA_FILE (saisons récentes).
+    Une saison archivée non chargée reste sur disque ; elle n'est réécrite que si `data`
+    contient certaines de ses dates (import ou modification d'une ancienne date).
+    """
+    archived = getattr(data, 'archived', None) or {}
+    index = read_partition_index()
+    by_season = {}
+    for date_key in data:
+        by_season.setdefault(season_of(date_key), []).append(date_key)
+    live = live_seasons(list(data) + [d for hashes in archived.values() for d in hashes])
+
+    live_data, new_index = {}, {}
+    for season in set(by_season) | set(index) | set(archived):
+        content = {d: data[d] for d in by_season.get(season, [])}
+        if season in archived:
+            if not content:
+                new_index[season] = index.get(season, archived[season])
+                continue
+            content = {**read_partition(season), **content}
+        elif season is None or season in live:
+            live_data.update(content)
+            continue
+        if not content:
+            continue
+        hashes = {d: section_hash(entries) for d, entries in content.items()}
+        if hashes != index.get(season):
+            os.makedirs(PARTITION_DIR, exist_ok=True)
+            commit.write_json(partition_path(season), content, separators=(',', ':'))
+        new_index[season] = hashes
+
+    for season in set(index) - set(new_index):
+        commit.delete(partition_path(season))
+    if new_index != index:
+        os.makedirs(PARTITION_DIR, exist_ok=True)
+        commit.write_json(PARTITION_INDEX_FILE, {'seasons': new_index}, separators=(',', ':'))
+    return live_data
+
+def unload_archived(data):
+    """Vue de `data` sans les saisons archivées sur disque (après write_partitions)"""
+    index = read_partition_index()
+    if not index:
+        return data
+    return SeasonData({d: e for d, e in data.items() if season_of(d) not in index}, archived=index)
+
+def ensure_partitions(seasons=None):
+    """
+    Charge dans la session les saisons archivées `seasons` (toutes si None).
+    La session reçoit un nouvel objet data (store reconstruit, empreintes inchangées) ;
+    s'il s'agissait de la version partagée, celle-ci est étendue pour les autres sessions.
+    """
+    data = st.session_state.data
+    archived = getattr(data, 'archived', None)
+    wanted = set(archived or {}) if seasons is None else set(seasons) & set(archived or {})
+    if not wanted:
+        return False
+    hashes = get_content_hashes()
+    shared = get_shared_dataset()
+    with shared.lock, shared.file_lock:
+        extended = SeasonData(data, archived=archived)
+        load_partitions(extended, wanted)
+        hashes = hashes.copy(st.session_state.players, extended, st.session_state.injuries)
+        if shared.state is not None and shared.state['data'] is data:
+            shared.extend({**shared.state, 'data': extended}, hashes)
+    st.session_state.data = extended
+    st.session_state.content_hashes = hashes
+    return True
+
+def ensure_history(days=None, since=None):
+    """
+    Charge les saisons archivées nécessaires à un affichage : au moins `days` dates
+    (les plus récentes d'abord) et/ou toutes les dates à partir de `since` ('AAAA-MM-JJ').
+    """
+    archived = getattr(st.session_state.data, 'archived', None)
+    if not archived:
+        return False
+    wanted = set()
+    if since is not None:
+        wanted |= {season for season, hashes in archived.items() if hashes and max(hashes) >= since}
+    if days is not None:
+        count = len(st.session_state.data)
+        for season in sorted(archived, reverse=True):
+            if count >= days:
+                break
+            wanted.add(season)
+            count += len(archived[season])
+    return ensure_partitions(wanted) if wanted else False
+
+# --- Stockage local SQLite (optionnel) ---
+def use_sqlite():
+    """Stockage local SQLite sélectionné (la base existe)"""
+    return os.path.exists(DB_FILE)
+
+class SqliteStorage:
+    """
+    Stockage local dans une base SQLite : une ligne par joueur, par entrée et par blessure.
+
+    Chaque ligne garde le dict d'origine en JSON (`payload`) et sa position (`pos`) pour
+    reconstruire exactement l'état de la session ; les colonnes extraites (date, nom, id...)
+    servent aux index des mises à jour. Les enregistrements du journal deviennent des écritures
+    de lignes dans une transaction, sans réécrire le reste de l'historique.
+    Les pages lisent l'état chargé en mémoire (read_state), pas la base.
+    """
+
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS players (
+            pos INTEGER PRIMARY KEY, id TEXT, name TEXT, position TEXT, status TEXT, payload TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS idx_players_id ON players(id);
+        CREATE TABLE IF NOT EXISTS days (date TEXT PRIMARY KEY);
+        CREATE TABLE IF NOT EXISTS entries (
+            date TEXT NOT NULL, pos INTEGER NOT NULL, name TEXT, payload TEXT NOT NULL,
+            PRIMARY KEY (date, pos)) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS idx_entries_player ON entries(name, date);
+        CREATE TABLE IF NOT EXISTS injuries (
+            pos INTEGER PRIMARY KEY, id TEXT, player_id TEXT, status TEXT, payload TEXT NOT NULL);
+        CREATE INDEX IF NOT EXISTS idx_injuries_id ON injuries(id);
+        CREATE TABLE IF NOT EXISTS settings (key TEXT PRIMARY KEY, value TEXT);
+        CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+    """
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+
+    def connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.executescript(self.SCHEMA)
+        return conn
+
+    @staticmethod
+    def _dumps(value):
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=str)
+
+    def _insert_day(self, conn, date_key, entries, keep_empty=False):
+        # Comme apply_journal_record : une date sans entrée disparaît, sauf dans un instantané complet
+        if entries or keep_empty:
+            conn.execute("INSERT OR IGNORE INTO days (date) VALUES (?)", (date_key,))
+        else:
+            conn.execute("DELETE FROM days WHERE date = ?", (date_key,))
+        conn.execute("DELETE FROM entries WHERE date = ?", (date_key,))
+        conn.executemany("INSERT INTO entries (date, pos, name, payload) VALUES (?, ?, ?, ?)",
+                         [(date_key, i, e.get('name'), self._dumps(e)) for i, e in enumerate(entries)])
+
+    def _upsert_player(self, conn, player):
+        row = (player.get('id'), player.get('name'), player.get('position'), player.get('status'), self._dumps(player))
+        updated = conn.execute(
+            "UPDATE players SET id = ?, name = ?, position = ?, status = ?, payload = ? "
+            "WHERE pos = (SELECT MIN(pos) FROM players WHERE id = ?)", row + (player.get('id'),)).rowcount
+        if not updated:
+            conn.execute("INSERT INTO players (id, name, position, status, payload) VALUES (?, ?, ?, ?, ?)", row)
+
+    def _upsert_injury(self, conn, injury):
+        row = (injury.get('id'), injury.get('playerId'), injury.get('status'), self._dumps(injury))
+        updated = conn.execute(
+            "UPDATE injuries SET id = ?, player_id = ?, status = ?, payload = ? "
+            "WHERE pos = (SELECT MIN(pos) FROM injuries WHERE id = ?)", row + (injury.get('id'),)).rowcount
+        if not updated:
+            conn.execute("INSERT INTO injuries (id, player_id, status, payload) VALUES (?, ?, ?, ?)", row)
+
+    def _set_settings(self, conn, settings):
+        conn.executemany("INSERT OR REPLACE INTO settings (key, value) VALUES (?, ?)",
+                         [(k, self._dumps(v)) for k, v in settings.items()])
+
+    def _set_saved_at(self, conn, saved_at):
+        conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('saved_at', ?)", (saved_at,))
+
+    def write_state(self, state, saved_at):
+        """Remplace tout le contenu (migration, import, instantané) en une transaction"""
+        conn = self.connect()
+        try:
+            with conn:
+                for table in ('players', 'days', 'entries', 'injuries', 'settings'):
+                    conn.execute(f"DELETE FROM {table}")
+                for player in state['players']:
+                    conn.execute("INSERT INTO players (id, name, position, status, payload) VALUES (?, ?, ?, ?, ?)",
+                                 (player.get('id'), player.get('name'), player.get('position'), player.get('status'), self._dumps(player)))
+                for date_key, entries in state['data'].items():
+                    self._insert_day(conn, date_key, entries, keep_empty=True)
+                for injury in state['injuries']:
+                    conn.execute("INSERT INTO injuries (id, player_id, status, payload) VALUES (?, ?, ?, ?)",
+                                 (injury.get('id'), injury.get('playerId'), injury.get('status'), self._dumps(injury)))
+                self._set_settings(conn, state['settings'])
+                self._set_saved_at(conn, saved_at)
+        finally:
+            conn.close()
+
+    def apply_records(self, records, saved_at):
+        """Enregistrements du journal appliqués en lignes, dans une seule transaction"""
+        conn = self.connect()
+        try:
+            with conn:
+                for record in records:
+                    op = record.get('op')
+                    if op == 'day':
+                        self._insert_day(conn, record['date'], record['entries'])
+                    elif op == 'player':
+                        self._upsert_player(conn, record['player'])
+                    elif op == 'player_delete':
+                        conn.execute("DELETE FROM players WHERE id = ?", (record['id'],))
+                        conn.execute("DELETE FROM entries WHERE name = ?", (record['name'],))
+                    elif op == 'injury':
+                        self._upsert_injury(conn, record['injury'])
+                    elif op == 'settings':
+                        self._set_settings(conn, record['settings'])
+                self._set_saved_at(conn, saved_at)
+        finally:
+            conn.close()
+
+    def read_state(self):
+        """État complet {players, data, injuries, settings, saved_at}"""
+        conn = self.connect()
+        try:
+            state = {
+                'players': [json.loads(p) for p, in conn.execute("SELECT payload FROM players ORDER BY pos")],
+                'data': {},
+                'injuries': [json.loads(i) for i, in conn.execute("SELECT payload FROM injuries ORDER BY pos")],
+                'settings': {k: json.loads(v) for k, v in conn.execute("SELECT key, value FROM settings")},
+            }
+            state['data'] = {date_key: [] for date_key, in conn.execute("SELECT date FROM days ORDER BY date")}
+            for date_key, payload in conn.execute("SELECT date, payload FROM entries ORDER BY date, pos"):
+                state['data'][date_key].append(json.loads(payload))
+            row = conn.execute("SELECT value FROM meta WHERE key = 'saved_at'").fetchone()
+            state['saved_at'] = row[0] if row else 'inconnue'
+            return state
+        finally:
+            conn.close()
+
+    def counts(self):
+        """Nombre de lignes par table"""
+        conn = self.connect()
+        try:
+            return {table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                    for table in ('players', 'entries', 'injuries')}
+        finally:
+            conn.close()
+
+def migrate_local_storage(to_sqlite):
+    """
+    Bascule le stockage local entre JSON (DATA_FILE + journal) et SQLite, en recopiant l'état
+    sauvegardé. Le fichier JSON est conservé en sauvegarde lors du passage à SQLite.
+    """
+    with get_shared_dataset().file_lock:
+        state = read_local_state() or {'players': [], 'data': {}, 'injuries': [], 'settings': persistable_settings()}
+        saved_at = state.get('saved_at') or datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        if to_sqlite:
+            SqliteStorage(DB_FILE + '.tmp').write_state({**state, 'data': complete_data(state['data'])}, saved_at)
+            os.replace(DB_FILE + '.tmp', DB_FILE)
+            if os.path.exists(JOURNAL_FILE):
+                # Le journal est inclus dans la base ; DATA_FILE le sera aussi à la prochaine bascule
+                commit = FileCommit()
+                commit.write_json(DATA_FILE, {**state, 'data': write_partitions(state['data'], commit), 'saved_at': saved_at},
+                                  separators=(',', ':'))
+                commit.delete(JOURNAL_FILE)
+                commit.commit()
+        else:
+            os.remove(DB_FILE)
+            write_state_file(state)
+    return state
+
+# --- Instantané binaire (format .wts) ---
+SNAPSHOT_MAGIC = b'WTS1'
+# Encodages essayés pour une colonne, du plus compact au plus large : (dtype, échelle)
+# La valeur absente est le maximum du type entier (NaN pour float64).
+SNAPSHOT_ENCODINGS = [('<u1', 1), ('<u1', 2), ('<u1', 10), ('<u2', 10), ('<u2', 100), ('<u4', 1000)]
+
+def _encode_snapshot_column(values):
+    """Meilleur encodage exact d'une colonne (NaN = absent) : (tableau, dtype, échelle)"""
+    known = values[~np.isnan(values)]
+    for dtype, scale in SNAPSHOT_ENCODINGS:
+        sentinel = np.iinfo(dtype).max
+        scaled = np.round(known * scale)
+        if known.size and (scaled.min() < 0 or scaled.max() >= sentinel):
+            continue
+        if not np.array_equal(scaled / scale, known):
+            continue
+        codes = np.full(values.shape, sentinel, dtype=dtype)
+        codes[~np.isnan(values)] = scaled
+        return codes, dtype, scale
+    return values.astype('<f8'), '<f8', 0
+
+def encode_snapshot(state, saved_at=None, source=None, day_hashes=False):
+    """
+    État {players, data, injuries, settings} -> instantané binaire.
+
+    Une ligne par entrée, dans l'ordre d'origine : index de date et de joueur (dictionnaire
+    des noms) puis une colonne de largeur fixe par métrique (entier mis à l'échelle, valeur
+    absente = maximum du type). Tout ce qui ne tient pas dans ces colonnes (remarque, valeur
+    non flottante, clé inconnue) est conservé tel quel dans une section JSON `extras`.
+    day_hashes=True ajoute l'empreinte de chaque date (section_hash) à l'en-tête.
+    """
+    dates = list(state['data'].keys())
+    names, name_index = [], {}
+    date_idx, name_idx, extras = [], [], []
+    columns = {key: [] for key in STORE_KEYS}
+    for d_idx, date_key in enumerate(dates):
+        for e in state['data'][date_key]:
+            name = e.get('name')
+            if name not in name_index:
+                name_index[name] = len(names)
+                names.append(name)
+            extra = {}
+            for key, val in e.items():
+                if key == 'name':
+                    continue
+                if key not in columns or type(val) is not float or val != val:
+                    extra[key] = val
+            for key, col in columns.items():
+                val = e.get(key)
+                col.append(val if type(val) is float and val == val and key not in extra else np.nan)
+            if extra or 'name' not in e:
+                extras.append([len(date_idx), extra, 'name' in e])
+            date_idx.append(d_idx)
+            name_idx.append(name_index[name])
+    
+    arrays = [('date_idx', np.asarray(date_idx, dtype='<u4'), 0),
+              ('name_idx', np.asarray(name_idx, dtype='<u4'), 0)]
+    for key, col in columns.items():
+        codes, dtype, scale = _encode_snapshot_column(np.asarray(col, dtype=float))
+        arrays.append((key, codes, scale))
+    extras_bytes = json.dumps(extras, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+    
+    # Disposition : préfixe (magic, position et taille de l'en-tête), tableaux alignés sur 8 octets,
+    # extras, puis en-tête JSON (dates, noms, joueurs, blessures, paramètres, décalages)
+    chunks, offset, layout = [], 16, {}
+    for name, arr, scale in arrays:
+        layout[name] = [offset, arr.dtype.str, scale]
+        padded = arr.tobytes() + b'\0' * (-arr.nbytes % 8)
+        chunks.append(padded)
+        offset += len(padded)
+    header = {
+        'version': 1,
+        'saved_at': saved_at or state.get('saved_at'),
+        'source': source,
+        'n_entries': len(date_idx),
+        'dates': dates,
+        'names': names,
+        'players': state['players'],
+        'injuries': state['injuries'],
+        'settings': state['settings'],
+        'arrays': layout,
+        'extras': [offset, len(extras_bytes)],
+    }
+    if day_hashes:
+        header['day_hashes'] = [section_hash(state['data'][d]) for d in dates]
+    header_bytes = json.dumps(header, ensure_ascii=False, separators=(',', ':'), default=str).encode('utf-8')
+    prefix = SNAPSHOT_MAGIC + struct.pack('<QI', offset + len(extras_bytes), len(header_bytes))
+    return b''.join([prefix] + chunks + [extras_bytes, header_bytes])
+
+class BinarySnapshot:
+    """
+    Lecture d'un instantané binaire, en mémoire ou projeté (mmap) depuis un fichier :
+    les colonnes sont des vues numpy sur le tampon, sans copie ni dict par entrée.
+    """
+
+    def __init__(self, buffer):
+        if bytes(buffer[:4]) != SNAPSHOT_MAGIC:
+            raise ValueError("Format d'instantané inconnu")
+        header_offset, header_len = struct.unpack('<QI', bytes(buffer[4:16]))
+        self.buffer = buffer
+        self.header = json.loads(bytes(buffer[header_offset:header_offset + header_len]).decode('utf-8'))
+        self.dates = self.header['dates']
+        self.names = self.header['names']
+        self.n = self.header['n_entries']
+
+    @classmethod
+    def open(cls, path):
+        """Projette le fichier en mémoire (les pages ne sont lues qu'à l'accès) ; à fermer (with ou close)"""
+        with open(path, 'rb') as f:
+            return cls(mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ))
+
+    def close(self):
+        """Libère la projection du fichier (sans effet pour un tampon en mémoire)"""
+        if isinstance(self.buffer, mmap.mmap):
+            try:
+                self.buffer.close()
+            except BufferError:
+                # Des vues numpy sur la projection existent encore : libérée avec elles
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def array(self, name):
+        offset, dtype, _ = self.header['arrays'][name]
+        return np.frombuffer(self.buffer, dtype=dtype, count=self.n, offset=offset)
+
+    def column(self, key, start=0, stop=None):
+        """Colonne (ou lignes start:stop) décodée en float64 (NaN si absente ou conservée dans les extras)"""
+        _, dtype, scale = self.header['arrays'][key]
+        codes = self.array(key)[start:stop]
+        if not scale:
+            return codes.astype(float)
+        values = codes / scale
+        values[codes == np.iinfo(dtype).max] = np.nan
+        return values
+
+    def extras(self):
+        offset, length = self.header['extras']
+        return json.loads(bytes(self.buffer[offset:offset + length]).decode('utf-8'))
+
+    def entries(self, start, stop, extras):
+        """Entrées (dicts) des lignes start:stop ; `extras` : {ligne: (extra, a_un_nom)}"""
+        names = self.array('name_idx')[start:stop].tolist()
+        columns = [self.column(key, start, stop).tolist() for key in STORE_KEYS]
+        entries = []
+        for r, i in enumerate(range(start, stop)):
+            entry = {'name': self.names[names[r]]}
+            for key, col in zip(STORE_KEYS, columns):
+                if col[r] == col[r]:
+                    entry[key] = col[r]
+            if i in extras:
+                extra, has_name = extras[i]
+                entry.update(extra)
+                if not has_name:
+                    del entry['name']
+            entries.append(entry)
+        return entries
+
+    def to_state(self, lazy=False):
+        """
+        Reconstruit l'état {players, data, injuries, settings, saved_at} (dicts Python).
+        lazy=True : data est un SnapshotDays, entrées construites date par date au premier accès.
+        """
+        if lazy:
+            return {
+                'players': self.header['players'],
+                'data': SnapshotDays(self),
+                'injuries': self.header['injuries'],
+                'settings': self.header['settings'],
+                'saved_at': self.header.get('saved_at'),
+            }
+        columns = [self.column(key) for key in STORE_KEYS]
+        present = np.zeros(self.n, dtype=np.int64)
+        for k, col in enumerate(columns):
+            present |= (~np.isnan(col)).astype(np.int64) << k
+        names = np.array(self.names + [None], dtype=object)[self.array('name_idx')]
+        # Entrées construites par groupe de métriques renseignées (même jeu de clés)
+        entries = [None] * self.n
+        for pattern in np.unique(present).tolist():
+            rows = np.flatnonzero(present == pattern)
+            keys = ['name'] + [key for k, key in enumerate(STORE_KEYS) if pattern >> k & 1]
+            values = [names[rows].tolist()] + [col[rows].tolist() for k, col in enumerate(columns) if pattern >> k & 1]
+            for i, vals in zip(rows.tolist(), zip(*values)):
+                entries[i] = dict(zip(keys, vals))
+        for i, extra, has_name in self.extras():
+            entries[i].update(extra)
+            if not has_name:
+                del entries[i]['name']
+        data = {d: [] for d in self.dates}
+        day_lists = [data[d] for d in self.dates]
+        for d_idx, entry in zip(self.array('date_idx').tolist(), entries):
+            day_lists[d_idx].append(entry)
+        return {
+            'players': self.header['players'],
+            'data': data,
+            'injuries': self.header['injuries'],
+            'settings': self.header['settings'],
+            'saved_at': self.header.get('saved_at'),
+        }
+
+_PENDING_DAY = object()  # Entrées d'une date pas encore construites (SnapshotDays)
+
+class SnapshotDays(SeasonData):
+    """
+    SeasonData lu depuis un instantané binaire : toutes les dates sont connues tout de suite,
+    les entrées d'une date ne sont construites qu'au premier accès (d[date], get, pop).
+    items(), values(), copy() et les comparaisons construisent d'abord les dates restantes.
+    Tant qu'une date n'est pas construite, son empreinte est celle de l'instantané.
+    La projection du fichier reste ouverte jusqu'à ce que toutes les dates soient
+    construites, ou jusqu'à release() quand la version partagée est remplacée.
+    """
+
+    def __init__(self, snapshot, archived=None):
+        super().__init__(dict.fromkeys(snapshot.dates, _PENDING_DAY), archived=archived)
+        self.snapshot = snapshot
+        self.lock = threading.Lock()
+        # Lignes écrites date par date : date_idx est croissant
+        bounds = np.searchsorted(snapshot.array('date_idx'), np.arange(len(snapshot.dates) + 1)).tolist()
+        self.rows = {d: (bounds[i], bounds[i + 1]) for i, d in enumerate(snapshot.dates)}
+        self.hashes = dict(zip(snapshot.dates, snapshot.header.get('day_hashes') or []))
+        self._extras = None
+        self._pending = len(snapshot.dates)
+        if not self._pending:
+            snapshot.close()
+
+    def _build(self, date_key):
+        with self.lock:
+            entries = dict.__getitem__(self, date_key)
+            if entries is _PENDING_DAY:
+                if self._extras is None:
+                    self._extras = {i: (extra, has_name) for i, extra, has_name in self.snapshot.extras()}
+                entries = self.snapshot.entries(*self.rows[date_key], self._extras)
+                dict.__setitem__(self, date_key, entries)
+                self._pending -= 1
+                if not self._pending:
+                    # Plus rien à lire dans le fichier
+                    self.snapshot.close()
+            return entries
+
+    def __getitem__(self, date_key):
+        entries = dict.__getitem__(self, date_key)
+        return self._build(date_key) if entries is _PENDING_DAY else entries
+
+    def __iter__(self):
+        # Redéfini pour que dict(d), {**d} et update(d) passent par keys() et __getitem__
+        return dict.__iter__(self)
+
+    def get(self, date_key, default=None):
+        return self[date_key] if date_key in self else default
+
+    def setdefault(self, date_key, default=None):
+        return self[date_key] if date_key in self else dict.setdefault(self, date_key, default)
+
+    def pop(self, date_key, *default):
+        if date_key in self:
+            self[date_key]
+        return dict.pop(self, date_key, *default)
+
+    def pending_hashes(self):
+        """{date: empreinte} des dates pas encore construites"""
+        return {d: h for d, h in self.hashes.items() if dict.get(self, d) is _PENDING_DAY}
+
+    def materialize(self):
+        """Construit les entrées de toutes les dates"""
+        for date_key in list(dict.keys(self)):
+            self[date_key]
+        return self
+
+    def release(self):
+        """Construit les dates restantes et ferme la projection (sessions encore sur cet objet)"""
+        self.materialize()
+        self.snapshot.close()
+
+    def items(self):
+        return dict.items(self.materialize())
+
+    def values(self):
+        return dict.values(self.materialize())
+
+    def popitem(self):
+        return dict.popitem(self.materialize())
+
+    def copy(self):
+        return SeasonData(self.items(), archived=self.archived)
+
+    def __eq__(self, other):
+        if isinstance(other, SnapshotDays):
+            other.materialize()
+        return dict.__eq__(self.materialize(), other)
+
+    def __ne__(self, other):
+        result = self.__eq__(other)
+        return result if result is NotImplemented else not result
+
+    __hash__ = None
+
+    def __or__(self, other):
+        return dict(self) | other
+
+    def __repr__(self):
+        return dict.__repr__(self.materialize())
+
+    def __reduce__(self):
+        return SeasonData, (dict(self.items()), self.archived)
+
+def snapshot_from_json(json_content):
+    """Export JSON (export_data_to_json) -> instantané binaire"""
+    loaded = json.loads(json_content)
+    state = {
+        'players': loaded.get('players', []),
+        'data': loaded.get('data', {}),
+        'injuries': loaded.get('injuries', []),
+        'settings': loaded.get('settings', {}),
+    }
+    return encode_snapshot(state, loaded.get('saved_at') or loaded.get('exported_at'))
+
+def snapshot_to_json(buffer):
+    """Instantané binaire -> JSON au format d'export_data_to_json (lisible par import_data_from_json)"""
+    state = BinarySnapshot(buffer).to_state()
+    return json.dumps({
+        'players': state['players'],
+        'data': state['data'],
+        'injuries': state['injuries'],
+        'settings': state['settings'],
+        'exported_at': state['saved_at'] or datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+    }, ensure_ascii=False, indent=2, default=str)
+
+def file_sha256(path):
+    """Empreinte SHA-256 du contenu d'un fichier"""
+    h = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+def read_data_file(snapshots=None):
+    """
+    Contenu de DATA_FILE, lu depuis sa copie binaire si elle correspond encore au fichier :
+    même taille et date de modification, ou à défaut même empreinte SHA-256 (fichier copié
+    ou restauré à l'identique). La copie n'est réécrite que si le contenu a changé.
+    Depuis la copie, les entrées sont construites à la demande (SnapshotDays, qui garde la
+    projection du fichier) et la copie est ajoutée à `snapshots` (store colonnaire construit
+    sans passer par les dicts).
+    """
+    stat = os.stat(DATA_FILE)
+    signature = [stat.st_size, stat.st_mtime_ns]
+    source_hash = None
+    cached = None
+    try:
+        cached = BinarySnapshot.open(SNAPSHOT_CACHE_FILE)
+        source = cached.header.get('source')
+        source = source if isinstance(source, dict) else {}
+        if source.get('signature') != signature:
+            source_hash = file_sha256(DATA_FILE)
+        if source.get('signature') == signature or source.get('hash') == source_hash:
+            state = cached.to_state(lazy=True)
+            if snapshots is not None:
+                snapshots.append(cached)
+            return state
+    except (OSError, ValueError, KeyError):
+        pass
+    if cached is not None:
+        cached.close()
+    with open(DATA_FILE, 'rb') as f:
+        raw = f.read()
+    loaded = json.loads(raw)
+    try:
+        state = {k: loaded.get(k, default) for k, default in
+                 (('players', []), ('data', {}), ('injuries', []), ('settings', {}))}
+        source = {'signature': signature, 'hash': hashlib.sha256(raw).hexdigest()}
+        atomic_write(SNAPSHOT_CACHE_FILE, encode_snapshot(state, loaded.get('saved_at', 'inconnue'), source=source, day_hashes=True))
+    except Exception:
+        pass
+    return loaded
+
 def load_data_from_file():
     """Charge les données depuis un fichier JSON"""
     try:
-        if not os.path.exists(DATA_FILE):
+        loaded = read_local_state()
+        if loaded is None:
             return False, "Aucune sauvegarde trouvée"
         
-        with open(DATA_FILE, 'r', encoding='utf-8') as f:
-            loaded = json.load(f)
-        
         st.session_state.players = loaded.get('players', [])
         st.session_state.data = loaded.get('data', {})
         st.session_state.injuries = loaded.get('injuries', [])
-        if 'settings' in loaded:
-            st.session_state.settings.update(loaded['settings'])
+        st.session_state.settings.update(loaded['settings'])
         
         saved_at = loaded.get('saved_at', 'inconnue')
         return True, f"Données chargées ({len(st.session_state.players)} joueurs, {len(st.session_state.data)} jours) - Sauvegarde du {saved_at}"
@@ -507,36 +2227,382 @@ def load_data_from_file():
 
 def export_data_to_json():
     """Exporte les données en JSON pour téléchargement"""
-    data_to_export = {
-        'players': list(st.session_state.players) if st.session_state.players else [],
-        'data': dict(st.session_state.data) if st.session_state.data else {},
-        'injuries': list(st.session_state.injuries) if st.session_state.injuries else [],
-        'settings': {k: v for k, v in st.session_state.settings.items() if not k.startswith('cloud_') and isinstance(v, (str, int, float, bool, list, dict, type(None)))},
-        'exported_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-    }
-    return json.dumps(data_to_export, ensure_ascii=False, indent=2, default=str)
+    return ''.join(iter_export_json(st.session_state.players, st.session_state.data,
+                                    st.session_state.injuries, persistable_settings()))
 
 def import_data_from_json(json_content):
     """Importe les données depuis un fichier JSON uploadé"""
+    return import_backup(iter_backup_json(io.BytesIO(json_content.encode('utf-8'))))
+
+# --- Backups en flux (une section / une date à la fois) ---
+BACKUP_READ_CHUNK = 1 << 16
+_JSON_WHITESPACE = re.compile(r'\s*')
+
+def iter_backup_dates(data):
+    """(date, entrées) de tout l'historique par ordre chronologique, une saison archivée relue à la fois"""
+    archived = getattr(data, 'archived', None) or {}
+    by_season = {}
+    for date_key in data:
+        by_season.setdefault(season_of(date_key) or '', []).append(date_key)
+    for season in sorted(set(by_season) | set(archived)):
+        dates = {d: data[d] for d in by_season.get(season, [])}
+        if season in archived:
+            dates = {**read_partition(season), **dates}
+        for date_key in sorted(dates):
+            yield date_key, dates[date_key]
+
+def iter_export_json(players, data, injuries, settings, exported_at=None):
+    """
+    Export JSON (format d'export_data_to_json) produit morceau par morceau : une ligne
+    par section et par date, sans construire le document ni copier l'historique.
+    """
+    def dumps(value):
+        return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=str)
+    yield '{\n"players": ' + dumps(list(players or [])) + ',\n"data": {'
+    separator = '\n'
+    for date_key, entries in iter_backup_dates(data or {}):
+        yield separator + dumps(date_key) + ': ' + dumps(entries)
+        separator = ',\n'
+    yield '\n},\n"injuries": ' + dumps(list(injuries or [])) + ',\n"settings": ' + dumps(settings)
+    yield ',\n"exported_at": ' + dumps(exported_at or datetime.now().strftime('%Y-%m-%d %H:%M:%S')) + '\n}\n'
+
+def export_backup_file(chunks):
+    """
+    Écrit les morceaux d'un export dans un fichier temporaire et le retourne (non bufferisé,
+    lisible par st.download_button) : le document n'existe jamais en entier sous forme de str.
+    """
+    f = tempfile.TemporaryFile(buffering=0)
+    for chunk in chunks:
+        f.write(chunk.encode('utf-8') if isinstance(chunk, str) else chunk)
+    f.seek(0)
+    return f
+
+class BackupReader:
+    """
+    Lecture incrémentale d'un document JSON : le fichier est décodé par blocs et chaque
+    valeur est extraite par JSONDecoder.raw_decode dès qu'elle est complète dans le tampon.
+    """
+
+    def __init__(self, fileobj, total=None):
+        self.file = fileobj
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.json = json.JSONDecoder()
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.read_bytes = 0
+        self.total = total
+
+    def _fill(self):
+        """Ajoute un bloc au tampon (en retirant la partie déjà lue) ; False en fin de fichier"""
+        if self.eof:
+            return False
+        chunk = self.file.read(BACKUP_READ_CHUNK)
+        self.read_bytes += len(chunk)
+        self.eof = not chunk
+        self.buffer = self.buffer[self.pos:] + self.decoder.decode(chunk, final=self.eof)
+        self.pos = 0
+        return True
+
+    def peek(self):
+        """Prochain caractère significatif ('' en fin de fichier)"""
+        while True:
+            self.pos = _JSON_WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer) or not self._fill():
+                return self.buffer[self.pos:self.pos + 1]
+
+    def expect(self, char):
+        found = self.peek()
+        if found != char:
+            raise ValueError(f"JSON invalide : '{char}' attendu, '{found or 'fin du fichier'}' trouvé")
+        self.pos += 1
+
+    def skip(self, char):
+        """Consomme `char` s'il est le prochain caractère ; retourne True dans ce cas"""
+        if self.peek() == char:
+            self.pos += 1
+            return True
+        return False
+
+    def value(self):
+        """Prochaine valeur JSON complète"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.json.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # Un nombre en fin de tampon peut continuer dans le bloc suivant
+            if end == len(self.buffer) and self._fill():
+                continue
+            self.pos = end
+            return value
+
+    def progress(self):
+        return min(1.0, self.read_bytes / self.total) if self.total else 0.0
+
+def check_backup_section(kind, value, date_key=None):
+    """Valide une section de backup ; lève ValueError avec la section fautive"""
+    if kind in ('players', 'injuries'):
+        valid = isinstance(value, list) and all(isinstance(item, dict) for item in value)
+    elif kind == 'settings':
+        valid = isinstance(value, dict)
+    else:
+        valid = isinstance(date_key, str) and isinstance(value, list) and all(isinstance(e, dict) for e in value)
+    if not valid:
+        raise ValueError(f"Section {date_key if kind == 'date' else kind} invalide")
+    return value
+
+def iter_backup_json(fileobj, total=None):
+    """
+    Sections d'un export JSON lues au fil du fichier : ((type, clé, valeur), avancement) avec
+    type 'players', 'injuries', 'settings' ou 'date' (clé = date), une date à la fois.
+    Chaque section est validée dès sa lecture ; les clés inconnues sont ignorées.
+    """
+    reader = BackupReader(fileobj, total)
+    reader.expect('{')
+    if reader.skip('}'):
+        return
+    while True:
+        key = reader.value()
+        reader.expect(':')
+        if key == 'data':
+            reader.expect('{')
+            if not reader.skip('}'):
+                while True:
+                    date_key = reader.value()
+                    reader.expect(':')
+                    entries = check_backup_section('date', reader.value(), date_key)
+                    yield ('date', date_key, entries), reader.progress()
+                    if not reader.skip(','):
+                        break
+                reader.expect('}')
+        elif key in ('players', 'injuries', 'settings'):
+            yield (key, None, check_backup_section(key, reader.value())), reader.progress()
+        else:
+            reader.value()
+        if not reader.skip(','):
+            break
+    reader.expect('}')
+
+def iter_backup_snapshot(buffer):
+    """Mêmes sections qu'iter_backup_json depuis un instantané binaire (.wts)"""
+    state = BinarySnapshot(buffer).to_state()
+    yield ('players', None, check_backup_section('players', state['players'])), 0.0
+    total = len(state['data']) or 1
+    for i, (date_key, entries) in enumerate(state['data'].items()):
+        yield ('date', date_key, entries), (i + 1) / total
+    yield ('injuries', None, check_backup_section('injuries', state['injuries'])), 1.0
+    yield ('settings', None, check_backup_section('settings', state['settings'])), 1.0
+
+class SeasonSpool:
+    """
+    Dates d'un import regroupées par saison : la saison en cours reste en mémoire, chaque
+    saison terminée est écrite dans PARTITION_DIR en fichier en attente (FileCommit) et n'est
+    relue que si elle fait finalement partie des saisons récentes (DATA_FILE).
+    """
+
+    def __init__(self):
+        self.commit = FileCommit()
+        self.hashes = {}     # {saison: {date: empreinte}} de tout le backup
+        self.undated = {}    # Clés qui ne sont pas des dates : toujours dans DATA_FILE
+        self.current = None
+        self.dates = {}
+
+    def add(self, date_key, entries):
+        season = season_of(date_key)
+        if season is None:
+            self.undated[date_key] = entries
+            return
+        if season != self.current:
+            self._spill()
+            self.current, self.dates = season, self._take_pending(season)
+        self.dates[date_key] = entries
+        self.hashes.setdefault(season, {})[date_key] = section_hash(entries)
+
+    def day_count(self):
+        return len(self.undated) + sum(len(hashes) for hashes in self.hashes.values())
+
+    def _take_pending(self, season):
+        """Contenu déjà écrit d'une saison (backup non trié ou saison récente), retiré du commit"""
+        path = partition_path(season) + '.pending'
+        if not any(pending == path for pending, _ in self.commit.replace):
+            return {}
+        with open(path, 'r', encoding='utf-8') as f:
+            content = json.load(f)
+        self.commit.replace = [pair for pair in self.commit.replace if pair[0] != path]
+        os.remove(path)
+        return content
+
+    def _spill(self):
+        if self.current is None:
+            return
+        os.makedirs(PARTITION_DIR, exist_ok=True)
+        self.commit.write_json(partition_path(self.current), self.dates, separators=(',', ':'))
+        self.current, self.dates = None, {}
+
+    def finish(self, players, injuries, settings):
+        """Valide l'import (DATA_FILE, saisons archivées, index) ; retourne les données de la session"""
+        self._spill()
+        live = live_seasons([d for hashes in self.hashes.values() for d in hashes])
+        live_data = dict(self.undated)
+        for season in sorted(live & set(self.hashes)):
+            live_data.update(self._take_pending(season))
+        index = {season: hashes for season, hashes in self.hashes.items() if season not in live}
+        for season in set(read_partition_index()) - set(index):
+            self.commit.delete(partition_path(season))
+        if index:
+            self.commit.write_json(PARTITION_INDEX_FILE, {'seasons': index}, separators=(',', ':'))
+        else:
+            self.commit.delete(PARTITION_INDEX_FILE)
+        data = SeasonData(sorted(live_data.items()), archived=index)
+        self.commit.write_json(DATA_FILE, {
+            'players': players, 'data': data, 'injuries': injuries, 'settings': settings,
+            'saved_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        }, separators=(',', ':'))
+        self.commit.delete(JOURNAL_FILE)
+        self.commit.commit()
+        return data
+
+    def abort(self):
+        for pending, _ in self.commit.replace:
+            if os.path.exists(pending):
+                os.remove(pending)
+
+def import_backup(sections, progress=None):
+    """
+    Restaure un backup à partir de ses sections (iter_backup_json / iter_backup_snapshot).
+
+    En stockage JSON, les dates passent par un SeasonSpool : seule la saison en cours de
+    lecture est en mémoire, et la session ne garde que les saisons récentes (les autres sont
+    archivées). En SQLite, l'historique est réuni puis enregistré par save_data_to_file.
+    `progress(fraction)` est appelé au fil de la lecture.
+    """
+    spool = None if use_sqlite() else SeasonSpool()
+    players, injuries, settings, data = [], [], {}, {}
     try:
-        loaded = json.loads(json_content)
-        st.session_state.players = loaded.get('players', [])
-        st.session_state.data = loaded.get('data', {})
-        st.session_state.injuries = loaded.get('injuries', [])
-        if 'settings' in loaded:
-            for k, v in loaded['settings'].items():
-                if not k.startswith('cloud_'):
-                    st.session_state.settings[k] = v
-        # Sauvegarder immédiatement après import
-        save_data_to_file()
-        return True, f"Import réussi: {len(st.session_state.players)} joueurs, {len(st.session_state.data)} jours"
+        with get_shared_dataset().file_lock:
+            last_reported = -1.0
+            for (kind, key, value), fraction in sections:
+                if kind == 'players':
+                    players = value
+                elif kind == 'injuries':
+                    injuries = value
+                elif kind == 'settings':
+                    settings = {k: v for k, v in value.items() if not k.startswith('cloud_')}
+                elif spool is None:
+                    data[key] = value
+                else:
+                    spool.add(key, value)
+                if progress and fraction - last_reported >= 0.01:
+                    progress(fraction)
+                    last_reported = fraction
+            if spool is not None:
+                # Paramètres de la session modifiés seulement une fois l'import validé sur disque
+                data = spool.finish(players, injuries, persistable_settings({**st.session_state.settings, **settings}))
     except Exception as e:
+        if spool is not None:
+            spool.abort()
         return False, f"Erreur: {str(e)}"
+    
+    st.session_state.settings.update(settings)
+    st.session_state.players = players
+    st.session_state.data = data
+    st.session_state.injuries = injuries
+    if spool is None:
+        success, msg = save_data_to_file()
+        return (True, f"Import réussi: {len(players)} joueurs, {len(data)} jours") if success else (False, msg)
+    # Déjà écrit sur disque : empreintes de référence pour les prochaines sauvegardes
+    hashes = ContentHashes(players, data, injuries, persistable_settings())
+    hashes.persisted = hashes.full_digest()
+    st.session_state.content_hashes = hashes
+    publish_session_data()
+    st.session_state.last_save_time = datetime.now()
+    cloud_save()
+    return True, f"Import réussi: {len(players)} joueurs, {spool.day_count()} jours"
+
+# ==================== CLIENT HTTP ====================
+HTTP_CONNECT_TIMEOUT = 10     # Secondes pour établir la connexion
+HTTP_READ_TIMEOUT = 30        # Secondes d'attente de la réponse (par défaut)
+HTTP_POOL_SIZE = 8            # Connexions gardées ouvertes par hôte
+HTTP_RETRIES = 2              # Réessais des GET (erreurs réseau, 429, 5xx)
+
+class HttpClient:
+    """
+    Client HTTP unique du processus pour Google Sheets, Apps Script et JSONBlob.
+
+    Les connexions keep-alive sont réutilisées (un pool borné par hôte) : seul le premier
+    appel vers un hôte paie la résolution DNS et la négociation TLS. Les GET sont réessayés
+    avec un délai croissant ; les POST ne le sont jamais (non idempotents, le worker de
+    synchronisation gère leurs échecs). Les statistiques par hôte alimentent le diagnostic.
+    """
+
+    def __init__(self):
+        self.session = requests.Session()
+        retry = Retry(total=HTTP_RETRIES, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=frozenset({'GET'}), raise_on_status=False)
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_SIZE, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.lock = threading.Lock()
+        self.stats = {}               # hôte -> {'requests', 'errors', 'bytes', 'seconds'}
+
+    def request(self, method, url, timeout=HTTP_READ_TIMEOUT, **kwargs):
+        """Requête via le pool ; `timeout` est le délai de lecture"""
+        host = urllib.parse.urlsplit(url).netloc
+        start = time.perf_counter()
+        try:
+            response = self.session.request(method, url, timeout=(HTTP_CONNECT_TIMEOUT, timeout), **kwargs)
+        except Exception:
+            self._record(host, start, error=True)
+            raise
+        self._record(host, start, size=len(response.content), error=response.status_code >= 400)
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def _record(self, host, start, size=0, error=False):
+        with self.lock:
+            stats = self.stats.setdefault(host, {'requests': 0, 'errors': 0, 'bytes': 0, 'seconds': 0.0})
+            stats['requests'] += 1
+            stats['errors'] += int(error)
+            stats['bytes'] += size
+            stats['seconds'] += time.perf_counter() - start
+
+    def host_stats(self):
+        """Statistiques par hôte pour l'affichage (DataFrame)"""
+        with self.lock:
+            rows = [{'Hôte': host, 'Requêtes': s['requests'], 'Erreurs': s['errors'],
+                     'Ko reçus': round(s['bytes'] / 1024, 1),
+                     'Temps moyen (ms)': round(1000 * s['seconds'] / s['requests']) if s['requests'] else 0}
+                    for host, s in self.stats.items()]
+        return pd.DataFrame(rows)
+
+@st.cache_resource
+def get_http_client():
+    """Client HTTP partagé par les sessions et les threads de synchronisation"""
+    return HttpClient()
+
+GSHEET_CSV_URL = "https://docs.google.com/spreadsheets/d/{doc_id}/gviz/tq?tqx=out:csv&sheet={sheet}"
+
+def read_sheet_csv(doc_id, sheet_name):
+    """Télécharge un onglet Google Sheets au format CSV (via le client partagé)"""
+    csv_url = GSHEET_CSV_URL.format(doc_id=doc_id, sheet=urllib.parse.quote(sheet_name))
+    response = get_http_client().get(csv_url, timeout=60)
+    response.raise_for_status()
+    return pd.read_csv(io.StringIO(response.content.decode('utf-8')), header=None)
 
 # ==================== CLOUD STORAGE AUTOMATIQUE ====================
 # Utilise JSONBlob - gratuit, pas d'inscription, jamais de pause !
 # L'ID est stocké dans Streamlit Secrets pour survivre aux redémarrages
 CLOUD_ID_FILE = "cloud_id.txt"
+JSONBLOB_API_URL = "https://jsonblob.com/api/jsonBlob"
 
 def get_cloud_id():
     """Récupère l'ID cloud (priorité: Secrets > Session > Fichier)"""
@@ -571,8 +2637,7 @@ def save_cloud_id(blob_id):
     """Sauvegarde l'ID cloud"""
     st.session_state.settings['cloud_blob_id'] = blob_id
     try:
-        with open(CLOUD_ID_FILE, 'w') as f:
-            f.write(blob_id)
+        atomic_write(CLOUD_ID_FILE, blob_id)
     except:
         pass
 
@@ -583,95 +2648,92 @@ def is_cloud_id_in_secrets():
     except:
         return False
 
-def save_to_cloud():
-    """Sauvegarde automatique dans le cloud - Version sécurisée"""
+def build_cloud_json(app_version):
+    """Sérialise l'état complet pour le cloud, saisons archivées comprises (dans le thread de la requête)"""
+    data_to_save = {
+        'players': list(st.session_state.players) if st.session_state.players else [],
+        'data': complete_data(st.session_state.data),
+        'injuries': list(st.session_state.injuries) if st.session_state.injuries else [],
+        'settings': persistable_settings(),
+        'saved_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'app_version': app_version
+    }
+    return json.dumps(data_to_save, ensure_ascii=False, default=str)
+
+def upload_to_jsonblob(json_data, blob_id, id_from_secrets):
+    """
+    Envoie l'état sérialisé vers JSONBlob, sans accès à st.session_state (exécutable hors du thread Streamlit).
+    Retourne (succès, message, nouvel_id_blob ou None).
+    """
     try:
-        # Préparer les données de manière sécurisée
-        data_to_save = {
-            'players': list(st.session_state.players) if st.session_state.players else [],
-            'data': dict(st.session_state.data) if st.session_state.data else {},
-            'injuries': list(st.session_state.injuries) if st.session_state.injuries else [],
-            'settings': {k: v for k, v in st.session_state.settings.items() if not k.startswith('cloud_') and isinstance(v, (str, int, float, bool, list, dict, type(None)))},
-            'saved_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'app_version': 'v17'
-        }
-        
-        # Sérialiser avec gestion d'erreur
-        try:
-            json_data = json.dumps(data_to_save, ensure_ascii=False, default=str)
-        except Exception as json_err:
-            return False, f"Erreur JSON: {str(json_err)}"
-        
         headers = {'Content-Type': 'application/json', 'Accept': 'application/json'}
         
-        blob_id = get_cloud_id()
-        id_from_secrets = is_cloud_id_in_secrets()
-        
         if blob_id:
-            # Mettre à jour le blob existant avec retry
-            url = f"https://jsonblob.com/api/jsonBlob/{blob_id}"
+            # Mettre à jour le blob existant (les réessais sont gérés par le worker de synchronisation)
+            url = f"{JSONBLOB_API_URL}/{blob_id}"
+            response = get_http_client().request('PUT', url, data=json_data.encode('utf-8'), headers=headers, timeout=90)
             
-            # Essayer jusqu'à 3 fois
-            last_error = None
-            for attempt in range(3):
-                try:
-                    response = requests.put(url, data=json_data.encode('utf-8'), headers=headers, timeout=90)
-                    
-                    if response.status_code == 200:
-                        st.session_state.last_cloud_save = datetime.now()
-                        return True, "✅ Sauvegardé"
-                    elif response.status_code == 404:
-                        # SÉCURITÉ : Si l'ID vient des Secrets, NE JAMAIS créer de nouveau blob
-                        if id_from_secrets:
-                            return False, "⚠️ Blob introuvable. Contactez l'admin pour vérifier le CLOUD_BLOB_ID dans les Secrets."
-                        else:
-                            # ID local seulement, on peut créer un nouveau blob
-                            blob_id = None
-                            break
-                    else:
-                        last_error = f"Code {response.status_code}"
-                        if attempt < 2:
-                            import time
-                            time.sleep(2)  # Attendre avant retry
-                except requests.exceptions.Timeout:
-                    last_error = "Timeout"
-                    if attempt < 2:
-                        import time
-                        time.sleep(2)
-                except Exception as e:
-                    last_error = str(e)
-                    if attempt < 2:
-                        import time
-                        time.sleep(2)
-            
-            if blob_id and last_error:
-                return False, f"Erreur après 3 essais: {last_error}"
+            if response.status_code == 200:
+                return True, "✅ Sauvegardé", None
+            elif response.status_code == 404:
+                # SÉCURITÉ : Si l'ID vient des Secrets, NE JAMAIS créer de nouveau blob
+                if id_from_secrets:
+                    return False, "⚠️ Blob introuvable. Contactez l'admin pour vérifier le CLOUD_BLOB_ID dans les Secrets.", None
+                # ID local seulement, on peut créer un nouveau blob
+                blob_id = None
+            else:
+                return False, f"Erreur: Code {response.status_code}", None
         
         # Créer un nouveau blob SEULEMENT si pas d'ID existant (première utilisation)
         if not blob_id:
             # Vérifier qu'on n'a vraiment pas d'ID dans les Secrets
             if id_from_secrets:
-                return False, "⚠️ ID dans Secrets mais blob non trouvé. Vérifiez la configuration."
+                return False, "⚠️ ID dans Secrets mais blob non trouvé. Vérifiez la configuration.", None
             
-            url = "https://jsonblob.com/api/jsonBlob"
-            response = requests.post(url, data=json_data.encode('utf-8'), headers=headers, timeout=90)
+            url = JSONBLOB_API_URL
+            response = get_http_client().post(url, data=json_data.encode('utf-8'), headers=headers, timeout=90)
             
             if response.status_code == 201:
                 location = response.headers.get('Location', '')
                 if location:
-                    new_blob_id = location.split('/')[-1]
-                    save_cloud_id(new_blob_id)
-                    st.session_state.last_cloud_save = datetime.now()
-                    st.session_state.new_cloud_id_created = new_blob_id
-                    return True, "✅ Cloud créé - Ajoutez l'ID aux Secrets!"
-            return False, f"Erreur création: {response.status_code}"
+                    return True, "✅ Cloud créé - Ajoutez l'ID aux Secrets!", location.split('/')[-1]
+            return False, f"Erreur création: {response.status_code}", None
         
-        return True, "✅ Sauvegardé"
+        return True, "✅ Sauvegardé", None
         
     except requests.exceptions.Timeout:
-        return False, "Timeout - réessayez"
+        return False, "Timeout - réessayez", None
     except Exception as e:
-        return False, f"Erreur: {str(e)}"
+        return False, f"Erreur: {str(e)}", None
+
+def jsonblob_upload_job():
+    """Prépare l'envoi JSONBlob : état et configuration lus maintenant, envoi exécutable plus tard"""
+    try:
+        json_data = build_cloud_json('v17')
+    except Exception as json_err:
+        return None, f"Erreur JSON: {str(json_err)}"
+    blob_id = get_cloud_id()
+    id_from_secrets = bool(is_cloud_id_in_secrets())
+    return (lambda: upload_to_jsonblob(json_data, blob_id, id_from_secrets)), None
+
+def apply_upload_result(success, msg, new_blob_id=None, synced_hashes=None):
+    """Reporte le résultat d'un envoi cloud dans la session (thread Streamlit uniquement)"""
+    if success:
+        st.session_state.last_cloud_save = datetime.now()
+        if new_blob_id:
+            save_cloud_id(new_blob_id)
+            st.session_state.new_cloud_id_created = new_blob_id
+        if synced_hashes:
+            sync = st.session_state.get('gsheet_sync') if is_gsheet_configured() else None
+            write_sync_marker(synced_hashes[0], sync.version if sync else None, synced_hashes[1], target=cloud_target())
+    return success, msg
+
+def save_to_cloud():
+    """Sauvegarde automatique dans le cloud - Version sécurisée"""
+    job, error = jsonblob_upload_job()
+    if error:
+        return False, error
+    return apply_upload_result(*job())
 
 def load_from_cloud():
     """Charge les données depuis le cloud"""
@@ -680,8 +2742,16 @@ def load_from_cloud():
         if not blob_id:
             return False, "Pas de sauvegarde cloud"
         
-        url = f"https://jsonblob.com/api/jsonBlob/{blob_id}"
-        response = requests.get(url, headers={'Accept': 'application/json'}, timeout=30)
+        url = f"{JSONBLOB_API_URL}/{blob_id}"
+        headers = {'Accept': 'application/json'}
+        # ETag du dernier chargement, valable tant que la session n'a rien modifié depuis
+        etag, loaded_hash = st.session_state.get('jsonblob_etag') or (None, None)
+        if etag and loaded_hash == get_content_hashes().digest():
+            headers['If-None-Match'] = etag
+        response = get_http_client().get(url, headers=headers, timeout=30)
+        
+        if response.status_code == 304:
+            return True, "☁️ Déjà à jour (aucune modification dans le cloud)"
         
         if response.status_code == 200:
             loaded = response.json()
@@ -694,20 +2764,17 @@ def load_from_cloud():
                     if not k.startswith('cloud_'):
                         st.session_state.settings[k] = v
             
-            # Sauvegarder localement
-            try:
-                with open(DATA_FILE, 'w', encoding='utf-8') as f:
-                    json.dump({
-                        'players': st.session_state.players,
-                        'data': st.session_state.data,
-                        'injuries': st.session_state.injuries,
-                        'settings': st.session_state.settings,
-                        'saved_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                    }, f, ensure_ascii=False, indent=2)
-            except:
-                pass
+            if response.headers.get('ETag'):
+                st.session_state.jsonblob_etag = (response.headers['ETag'], get_content_hashes().digest())
             
-            return True, f"☁️ Chargé ({len(st.session_state.players)} joueurs, {len(st.session_state.data)} jours)"
+            # Sauvegarder localement (écriture atomique : la sauvegarde précédente reste intacte en cas d'échec)
+            message = f"☁️ Chargé ({len(st.session_state.players)} joueurs, {len(st.session_state.data)} jours)"
+            try:
+                write_snapshot()
+                publish_session_data()
+            except Exception as e:
+                return True, f"{message} - ⚠️ sauvegarde locale impossible: {str(e)}"
+            return True, message
         elif response.status_code == 404:
             return False, "Sauvegarde cloud introuvable"
         else:
@@ -738,7 +2805,10 @@ def get_gsheet_script_url():
 
 def compress_data(data_dict):
     """Compresse les données avec gzip + base64"""
-    json_str = json.dumps(data_dict, ensure_ascii=False, default=str)
+    return compress_json(json.dumps(data_dict, ensure_ascii=False, default=str))
+
+def compress_json(json_str):
+    """Compresse une chaîne JSON avec gzip + base64"""
     compressed = gzip.compress(json_str.encode('utf-8'))
     b64 = base64.b64encode(compressed).decode('ascii')
     return b64
@@ -749,40 +2819,18 @@ def decompress_data(b64_string):
     json_str = gzip.decompress(compressed).decode('utf-8')
     return json.loads(json_str)
 
-def save_to_gsheet():
-    """Sauvegarde les données dans Google Sheets via Apps Script (avec compression)"""
-    script_url = get_gsheet_script_url()
-    if not script_url:
-        return False, "GOOGLE_SCRIPT_URL non configuré"
-    
+def post_to_gsheet(script_url, envelope):
+    """
+    Envoie une enveloppe JSON à Apps Script, sans accès à st.session_state.
+    Retourne (succès, message d'erreur ou None, réponse JSON ou {}).
+    """
     try:
-        data_to_save = {
-            'players': list(st.session_state.players) if st.session_state.players else [],
-            'data': dict(st.session_state.data) if st.session_state.data else {},
-            'injuries': list(st.session_state.injuries) if st.session_state.injuries else [],
-            'settings': {k: v for k, v in st.session_state.settings.items() 
-                        if not k.startswith('cloud_') and isinstance(v, (str, int, float, bool, list, dict, type(None)))},
-            'saved_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-            'app_version': 'v18'
-        }
-        
-        # Compresser les données
-        compressed_b64 = compress_data(data_to_save)
-        
-        # Enveloppe avec flag de compression
-        envelope = {
-            'compressed': True,
-            'data': compressed_b64
-        }
-        
-        json_data = json.dumps(envelope)
-        
         # Google Apps Script redirige les POST - on doit suivre manuellement
-        session = requests.Session()
+        client = get_http_client()
         
-        response = session.post(
+        response = client.post(
             script_url,
-            data=json_data.encode('utf-8'),
+            data=json.dumps(envelope).encode('utf-8'),
             headers={'Content-Type': 'application/json'},
             timeout=120,
             allow_redirects=False
@@ -792,7 +2840,7 @@ def save_to_gsheet():
         if response.status_code in [301, 302, 303, 307, 308]:
             redirect_url = response.headers.get('Location')
             if redirect_url:
-                response = session.get(redirect_url, timeout=30)
+                response = client.get(redirect_url, timeout=30)
         
         if response.status_code == 200:
             response_text = response.text.strip()
@@ -800,35 +2848,207 @@ def save_to_gsheet():
             try:
                 result = response.json()
                 if result.get('success'):
-                    st.session_state.last_cloud_save = datetime.now()
-                    return True, f"✅ Sauvegardé ({len(compressed_b64)//1024} Ko compressé)"
+                    return True, None, result
+                elif result.get('conflict'):
+                    return False, "Versions divergentes", result
                 elif 'error' in result:
-                    return False, f"Erreur: {result.get('error')}"
+                    return False, f"Erreur: {result.get('error')}", result
             except json.JSONDecodeError:
                 pass
             
             if 'success' in response_text.lower():
-                st.session_state.last_cloud_save = datetime.now()
-                return True, f"✅ Sauvegardé ({len(compressed_b64)//1024} Ko compressé)"
+                return True, None, {}
             
-            return False, f"Réponse inattendue: {response_text[:100]}"
+            return False, f"Réponse inattendue: {response_text[:100]}", {}
         else:
-            return False, f"Erreur HTTP: {response.status_code}"
+            return False, f"Erreur HTTP: {response.status_code}", {}
             
     except requests.exceptions.Timeout:
-        return False, "Timeout - réessayez"
+        return False, "Timeout - réessayez", {}
+    except Exception as e:
+        return False, f"Erreur: {str(e)}", {}
+
+GSHEET_PATCHES_PER_SNAPSHOT = 50  # Instantané complet après ce nombre de patchs
+
+class GsheetDeltaSync:
+    """
+    Synchronisation différentielle avec Apps Script.
+
+    Les enregistrements du journal postérieurs à la dernière version acquittée par le script
+    sont envoyés comme un patch versionné (base_version → version). Un instantané complet
+    n'est envoyé que si la version est inconnue (premier envoi, script sans versions),
+    si le serveur signale une divergence, ou tous les GSHEET_PATCHES_PER_SNAPSHOT patchs.
+    `sync()` s'exécute dans le worker et n'accède jamais à st.session_state.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.version = None          # Dernière version acquittée (None : inconnue)
+        self.dirty = []              # (numéro, clé, enregistrement JSON) non encore acquittés
+        self.marked = 0              # Numéro du dernier enregistrement marqué
+        self.full = None             # (JSON complet, numéro du dernier enregistrement qu'il inclut)
+        self.patches_since_full = 0
+        self.last_sent = None        # 'patch' ou 'full', pour le diagnostic
+
+    def add(self, records):
+        """Marque des enregistrements du journal à envoyer (sérialisés immédiatement)"""
+        at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        with self.lock:
+            for record in records:
+                self.marked += 1
+                self.dirty.append((self.marked, journal_record_key(record),
+                                   json.dumps({**record, 'at': at}, ensure_ascii=False, separators=(',', ':'), default=str)))
+
+    def needs_full(self):
+        with self.lock:
+            return self.version is None or self.patches_since_full >= GSHEET_PATCHES_PER_SNAPSHOT
+
+    def needs_resync(self):
+        """Modifications en attente qu'aucun patch ne peut porter (version perdue)"""
+        with self.lock:
+            return self.version is None and self.full is None and bool(self.dirty)
+
+    def set_full(self, json_data):
+        """Programme un instantané complet, qui inclut toutes les modifications marquées jusqu'ici"""
+        with self.lock:
+            self.full = (json_data, self.marked)
+
+    def reset(self, version):
+        """État local identique à la version `version` du serveur"""
+        with self.lock:
+            self.version = version
+            self.dirty = []
+            self.full = None
+            self.patches_since_full = 0
+
+    def _acknowledge(self, last):
+        """Retire les enregistrements envoyés (numéro <= last), y compris si la liste a changé pendant l'envoi"""
+        self.dirty = [item for item in self.dirty if item[0] > last]
+
+    def sync(self, script_url):
+        """Envoie l'instantané en attente puis les modifications restantes en patch"""
+        with self.lock:
+            full = self.full
+        if full:
+            json_data, included = full
+            compressed_b64 = compress_json(json_data)
+            success, error, result = post_to_gsheet(script_url, {'compressed': True, 'data': compressed_b64})
+            if not success:
+                return False, error, None
+            with self.lock:
+                if self.full is full:
+                    self.full = None
+                self._acknowledge(included)
+                self.version = result.get('version')
+                self.patches_since_full = 0
+                self.last_sent = 'full'
+            message = f"✅ Sauvegardé ({len(compressed_b64)//1024} Ko compressé)"
+        else:
+            message = "✅ À jour"
+
+        with self.lock:
+            base, pending = self.version, list(self.dirty)
+        if not pending:
+            return True, message, None
+        if base is None:
+            return False, "Version cloud inconnue - instantané complet nécessaire", None
+
+        # Un seul enregistrement par date / joueur / blessure (le plus récent), dans l'ordre des modifications
+        latest = {}
+        for seq, key, record_json in pending:
+            key = key or seq
+            latest.pop(key, None)
+            latest[key] = record_json
+        compressed_b64 = compress_json('[' + ','.join(latest.values()) + ']')
+        success, error, result = post_to_gsheet(script_url, {'patch': True, 'base_version': base, 'data': compressed_b64})
+        with self.lock:
+            if success and result.get('version') is not None:
+                self._acknowledge(pending[-1][0])
+                self.version = result['version']
+                self.patches_since_full += 1
+                self.last_sent = 'patch'
+                return True, f"✅ Sauvegardé ({len(latest)} modification(s), {len(compressed_b64)} o)", None
+            if result.get('conflict') or success:
+                # Le serveur a avancé sans nous (autre appareil) ou ne gère pas les patchs
+                self.version = None
+                return False, "Versions divergentes - instantané complet au prochain envoi", None
+        return False, error, None
+
+def get_gsheet_sync():
+    """État de synchronisation différentielle de la session"""
+    if 'gsheet_sync' not in st.session_state:
+        st.session_state.gsheet_sync = GsheetDeltaSync()
+    return st.session_state.gsheet_sync
+
+def gsheet_upload_job(delta=False):
+    """
+    Prépare l'envoi Google Sheets : URL et état lus maintenant, envoi exécutable plus tard.
+    En mode delta, l'instantané complet n'est sérialisé que si aucun patch n'est possible.
+    """
+    script_url = get_gsheet_script_url()
+    if not script_url:
+        return None, "GOOGLE_SCRIPT_URL non configuré"
+    sync = get_gsheet_sync()
+    try:
+        if not delta or sync.needs_full():
+            sync.set_full(build_cloud_json('v18'))
     except Exception as e:
-        return False, f"Erreur: {str(e)}"
+        return None, f"Erreur: {str(e)}"
+    return (lambda: sync.sync(script_url)), None
+
+def save_to_gsheet():
+    """Sauvegarde les données dans Google Sheets via Apps Script (avec compression)"""
+    job, error = gsheet_upload_job()
+    if error:
+        return False, error
+    return apply_upload_result(*job())
+
+def read_gsheet_payload(loaded, base_state=None):
+    """
+    Interprète une réponse GET d'Apps Script.
+    Réponse complète : instantané (éventuellement compressé) suivi des patchs postérieurs.
+    Réponse différentielle (`since`) : uniquement les patchs, appliqués sur `base_state`.
+    Retourne (état {players, data, injuries, settings} ou None si vide, version) ;
+    la version est None pour un script sans versions.
+    """
+    version = loaded.get('version')
+    records = read_gsheet_patches(loaded)
+    if 'since' in loaded and base_state is not None:
+        state = base_state
+    else:
+        if loaded.get('compressed') and 'data' in loaded:
+            loaded = decompress_data(loaded['data'])
+        if 'players' not in loaded and 'data' not in loaded:
+            return None, version
+        state = {
+            'players': loaded.get('players', []),
+            'data': loaded.get('data', {}),
+            'injuries': loaded.get('injuries', []),
+            'settings': loaded.get('settings', {}),
+            'saved_at': loaded.get('saved_at'),
+        }
+    for record in records:
+        apply_journal_record(state, record)
+        state['saved_at'] = record.get('at', state.get('saved_at'))
+    return state, version
+
+def read_gsheet_patches(loaded):
+    """Enregistrements du journal portés par les patchs d'une réponse Apps Script, dans l'ordre"""
+    return [record for patch in loaded.get('patches') or [] for record in decompress_data(patch)]
 
-def load_from_gsheet():
-    """Charge les données depuis Google Sheets via Apps Script (avec décompression)"""
+def load_from_gsheet(since_version=None):
+    """
+    Charge les données depuis Google Sheets via Apps Script (avec décompression).
+    Avec since_version, ne télécharge que les patchs postérieurs et les applique à la session ;
+    si le cloud est toujours à cette version, le script répond `unchanged` sans rien relire.
+    """
     script_url = get_gsheet_script_url()
     if not script_url:
         return False, "GOOGLE_SCRIPT_URL non configuré"
     
     try:
-        session = requests.Session()
-        response = session.get(script_url, timeout=60, allow_redirects=True)
+        params = {'since': since_version, 'version': since_version} if since_version is not None else None
+        response = get_http_client().get(script_url, params=params, timeout=60, allow_redirects=True)
         
         if response.status_code != 200:
             return False, f"Erreur HTTP: {response.status_code}"
@@ -847,26 +3067,56 @@ def load_from_gsheet():
                 return False, "Aucune donnée dans Google Sheets"
             return False, f"JSON invalide: {str(e)[:50]}"
         
-        # Vérifier si c'est compressé
-        if loaded.get('compressed') and 'data' in loaded:
+        if 'error' in loaded:
+            return False, f"Erreur Google: {loaded['error']}"
+        
+        # Version inchangée (ou aucun patch) : la session est déjà à jour
+        if since_version is not None and (loaded.get('unchanged') or ('since' in loaded and not loaded.get('patches'))):
+            get_gsheet_sync().reset(loaded.get('version', since_version))
+            return True, "✅ Déjà à jour (aucune modification dans le cloud)"
+        
+        # Patchs seulement : appliquer sur l'état courant (copie privée)
+        if 'since' in loaded and since_version is not None:
             try:
-                loaded = decompress_data(loaded['data'])
+                records = read_gsheet_patches(loaded)
             except Exception as e:
                 return False, f"Erreur décompression: {str(e)[:50]}"
+            own_session_data()
+            session_state = {
+                'players': st.session_state.players,
+                'data': st.session_state.data,
+                'injuries': st.session_state.injuries,
+                'settings': st.session_state.settings,
+            }
+            for record in records:
+                apply_journal_record(session_state, record)
+            st.session_state.players = session_state['players']
+            get_registry().rebuild()
+            get_store().rebuild()
+            # Patchs reçus écrits dans le journal local (sans renvoi au cloud) : conservés au redémarrage
+            success, msg = save_changes([{k: v for k, v in r.items() if k != 'at'} for r in records], cloud=False)
+            get_gsheet_sync().reset(loaded.get('version'))
+            if not success:
+                return False, msg
+            return True, f"✅ À jour ({len(loaded.get('patches') or [])} modification(s) reçue(s))"
+        
+        # Vérifier si c'est compressé
+        try:
+            state, version = read_gsheet_payload(loaded)
+        except Exception as e:
+            return False, f"Erreur décompression: {str(e)[:50]}"
         
         # Charger les données
-        if 'players' in loaded or 'data' in loaded:
-            st.session_state.players = loaded.get('players', [])
-            st.session_state.data = loaded.get('data', {})
-            st.session_state.injuries = loaded.get('injuries', [])
-            if 'settings' in loaded:
-                for k, v in loaded['settings'].items():
-                    if not k.startswith('cloud_'):
-                        st.session_state.settings[k] = v
+        if state is not None:
+            st.session_state.players = state['players']
+            st.session_state.data = state['data']
+            st.session_state.injuries = state['injuries']
+            for k, v in state['settings'].items():
+                if not k.startswith('cloud_'):
+                    st.session_state.settings[k] = v
+            get_gsheet_sync().reset(version)
             
             return True, f"✅ Chargé ({len(st.session_state.players)} joueurs, {len(st.session_state.data)} jours)"
-        elif 'error' in loaded:
-            return False, f"Erreur Google: {loaded['error']}"
         else:
             return False, "Données vides ou format invalide"
             
@@ -883,20 +3133,172 @@ def is_gsheet_configured():
 # FONCTIONS DE STOCKAGE UNIFIÉES
 # ============================================
 
-def cloud_save():
-    """Sauvegarde unifiée - Priorité Google Sheets, fallback JSONBlob"""
-    # Priorité 1: Google Sheets
+SYNC_DEBOUNCE_SECONDS = 3     # Attente après la dernière modification avant l'envoi
+SYNC_BACKOFF_SECONDS = 5      # Premier délai de réessai, doublé à chaque échec
+SYNC_BACKOFF_MAX_SECONDS = 300
+SYNC_MAX_ATTEMPTS = 6
+SYNC_WAIT_SECONDS = 150       # Attente maximale d'une sauvegarde explicite
+
+class CloudSyncWorker:
+    """
+    Envoi des sauvegardes cloud dans un thread d'arrière-plan.
+
+    La file est coalescente : un seul envoi en attente, remplacé par chaque nouvelle
+    sauvegarde, et déclenché SYNC_DEBOUNCE_SECONDS après la dernière. Un échec est
+    réessayé avec un délai exponentiel tant qu'aucune version plus récente n'arrive.
+    Le thread n'accède jamais à st.session_state : les envois sont des fonctions préparées
+    dans le thread Streamlit, et leurs résultats sont relus par poll_cloud_sync().
+    Le thread ne vit que tant qu'un envoi est en attente : il s'arrête quand la file est vide
+    et submit() en relance un, si bien que les sessions fermées ne laissent aucun thread.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._job = None
+        self._due = 0.0
+        self.submitted = 0       # Numéro de la dernière sauvegarde soumise
+        self.done = 0            # Numéro de la dernière sauvegarde tentée
+        self.in_flight = False
+        self.failures = 0
+        self.next_retry = None
+        self.last_success = None
+        self.last_result = None  # (succès, message, nouvel_id_blob)
+        self.unapplied = []      # Résultats réussis pas encore reportés dans la session
+        self._thread = None
+
+    @property
+    def pending(self):
+        return self._job is not None or self.in_flight
+
+    def submit(self, job, delay=SYNC_DEBOUNCE_SECONDS):
+        """Remplace l'envoi en attente par `job` ; retourne son numéro"""
+        with self._cond:
+            self.submitted += 1
+            self._job = (self.submitted, job, 0)
+            self._due = time.monotonic() + delay
+            self.next_retry = None
+            self._cond.notify()
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True, name='cloud-sync')
+                self._thread.start()
+            return self.submitted
+
+    def wait(self, seq, timeout=SYNC_WAIT_SECONDS):
+        """Attend que la sauvegarde `seq` (ou une plus récente) ait été tentée"""
+        with self._cond:
+            self._cond.wait_for(lambda: self.done >= seq, timeout)
+            return self.last_result if self.done >= seq else (False, "Timeout - réessayez", None)
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while self._job is not None and time.monotonic() < self._due:
+                    self._cond.wait(self._due - time.monotonic())
+                if self._job is None:
+                    # File vide (réessais compris) : fin du thread, décidée sous le verrou de submit()
+                    self._thread = None
+                    return
+                (seq, job, attempt), self._job = self._job, None
+                self.in_flight = True
+
+            try:
+                result = job()
+            except Exception as e:
+                result = (False, f"Erreur: {str(e)}", None)
+
+            with self._cond:
+                self.in_flight = False
+                self.done = max(self.done, seq)
+                self.last_result = result
+                if result[0]:
+                    self.failures = 0
+                    self.last_success = datetime.now()
+                    self.unapplied.append(result)
+                else:
+                    self.failures += 1
+                    # Réessayer, sauf si une version plus récente attend déjà
+                    if self._job is None and attempt + 1 < SYNC_MAX_ATTEMPTS:
+                        delay = min(SYNC_BACKOFF_SECONDS * 2 ** attempt, SYNC_BACKOFF_MAX_SECONDS)
+                        self._job = (seq, job, attempt + 1)
+                        self._due = time.monotonic() + delay
+                        self.next_retry = datetime.now() + timedelta(seconds=delay)
+                self._cond.notify_all()
+
+def get_sync_worker():
+    """Worker de synchronisation de la session (créé au premier usage)"""
+    if 'sync_worker' not in st.session_state:
+        st.session_state.sync_worker = CloudSyncWorker()
+    return st.session_state.sync_worker
+
+def poll_cloud_sync():
+    """Reporte dans la session les envois terminés en arrière-plan ; retourne le worker ou None"""
+    worker = st.session_state.get('sync_worker')
+    if worker is None:
+        return None
+    with worker._cond:
+        results, worker.unapplied = worker.unapplied, []
+    for result in results:
+        apply_upload_result(*result)
+    
+    # Version cloud perdue (divergence) : renvoyer un instantané complet
+    if 'gsheet_sync' in st.session_state and st.session_state.gsheet_sync.needs_resync() and is_gsheet_configured():
+        cloud_save()
+    return worker
+
+def cloud_upload_job(delta=False):
+    """Envoi correspondant au stockage actif - Priorité Google Sheets, fallback JSONBlob"""
+    # Priorité 1: Google Sheets (patch des modifications journalisées si delta)
     if is_gsheet_configured():
-        return save_to_gsheet()
+        return gsheet_upload_job(delta)
     
     # Priorité 2: JSONBlob (legacy)
-    return save_to_cloud()
+    return jsonblob_upload_job()
+
+def cloud_save(background=True, delta=False):
+    """
+    Sauvegarde unifiée - Priorité Google Sheets, fallback JSONBlob.
+    Par défaut l'envoi est confié au worker (non bloquant) ; background=False attend le résultat,
+    en passant par la même file pour ne jamais écraser une version plus récente.
+    delta=True : seules les modifications déjà journalisées sont envoyées (Google Sheets).
+    """
+    # Empreintes de l'état envoyé : mémorisées comme point de synchronisation si l'envoi réussit
+    hashes = get_content_hashes()
+    synced_hashes = (hashes.digest(), section_hash(persistable_settings()))
+    worker = st.session_state.get('sync_worker')
+    if not delta and not (worker and worker.pending) and not is_cloud_dirty():
+        marker = read_sync_marker()
+        if (marker.get('hash'), marker.get('settings_hash')) == synced_hashes:
+            return True, "✅ Cloud déjà à jour (aucune modification)"
+    
+    job, error = cloud_upload_job(delta)
+    if error:
+        return False, error
+    upload = job
+    job = lambda: upload() + (synced_hashes,)
+    worker = get_sync_worker()
+    if background:
+        worker.submit(job)
+        return True, "⏳ Synchronisation cloud programmée"
+    result = worker.wait(worker.submit(job, delay=0))
+    poll_cloud_sync()
+    return result[:2]
+
+def is_cloud_dirty():
+    """Modifications journalisées pas encore acquittées par Google Sheets"""
+    sync = st.session_state.get('gsheet_sync')
+    if sync is None or not is_gsheet_configured():
+        return False
+    with sync.lock:
+        return bool(sync.dirty) or sync.full is not None
 
 def cloud_load():
     """Chargement unifié - Priorité Google Sheets, fallback JSONBlob"""
-    # Priorité 1: Google Sheets
+    # Priorité 1: Google Sheets (seulement les patchs si la session est à jour d'une version connue)
     if is_gsheet_configured():
-        return load_from_gsheet()
+        sync = get_gsheet_sync()
+        with sync.lock:
+            since = sync.version if not sync.dirty and sync.full is None else None
+        return load_from_gsheet(since)
     
     # Priorité 2: JSONBlob (legacy)
     return load_from_cloud()
@@ -917,6 +3319,375 @@ def get_backup_reminder():
     time_since_save = datetime.now() - st.session_state.last_save_time
     return time_since_save.total_seconds() > 1800
 
+# ==================== JEU DE DONNÉES PARTAGÉ ====================
+SHARED_DATASET_TTL = 900  # Secondes avant de recharger le cloud pour une nouvelle session
+
+class SharedDataset:
+    """
+    Jeu de données (players, data, injuries, settings) chargé une fois par processus et
+    partagé par toutes les sessions, avec son store colonnaire et son registre.
+
+    Les sessions le lisent sans le copier ; own_session_data() en fait une copie privée
+    avant la première modification (copy-on-write), et publish() fait de la copie d'une
+    session qui vient de sauvegarder la nouvelle version partagée.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.version = 0
+        self.state = None
+        self.source = None           # 'local', 'gsheet' ou 'jsonblob'
+        self.cloud_version = None    # Version Apps Script correspondant à state (si connue)
+        self.loaded_at = 0.0
+        self.files_signature = None
+        self.store = None
+        self.registry = None
+        self.hashes = None
+        self.file_lock = threading.RLock()  # Écritures de DATA_FILE / JOURNAL_FILE
+        self.reconciling = False
+        self.cloud_update = None      # (numéro, 'cloud' | 'same' | 'local' | 'error', message)
+        self.update_seq = 0
+        self.push_claimed = False
+
+    def post_cloud_update(self, kind, message):
+        """Dépose le résultat d'une réconciliation cloud pour les sessions (sous self.lock)"""
+        self.update_seq += 1
+        self.cloud_update = (self.update_seq, kind, message)
+        self.push_claimed = False
+
+    def is_stale(self):
+        """Absent, trop ancien, ou fichiers locaux modifiés par un autre processus"""
+        return (self.state is None
+                or time.monotonic() - self.loaded_at > SHARED_DATASET_TTL
+                or local_files_signature() != self.files_signature)
+
+    def publish(self, state, source=None, cloud_version=None, store=None, registry=None, hashes=None, loaded=False):
+        """Remplace la version partagée ; `loaded` remet à zéro l'âge (chargement complet)"""
+        with self.lock:
+            self.version += 1
+            self.release_snapshot(state)
+            self.state = state
+            self.source = source or self.source
+            self.cloud_version = cloud_version
+            self.files_signature = local_files_signature()
+            self.store = store if store is not None and store.source is state['data'] else None
+            self.registry = registry if registry is not None and registry.source is state['players'] else None
+            self.hashes = hashes if hashes is not None and hashes.matches(state['players'], state['data'], state['injuries']) else None
+            if loaded:
+                self.loaded_at = time.monotonic()
+
+    def extend(self, state, hashes=None):
+        """Même contenu avec davantage de saisons chargées : version inchangée, store reconstruit"""
+        with self.lock:
+            self.release_snapshot(state)
+            self.state = state
+            self.store = None
+            self.hashes = hashes if hashes is not None and hashes.matches(state['players'], state['data'], state['injuries']) else None
+
+    def release_snapshot(self, state):
+        """Ferme la projection de l'instantané binaire de la version remplacée par `state` (sous self.lock)"""
+        data = self.state['data'] if self.state is not None else None
+        if isinstance(data, SnapshotDays) and data is not state['data']:
+            data.release()
+
+    def store_for(self, data):
+        """Store partagé si `data` est la version partagée, sinon None"""
+        with self.lock:
+            if self.state is None or data is not self.state['data']:
+                return None
+            if self.store is None:
+                self.store = WellnessStore(data)
+            return self.store
+
+    def registry_for(self, players):
+        """Registre partagé si `players` est la version partagée, sinon None"""
+        with self.lock:
+            if self.state is None or players is not self.state['players']:
+                return None
+            if self.registry is None:
+                self.registry = PlayerRegistry(players)
+            return self.registry
+
+    def hashes_for(self, players, data, injuries):
+        """Empreintes partagées si le contenu est la version partagée (toujours écrite sur disque), sinon None"""
+        with self.lock:
+            if self.state is None or not (players is self.state['players'] and data is self.state['data'] and injuries is self.state['injuries']):
+                return None
+            if self.hashes is None:
+                self.hashes = ContentHashes(players, data, injuries, self.state['settings'])
+                self.hashes.persisted = self.hashes.full_digest()
+            return self.hashes
+
+@st.cache_resource
+def get_shared_dataset():
+    """Jeu de données partagé du processus"""
+    return SharedDataset()
+
+def local_files_signature():
+    """(taille, mtime) de DATA_FILE, JOURNAL_FILE et DB_FILE, pour détecter une écriture extérieure"""
+    signature = []
+    for path in (DATA_FILE, JOURNAL_FILE, DB_FILE):
+        try:
+            stat = os.stat(path)
+            signature.append((stat.st_size, stat.st_mtime_ns))
+        except OSError:
+            signature.append(None)
+    return tuple(signature)
+
+def adopt_shared_dataset(shared):
+    """La session lit la version partagée (sans copie)"""
+    with shared.lock:
+        state, version, source, cloud_version = shared.state, shared.version, shared.source, shared.cloud_version
+    st.session_state.players = state['players']
+    st.session_state.data = state['data']
+    st.session_state.injuries = state['injuries']
+    for k, v in state['settings'].items():
+        if not k.startswith('cloud_'):
+            st.session_state.settings[k] = v
+    st.session_state.shared_data_version = version
+    st.session_state.setdefault('cloud_update_seen', 0)
+    if source in ('gsheet', 'jsonblob'):
+        st.session_state.cloud_loaded = True
+        st.session_state.storage_source = source
+    if cloud_version is not None:
+        get_gsheet_sync().reset(cloud_version)
+
+def own_session_data(force=False):
+    """
+    Copy-on-write : remplace les données partagées de la session par une copie privée
+    avant toute modification en place. Les entrées, joueurs et blessures sont des dicts plats,
+    une copie par enregistrement suffit.
+    `force` : copie aussi des données déjà privées (modifications à pouvoir annuler).
+    """
+    if st.session_state.get('shared_data_version') is None and not force:
+        return
+    hashes = get_content_hashes()
+    st.session_state.players = [dict(p) for p in st.session_state.players]
+    data = st.session_state.data
+    st.session_state.data = SeasonData(((d, [dict(e) for e in entries]) for d, entries in data.items()),
+                                       archived=getattr(data, 'archived', None))
+    st.session_state.injuries = [dict(i) for i in st.session_state.injuries]
+    # Contenu identique : les empreintes restent valables pour la copie
+    st.session_state.content_hashes = hashes.copy(st.session_state.players, st.session_state.data, st.session_state.injuries)
+    st.session_state.shared_data_version = None
+
+def publish_session_data():
+    """Publie les données sauvegardées de la session comme nouvelle version partagée"""
+    shared = get_shared_dataset()
+    state = {
+        'players': st.session_state.players,
+        'data': st.session_state.data,
+        'injuries': st.session_state.injuries,
+        'settings': persistable_settings(),
+    }
+    shared.publish(state, store=st.session_state.get('wellness_store'), registry=st.session_state.get('player_registry'),
+                   hashes=st.session_state.get('content_hashes'))
+    with shared.lock:
+        st.session_state.shared_data_version = shared.version
+
+def cloud_state(cloud_data, local_state):
+    """État issu du cloud ; ses paramètres complètent ceux de l'état local"""
+    return {
+        'players': cloud_data.get('players', []),
+        'data': cloud_data.get('data', {}),
+        'injuries': cloud_data.get('injuries', []),
+        'settings': {**local_state['settings'], **cloud_data.get('settings', {})},
+    }
+
+def load_local_state():
+    """
+    État local pour un affichage immédiat au démarrage (vide si aucune sauvegarde).
+    Retourne (état, store colonnaire ou None) : le store est construit directement depuis
+    la copie binaire de DATA_FILE quand elle est à jour.
+    """
+    state = {'players': [], 'data': {}, 'injuries': [], 'settings': {}}
+    snapshots = []
+    try:
+        local_data = read_local_state(snapshots)
+        if local_data is not None:
+            state = {k: local_data.get(k, state[k]) for k in state}
+            state['saved_at'] = local_data.get('saved_at')
+    except:
+        snapshots = []
+    store = WellnessStore.from_snapshot(snapshots[0], state['data']) if snapshots else None
+    return state, store
+
+def cloud_target():
+    """Identifiant du stockage cloud actif, pour ne réutiliser un jeton de version que sur la même cible"""
+    if is_gsheet_configured():
+        return 'gsheet:' + section_hash(get_gsheet_script_url())[:16]
+    if get_cloud_id():
+        return 'jsonblob:' + get_cloud_id()
+    return None
+
+def fetch_gsheet_state(script_url, known_version=None):
+    """
+    Téléchargement complet depuis Apps Script (sans session) : (état ou None, version, inchangé).
+    Avec known_version, le script répond `unchanged` si le cloud est toujours à cette version :
+    rien n'est téléchargé ni décompressé.
+    """
+    params = {'version': known_version} if known_version is not None else None
+    response = get_http_client().get(script_url, params=params, timeout=30, allow_redirects=True)
+    if response.status_code != 200:
+        raise ValueError(f"Erreur HTTP: {response.status_code}")
+    response_text = response.text.strip()
+    # Page HTML = erreur de déploiement Google
+    if response_text.startswith('<!') or response_text.startswith('<html'):
+        raise ValueError("Google renvoie une page HTML")
+    loaded = response.json()
+    if 'error' in loaded:
+        raise ValueError(f"Erreur Google: {loaded['error']}")
+    if loaded.get('unchanged'):
+        return None, loaded.get('version'), True
+    # Instantané (compressé ou non) + patchs postérieurs
+    return read_gsheet_payload(loaded) + (False,)
+
+def fetch_jsonblob_state(blob_id, etag=None):
+    """Téléchargement depuis JSONBlob (sans session) : (état ou None, ETag, inchangé) ; If-None-Match si etag"""
+    url = f"{JSONBLOB_API_URL}/{blob_id}"
+    headers = {'Accept': 'application/json'}
+    if etag:
+        headers['If-None-Match'] = etag
+    response = get_http_client().get(url, headers=headers, timeout=15)
+    if response.status_code == 304:
+        return None, etag, True
+    if response.status_code != 200:
+        raise ValueError(f"Erreur HTTP: {response.status_code}")
+    cloud_data = response.json()
+    if 'players' not in cloud_data and 'data' not in cloud_data:
+        return None, None, False
+    return cloud_data, response.headers.get('ETag'), False
+
+def choose_startup_state(local_state, cloud_data, marker):
+    """
+    Réconciliation local / cloud par contenu plutôt que par nombre de jours.
+    Retourne 'same', 'cloud' ou 'local' :
+    - empreintes égales : rien à faire ;
+    - un seul côté a changé depuis la dernière synchronisation (marqueur) : ce côté gagne ;
+    - les deux ont changé (ou pas de marqueur) : la sauvegarde la plus récente gagne,
+      le cloud en cas d'égalité ou si le local est vide. Un cloud vide ne gagne jamais.
+    """
+    if not cloud_data or not (cloud_data.get('players') or cloud_data.get('data')):
+        return 'local'
+    local_hash = content_hash(local_state)
+    cloud_hash = content_hash(cloud_data)
+    if local_hash == cloud_hash:
+        return 'same'
+    synced_hash = marker.get('hash')
+    if synced_hash == local_hash:
+        return 'cloud'
+    if synced_hash == cloud_hash:
+        return 'local'
+    if not (local_state['players'] or local_state['data']):
+        return 'cloud'
+    def saved_at(state):
+        # 'AAAA-MM-JJ HH:MM:SS' se compare comme une chaîne ; 'inconnue' ou absent = le plus ancien
+        value = str(state.get('saved_at') or '')
+        return value if value[:1].isdigit() else ''
+    return 'local' if saved_at(local_state) > saved_at(cloud_data) else 'cloud'
+
+def reconcile_with_cloud(shared, fetch, source, target, base_version):
+    """
+    Thread d'arrière-plan du démarrage : télécharge le cloud et le réconcilie avec la version
+    locale déjà affichée. N'accède pas à st.session_state ; le résultat est déposé dans
+    shared.cloud_update et relu par check_cloud_update() dans chaque session.
+    Un cloud inchangé depuis la dernière synchronisation (jeton du marqueur) n'est pas téléchargé.
+    """
+    try:
+        try:
+            cloud_data, token, unchanged = fetch()
+        except Exception:
+            with shared.lock:
+                shared.post_cloud_update('error', "Cloud injoignable, données locales affichées")
+            return
+        
+        with shared.lock, shared.file_lock:
+            # Une session a sauvegardé entre-temps (ou fichier modifié) : ses données sont plus récentes
+            if shared.version != base_version or local_files_signature() != shared.files_signature:
+                return
+            local_state = shared.state
+            marker = read_sync_marker()
+            # Version Apps Script (partagée avec la synchronisation différentielle) ou ETag JSONBlob
+            cloud_version, etag = (token, None) if source == 'gsheet' else (None, token)
+            if unchanged:
+                # Cloud identique au dernier point de synchronisation
+                choice = 'same' if content_hash(local_state) == marker.get('hash') else 'local'
+            else:
+                choice = choose_startup_state(local_state, cloud_data, marker)
+            label = 'Google Sheets' if source == 'gsheet' else 'JSONBlob'
+            if choice == 'same':
+                shared.source, shared.cloud_version = source, cloud_version
+                write_sync_marker(content_hash(local_state), cloud_version, section_hash(local_state['settings']), target, etag)
+                shared.post_cloud_update('same', None)
+            elif choice == 'cloud':
+                state = cloud_state(cloud_data, local_state)
+                write_state_file(state)
+                state['data'] = unload_archived(state['data'])
+                shared.publish(state, source, cloud_version, loaded=True)
+                write_sync_marker(content_hash(state), cloud_version, section_hash(state['settings']), target, etag)
+                shared.post_cloud_update('cloud', f"Données mises à jour depuis {label} ({len(state['players'])} joueurs, {len(state['data'])} jours)")
+            else:
+                shared.post_cloud_update('local', f"Données locales plus récentes que {label} : envoi programmé" if cloud_data or unchanged else None)
+    finally:
+        with shared.lock:
+            shared.reconciling = False
+
+def start_cloud_reconcile(shared):
+    """Lance la réconciliation cloud en arrière-plan (configuration lue dans le thread Streamlit)"""
+    target = cloud_target()
+    marker = read_sync_marker()
+    # Jeton de version réutilisable seulement pour la cible qui l'a fourni
+    if marker.get('target') != target:
+        marker = {}
+    if is_gsheet_configured():
+        script_url, known_version = get_gsheet_script_url(), marker.get('cloud_version')
+        fetch, source = (lambda: fetch_gsheet_state(script_url, known_version)), 'gsheet'
+    elif get_cloud_id():
+        blob_id, etag = get_cloud_id(), marker.get('etag')
+        fetch, source = (lambda: fetch_jsonblob_state(blob_id, etag)), 'jsonblob'
+    else:
+        return
+    with shared.lock:
+        if shared.reconciling:
+            return
+        shared.reconciling = True
+        base_version = shared.version
+    threading.Thread(target=reconcile_with_cloud, args=(shared, fetch, source, target, base_version),
+                     daemon=True, name='cloud-reconcile').start()
+
+def check_cloud_update():
+    """Reporte dans la session le résultat de la réconciliation cloud du démarrage (toast)"""
+    shared = get_shared_dataset()
+    with shared.lock:
+        update = shared.cloud_update
+        if update is None or update[0] <= st.session_state.get('cloud_update_seen', 0):
+            return
+        _, kind, message = update
+        cloud_version = shared.cloud_version
+        push = kind == 'local' and message is not None and not shared.push_claimed
+        if push:
+            shared.push_claimed = True
+    st.session_state.cloud_update_seen = update[0]
+    attached = st.session_state.get('shared_data_version') is not None
+    
+    if kind == 'cloud':
+        if attached:
+            adopt_shared_dataset(shared)
+            get_store()
+            st.toast(message, icon="☁️")
+        else:
+            st.toast("Une version cloud plus récente existe ; vos modifications en cours sont conservées", icon="⚠️")
+    elif kind == 'same':
+        if attached and cloud_version is not None:
+            get_gsheet_sync().reset(cloud_version)
+    elif kind == 'local':
+        if push:
+            cloud_save()
+        if message:
+            st.toast(message, icon="💾")
+    elif message:
+        st.toast(message, icon="⚠️")
+
 # ==================== CHARGEMENT AUTOMATIQUE AU DÉMARRAGE ====================
 if 'data_loaded' not in st.session_state:
     st.session_state.data_loaded = True
@@ -939,104 +3710,33 @@ if 'data_loaded' not in st.session_state:
         except:
             pass
     
-    # 3. Charger les données locales d'abord (pour comparaison)
-    local_data_count = 0
-    if os.path.exists(DATA_FILE):
-        try:
-            with open(DATA_FILE, 'r', encoding='utf-8') as f:
-                local_data = json.load(f)
-            local_data_count = len(local_data.get('data', {}))
-            st.session_state.players = local_data.get('players', [])
-            st.session_state.data = local_data.get('data', {})
-            st.session_state.injuries = local_data.get('injuries', [])
-            if 'settings' in local_data:
-                for k, v in local_data['settings'].items():
-                    if not k.startswith('cloud_'):
-                        st.session_state.settings[k] = v
-        except:
-            pass
-    
-    # 4. PRIORITÉ 1: Google Sheets (si configuré)
-    if is_gsheet_configured():
-        try:
-            script_url = get_gsheet_script_url()
-            session = requests.Session()
-            response = session.get(script_url, timeout=30, allow_redirects=True)
-            
-            if response.status_code == 200:
-                response_text = response.text.strip()
-                
-                # Vérifier que ce n'est pas une page HTML (erreur Google)
-                if not response_text.startswith('<!') and not response_text.startswith('<html'):
-                    try:
-                        cloud_data = response.json()
-                        
-                        # Vérifier si c'est compressé
-                        if cloud_data.get('compressed') and 'data' in cloud_data:
-                            try:
-                                cloud_data = decompress_data(cloud_data['data'])
-                            except:
-                                cloud_data = {}
-                        
-                        cloud_data_count = len(cloud_data.get('data', {}))
-                        
-                        # Si Google Sheets a des données, les utiliser
-                        if cloud_data_count > 0 and cloud_data_count >= local_data_count:
-                            st.session_state.players = cloud_data.get('players', [])
-                            st.session_state.data = cloud_data.get('data', {})
-                            st.session_state.injuries = cloud_data.get('injuries', [])
-                            if 'settings' in cloud_data:
-                                for k, v in cloud_data['settings'].items():
-                                    if not k.startswith('cloud_'):
-                                        st.session_state.settings[k] = v
-                            st.session_state.cloud_loaded = True
-                            st.session_state.storage_source = "gsheet"
-                    except json.JSONDecodeError:
-                        pass  # JSON invalide, garder les données locales
-        except Exception as e:
-            # En cas d'erreur, garder les données locales
-            pass
-    
-    # 5. PRIORITÉ 2: JSONBlob (legacy, si Google Sheets pas configuré)
-    elif get_cloud_id():
-        cloud_blob_id = get_cloud_id()
-        try:
-            url = f"https://jsonblob.com/api/jsonBlob/{cloud_blob_id}"
-            response = requests.get(url, headers={'Accept': 'application/json'}, timeout=15)
-            if response.status_code == 200:
-                cloud_data = response.json()
-                cloud_data_count = len(cloud_data.get('data', {}))
-                
-                # Si le cloud a plus de données OU autant, utiliser le cloud
-                if cloud_data_count >= local_data_count:
-                    st.session_state.players = cloud_data.get('players', [])
-                    st.session_state.data = cloud_data.get('data', {})
-                    st.session_state.injuries = cloud_data.get('injuries', [])
-                    if 'settings' in cloud_data:
-                        for k, v in cloud_data['settings'].items():
-                            if not k.startswith('cloud_'):
-                                st.session_state.settings[k] = v
-                    st.session_state.cloud_loaded = True
-                    st.session_state.storage_source = "jsonblob"
-        except:
-            pass
+    # 3. Données partagées du processus : affichage immédiat de la sauvegarde locale
+    shared = get_shared_dataset()
+    with shared.lock:
+        st.session_state.cloud_update_seen = shared.update_seq
+        if shared.is_stale():
+            with shared.file_lock:
+                state, store = load_local_state()
+                shared.publish(state, 'local', store=store, loaded=True)
+            # 4-5. Cloud (Google Sheets, sinon JSONBlob) téléchargé et réconcilié en arrière-plan
+            start_cloud_reconcile(shared)
+    adopt_shared_dataset(shared)
+    
+    # 6. Store colonnaire partagé (construit une seule fois par version)
+    get_store()
 
 # ==================== UTILITAIRES ====================
+def get_position_info(position):
+    """Retourne (groupe, ligne, code groupe, code ligne) pour une position"""
+    return POSITION_TABLE.get(position, DEFAULT_POSITION_INFO)
+
 def get_player_group(position):
     """Retourne le groupe (Avants/Trois-quarts) pour une position"""
-    for group_name, lines in RUGBY_POSITIONS.items():
-        for line_positions in lines.values():
-            if position in line_positions:
-                return group_name
-    return 'Avants'
+    return get_position_info(position)[0]
 
 def get_player_line(position):
     """Retourne la ligne (1ère ligne, Demis, etc.) pour une position"""
-    for lines in RUGBY_POSITIONS.values():
-        for line_name, line_positions in lines.items():
-            if position in line_positions:
-                return line_name
-    return '1ère ligne'
+    return get_position_info(position)[1]
 
 def format_date(date_str, fmt='short'):
     """Formate une date en français"""
@@ -1064,75 +3764,63 @@ def get_player_average(player_data):
 
 def get_team_avg(date_key, group=None, line=None, position=None):
     """Calcule les moyennes de l'équipe avec filtres optionnels"""
-    data = st.session_state.data.get(date_key, [])
-    if not data:
+    store = get_store()
+    d_idx = store.date_index.get(date_key)
+    if d_idx is None:
         return None
     
-    filtered = []
-    for d in data:
-        p = next((p for p in st.session_state.players if p['name'] == d['name']), None)
-        if not p:
-            continue
-        if group and get_player_group(p['position']) != group:
-            continue
-        if line and get_player_line(p['position']) != line:
-            continue
-        if position and p['position'] != position:
-            continue
-        filtered.append(d)
-    
-    if not filtered:
+    cols = store.has_entry[d_idx] & store.player_mask(get_registry(), group, line, position)
+    if not cols.any():
         return None
     
-    result = {'count': len(filtered)}
-    for m in METRICS:
-        vals = [d[m['key']] for d in filtered if d.get(m['key']) is not None]
-        result[m['key']] = sum(vals) / len(vals) if vals else None
+    result = {'count': int(cols.sum())}
+    for k, m in enumerate(METRICS):
+        result[m['key']] = _nan_mean(store.values[d_idx, cols, k])
     
-    all_avgs = [get_player_average(d) for d in filtered]
-    all_avgs = [a for a in all_avgs if a is not None]
-    result['global'] = sum(all_avgs) / len(all_avgs) if all_avgs else None
+    result['global'] = _nan_mean(store.averages()[d_idx, cols])
     
     return result
 
 def get_alerts(date_key):
-    """Génère les alertes pour une date donnée"""
-    data = st.session_state.data.get(date_key, [])
-    settings = st.session_state.settings
-    alerts = []
+    """Génère les alertes pour une date donnée (lues dans la table d'alertes de la saison)"""
+    store = get_store()
+    d_idx = store.date_index.get(date_key)
+    if d_idx is None:
+        return []
     
-    for d in data:
-        p = next((p for p in st.session_state.players if p['name'] == d['name']), None)
-        if not p:
-            continue
-        
-        # Alertes métriques basses
-        for m in METRICS:
-            val = d.get(m['key'])
-            if val is not None and val <= settings['lowValueThreshold']:
-                alerts.append({
-                    'player': d['name'],
-                    'player_id': p['id'],
-                    'type': 'critical',
-                    'metric': m,
-                    'value': val,
-                    'message': f"{m['label']} à {val}/5"
-                })
-        
-        # Alerte poids
-        if d.get('weight') and p.get('targetWeight'):
-            diff = abs(d['weight'] - p['targetWeight'])
-            if diff > settings['weightThreshold']:
-                sign = '+' if d['weight'] > p['targetWeight'] else '-'
-                alerts.append({
-                    'player': d['name'],
-                    'player_id': p['id'],
-                    'type': 'weight',
-                    'diff': round(d['weight'] - p['targetWeight'], 1),
-                    'message': f"Poids {sign}{diff:.1f}kg vs forme"
-                })
+    table = get_alert_table()
+    d_col = table['d_idx'].to_numpy()
+    day = table.iloc[np.searchsorted(d_col, d_idx, 'left'):np.searchsorted(d_col, d_idx, 'right')]
+    if day.empty:
+        return []
+    
+    # Conserver l'ordre des entrées du jour
+    order = {}
+    for i, d in enumerate(st.session_state.data.get(date_key, [])):
+        order.setdefault(d.get('name'), i)
     
-    return alerts
+    registry = get_registry()
+    alerts = []
+    for row in day.itertuples(index=False):
+        name = store.players[row.p_idx]
+        alert = {'player': name, 'player_id': registry.by_name[name]['id'], 'type': row.type}
+        if row.type == 'critical':
+            m = METRICS[row.metric_idx]
+            val = st.session_state.data[date_key][order[name]].get(m['key'])
+            alert.update({'metric': m, 'value': val, 'message': f"{m['label']} à {val}/5"})
+        elif row.type == 'weight':
+            sign = '+' if row.value > 0 else '-'
+            alert.update({'diff': round(row.value, 1), 'message': f"Poids {sign}{abs(row.value):.1f}kg vs forme"})
+        elif row.type == 'zscore':
+            alert.update({'zscore': round(row.value, 2), 'message': f"Z-Score {row.value:.1f} vs sa moyenne"})
+        else:
+            label = METRICS[row.metric_idx]['label'] if row.metric_idx < len(METRICS) else 'Moyenne globale'
+            alert.update({'drop': round(row.value, 1), 'reference': VARIATION_REFS[row.ref],
+                          'message': f"{label} -{row.value:.1f} vs {VARIATION_REFS[row.ref]}"})
+        alerts.append((order.get(name, len(order)), alert))
+    
+    alerts.sort(key=lambda x: x[0])
+    return [a for _, a in alerts]
 
 def get_availability_data():
     """Retourne les données de disponibilité pour le pie chart"""
@@ -1156,14 +3844,6 @@ def get_player_history(player_name, days=30):
             history.append({'date': date, 'avg': avg, **pd_data})
     return history
 
-def calculate_zscore(value, prev_values):
-    """Calcule le Z-Score d'une valeur par rapport à un historique"""
-    if not prev_values or len(prev_values) < 3:
-        return 0
-    mean = sum(prev_values) / len(prev_values)
-    std = (sum((v - mean) ** 2 for v in prev_values) / len(prev_values)) ** 0.5
-    return (value - mean) / std if std > 0 else 0
-
 def get_color_for_value(val):
     """Retourne la couleur selon la valeur (1-5)"""
     if val is None:
@@ -1194,14 +3874,26 @@ def fmt_val(val, decimals=1, suffix=""):
         return "-"
 
 # ==================== IMPORT AMÉLIORÉ ====================
-def parse_date_french(text):
-    """Parse une date en français - format: 'mardi 6 janvier 2026' ou '6 janvier 2026'"""
-    if pd.isna(text):
+# Reconnaissance des dates, partagée par les imports : les feuilles de saison ont des centaines de
+# colonnes dont les mêmes libellés reviennent d'un import à l'autre, d'où un cache par texte de cellule.
+FRENCH_DATE_PATTERN = re.compile(r'(\d{1,2})\s+(janvier|février|fevrier|mars|avril|mai|juin|juillet|août|aout|septembre|octobre|novembre|décembre|decembre)\s+(\d{4})')
+NUMERIC_DATE_PATTERN = re.compile(r'(\d{1,2})[/\-.](\d{1,2})[/\-.](\d{4})')
+# Mêmes champs que datetime.strptime pour '%d/%m', '%d/%m/%y', '%d/%m/%Y' (et les variantes avec '-')
+SHORT_DATE_PATTERN = re.compile(r'(3[0-1]|[1-2]\d|0[1-9]|[1-9]| [1-9])([/-])(1[0-2]|0[1-9]|[1-9])(?:\2(\d\d\d\d|\d\d))?')
+DIGIT_PATTERN = re.compile(r'\d')
+DATE_CELL_CACHE_SIZE = 4096
+
+
+@functools.lru_cache(maxsize=DATE_CELL_CACHE_SIZE)
+def _parse_date_text(text):
+    """parse_date_french sur le texte brut d'une cellule (mémoïsé)"""
+    # Rejet rapide : toute date reconnue contient des chiffres
+    if not DIGIT_PATTERN.search(text):
         return None
-    text = str(text).lower().strip()
+    text = text.lower().strip()
     
     # Format: "mardi 6 janvier 2026" ou "6 janvier 2026"
-    match = re.search(r'(\d{1,2})\s+(janvier|février|fevrier|mars|avril|mai|juin|juillet|août|aout|septembre|octobre|novembre|décembre|decembre)\s+(\d{4})', text)
+    match = FRENCH_DATE_PATTERN.search(text)
     if match:
         day = int(match.group(1))
         month = FRENCH_MONTHS.get(match.group(2), 1)
@@ -1209,7 +3901,7 @@ def parse_date_french(text):
         return f"{year}-{month:02d}-{day:02d}"
     
     # Format: "06/01/2026"
-    match = re.search(r'(\d{1,2})[/\-.](\d{1,2})[/\-.](\d{4})', text)
+    match = NUMERIC_DATE_PATTERN.search(text)
     if match:
         day = int(match.group(1))
         month = int(match.group(2))
@@ -1219,6 +3911,41 @@ def parse_date_french(text):
     return None
 
 
+def parse_date_french(text):
+    """Parse une date en français - format: 'mardi 6 janvier 2026' ou '6 janvier 2026'"""
+    if pd.isna(text):
+        return None
+    return _parse_date_text(str(text))
+
+
+@functools.lru_cache(maxsize=DATE_CELL_CACHE_SIZE)
+def parse_short_date(text):
+    """
+    Parse un en-tête de date court (format DD/MM ou DD/MM/YY ou DD/MM/YYYY, ou avec '-').
+    Sans année : juillet ou après → 2025 (début de saison), avant juillet → 2026.
+    Retourne 'YYYY-MM-DD' ou None ; mêmes résultats que les essais successifs de datetime.strptime.
+    """
+    match = SHORT_DATE_PATTERN.fullmatch(text)
+    if not match:
+        return None
+    day, month, year = int(match.group(1)), int(match.group(3)), match.group(4)
+    if year is None:
+        year = 1900
+    elif len(year) == 2:
+        # Règle de %y : 69-99 → 1900, 00-68 → 2000
+        year = int(year) + (1900 if int(year) >= 69 else 2000)
+    else:
+        year = int(year)
+    try:
+        parsed = datetime(year, month, day)
+    except ValueError:
+        return None
+    if match.group(4) is None:
+        # Déterminer l'année selon le mois
+        parsed = parsed.replace(year=2025 if parsed.month >= 7 else 2026)
+    return parsed.strftime('%Y-%m-%d')
+
+
 def normalize_text(text):
     """Normalise le texte pour la comparaison (supprime accents, lowercase)"""
     if pd.isna(text):
@@ -1267,7 +3994,7 @@ def detect_date_blocks(df, debug=False):
     dates_in_row = {}  # col_idx -> date_str
     
     for row_idx in range(min(6, len(df))):
-        row = df.iloc[row_idx]
+        row = df.iloc[row_idx].tolist()
         found_dates = {}
         for col_idx, cell in enumerate(row):
             if pd.notna(cell):
@@ -1318,36 +4045,493 @@ def detect_date_blocks(df, debug=False):
         if i + 1 < len(joueur_columns):
             end_col = joueur_columns[i + 1]
         else:
-            end_col = len(df.columns)
-        
-        # Trouver la date associée (la plus proche à gauche ou égale)
-        best_date = None
-        best_date_col = -1
-        for date_col, date_info in dates_in_row.items():
-            if date_col <= joueur_col and date_col > best_date_col:
-                best_date = date_info
-                best_date_col = date_col
-        
-        if best_date:
-            blocks.append({
-                'date': best_date['date'],
-                'date_str': best_date['label'],
-                'start_col': joueur_col,  # Commence à la colonne "Joueur"
-                'end_col': end_col,
-                'header_row': header_row_idx
-            })
-    
-    if debug:
-        st.write(f"✅ {len(blocks)} blocs détectés")
-        for b in blocks[:3]:
-            st.write(f"  • {b['date_str']}: colonnes {b['start_col']}-{b['end_col']}")
-    
-    return blocks
+            end_col = len(df.columns)
+        
+        # Trouver la date associée (la plus proche à gauche ou égale)
+        best_date = None
+        best_date_col = -1
+        for date_col, date_info in dates_in_row.items():
+            if date_col <= joueur_col and date_col > best_date_col:
+                best_date = date_info
+                best_date_col = date_col
+        
+        if best_date:
+            blocks.append({
+                'date': best_date['date'],
+                'date_str': best_date['label'],
+                'start_col': joueur_col,  # Commence à la colonne "Joueur"
+                'end_col': end_col,
+                'header_row': header_row_idx
+            })
+    
+    if debug:
+        st.write(f"✅ {len(blocks)} blocs détectés")
+        for b in blocks[:3]:
+            st.write(f"  • {b['date_str']}: colonnes {b['start_col']}-{b['end_col']}")
+    
+    return blocks
+
+
+# Structure d'un bloc "Suivi BE" : Joueur | Sommeil | Charge | Motivation | HDC | BDC | Moyenne | Remarque
+SUIVI_BE_METRIC_OFFSETS = (
+    ('sleep', 1), ('mentalLoad', 2), ('motivation', 3), ('hdcState', 4), ('bdcState', 5),
+)
+IMPORT_ERROR_VALUES = ('#DIV/0!', '#N/A', '#VALUE!', '-', '')
+IMPORT_EMPTY_REMARKS = ('nan', 'none', '', '#n/a')
+
+# Mots-clés de remarque - phrases ou expressions qui indiquent clairement une remarque
+# On utilise des expressions plus longues pour éviter les faux positifs sur les noms
+REMARK_PATTERNS = (
+    # Expressions de douleur/blessure
+    'douleur', 'courbature', 'fatigue', 'crampe', 'blessure',
+    'contracture', 'entorse', 'foulure', 'claquage', 'déchir',
+    'inflamm', 'tendinite', 'élongation', 'lésion', 'lesion',
+    # Parties du corps (comme début de remarque)
+    'genou droit', 'genou gauche', 'cheville', 'épaule', 'mollet',
+    'ischio', 'cuisse', 'adducteur', 'quadri', 'dos bloqué',
+    'kyste', 'hernie', 'pubis', 'lombes', 'lombaire',
+    # États
+    'pas en forme', 'fatigué', 'malade', 'grippé', 'épuisé',
+    'mieux', 'soucis', 'souci', 'problème', 'probleme',
+    # Actions/situations
+    'rien à signaler', 'tout va bien', 'en forme', 'récupération',
+    'au repos', 'absent', 'indisponible',
+    # Temporels (indiquent une remarque contextuelle)
+    'ce matin', 'cette nuit', 'hier soir', 'depuis', 'toujours',
+    'encore', 'gêné', 'gene',
+    # Phrases types
+    'mal au', 'mal à la', 'mal aux', 'douleur au', 'gêne au',
+    'sensation de', 'léger problème', 'petit souci',
+)
+
+
+def is_valid_player_name(text):
+    """
+    Vérifie si le texte ressemble à un nom de joueur.
+    RÈGLE PRINCIPALE: les noms de joueurs sont en MAJUSCULES, sinon c'est probablement une remarque.
+    """
+    # Critères:
+    # 1. Pas trop long (max 25 caractères)
+    # 2. Pas trop d'espaces (max 2 pour les noms composés)
+    # 3. Au moins 80% majuscules OU entièrement en majuscules
+    if len(text) > 25 or text.count(' ') > 2:
+        return False
+    alpha_chars = sum(map(str.isalpha, text))
+    if alpha_chars == 0:
+        return False
+    if text.isupper():
+        return True
+    return sum(map(str.isupper, text)) / alpha_chars >= 0.8
+
+
+class NameClassifier:
+    """
+    Classe les cellules de la colonne « Joueur » d'un import (construit une fois, partagé par les imports).
+    Statuts : 'empty' (vide ou < 2 caractères), 'team' (EQUIPE, TOTAL...), 'header' (Joueur, Nom...),
+    'invalid' (pas en MAJUSCULES), 'remark' (mot-clé de remarque, voir 'pattern') ou 'player'.
+    Les mots-clés sont cherchés dans le texte en minuscules avec une seule regex compilée en arbre
+    de préfixes ; le mot-clé rapporté est le premier de la liste contenu dans le texte.
+    """
+
+    def __init__(self, patterns, skip_upper=(), skip_lower=()):
+        self.patterns = tuple(patterns)
+        self.skip_upper = tuple(skip_upper)
+        self.skip_lower = tuple(skip_lower)
+        self._rank = {p: i for i, p in enumerate(self.patterns)}
+        self._any = re.compile(self._prefix_tree_pattern(self.patterns))
+        # Lookahead : toutes les positions ; à chaque position l'alternative la plus tôt dans la liste gagne
+        self._all = re.compile('(?=(' + '|'.join(re.escape(p) for p in self.patterns) + '))')
+
+    @staticmethod
+    def _prefix_tree_pattern(words):
+        """Regex d'alternance factorisée par préfixes communs ('douleur(?: au)?', ...)"""
+        tree = {}
+        for word in words:
+            node = tree
+            for ch in word:
+                node = node.setdefault(ch, {})
+            node[''] = {}
+
+        def build(node):
+            alts = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+            if not alts:
+                return ''
+            body = alts[0] if len(alts) == 1 else '(?:' + '|'.join(alts) + ')'
+            return f"(?:{body})?" if '' in node else body
+
+        return build(tree)
+
+    def match(self, text_lower):
+        """Premier mot-clé (ordre de la liste) contenu dans le texte en minuscules, None sinon"""
+        if not self._any.search(text_lower):
+            return None
+        return min(self._all.findall(text_lower), key=self._rank.__getitem__)
+
+    def classify(self, names):
+        """
+        Classe toute une colonne de noms en un appel.
+        Retourne un DataFrame aligné sur names : name (texte nettoyé), status, pattern.
+        """
+        index = names.index if isinstance(names, pd.Series) else None
+        values = pd.Series(list(names) if index is None else names.to_numpy(), dtype=object)
+        cleaned = values[values.notna()].map(str).str.strip()
+        cleaned = cleaned[cleaned.str.len() >= 2]
+
+        # Une saison répète les mêmes noms jour après jour : règles évaluées une fois par nom distinct
+        codes, distinct = pd.factorize(cleaned.to_numpy())
+        distinct = pd.Series(distinct, dtype=object)
+        lowered = distinct.str.lower()
+        status = np.full(len(distinct), 'player', dtype=object)
+        pattern = np.full(len(distinct), None, dtype=object)
+        team = distinct.str.upper().isin(self.skip_upper).to_numpy()
+        header = ~team & lowered.isin(self.skip_lower).to_numpy()
+        status[team] = 'team'
+        status[header] = 'header'
+
+        candidates = distinct[~team & ~header]
+        valid = candidates.map(is_valid_player_name).astype(bool)
+        status[valid.index[~valid]] = 'invalid'
+        matched = lowered[valid.index[valid]].map(self.match)
+        matched = matched[matched.notna()]
+        status[matched.index] = 'remark'
+        pattern[matched.index] = matched.to_numpy()
+
+        rows = cleaned.index.to_numpy()
+        name_out = np.full(len(values), None, dtype=object)
+        status_out = np.full(len(values), 'empty', dtype=object)
+        pattern_out = np.full(len(values), None, dtype=object)
+        name_out[rows] = cleaned.to_numpy()
+        status_out[rows] = status[codes]
+        pattern_out[rows] = pattern[codes]
+        return pd.DataFrame({'name': name_out, 'status': status_out, 'pattern': pattern_out}, index=index, dtype=object)
+
+SUIVI_BE_NAMES = NameClassifier(
+    REMARK_PATTERNS,
+    skip_upper=('EQUIPE', 'ÉQUIPE', 'TOTAL', 'MOYENNE'),
+    skip_lower=('joueur', 'nom', 'nan', 'none'),
+)
+IMPORT_NAMES = NameClassifier(
+    REMARK_PATTERNS,
+    skip_upper=('EQUIPE', 'ÉQUIPE', 'TOTAL', 'MOYENNE', 'AVERAGE', 'TEAM'),
+    skip_lower=('joueur', 'nom', 'nan', 'none', 'player'),
+)
+
+
+def parse_metric_cells(cells):
+    """
+    Convertit une colonne de cellules en notes (float, NaN si vide, invalide ou hors 0-5).
+    Même règle que float(str(val).replace(',', '.').replace(' ', '')), mais en une passe pd.to_numeric.
+    """
+    if pd.api.types.is_numeric_dtype(cells) and not pd.api.types.is_bool_dtype(cells):
+        nums = cells.astype(float)
+    else:
+        text = cells[cells.notna()].astype(object).map(str)
+        text = text.str.replace(',', '.', regex=False).str.replace(' ', '', regex=False)
+        text = text[~text.isin(IMPORT_ERROR_VALUES)]
+        nums = pd.to_numeric(text, errors='coerce').astype(float)
+        # Formes acceptées par float() mais pas par to_numeric ('0_5', chiffres non ASCII...) : rares
+        retry = text[nums.isna() & text.str.contains(r'[^\x00-\x5e\x60-\x7f]', regex=True)]
+        for idx, val_str in zip(retry.index.tolist(), retry.tolist()):
+            try:
+                nums[idx] = float(val_str)
+            except ValueError:
+                pass
+        nums = nums.reindex(cells.index)
+    return nums.where((nums >= 0) & (nums <= 5))
+
+
+def suivi_be_block_columns(header_row_data, block):
+    """
+    Mappe les colonnes d'un bloc par POSITION relative depuis "Joueur".
+    header_row_data: valeurs de la ligne d'en-têtes (liste), lue une seule fois pour tous les blocs.
+    Retourne (col_indices, remark_header) ; remark_header est l'en-tête trouvé, None si position par défaut.
+    """
+    start_col = block['start_col']
+    end_col = block['end_col']
+    # Les en-têtes des métriques sont souvent vides (None) dans le CSV exporté
+    col_indices = {'name': start_col}
+    for metric_key, offset in SUIVI_BE_METRIC_OFFSETS:
+        col_indices[metric_key] = start_col + offset
+
+    # Chercher la colonne Remarque explicitement d'abord, après BDC jusqu'à la fin du bloc
+    for offset in range(5, min(15, end_col - start_col)):
+        check_col = start_col + offset
+        if check_col < len(header_row_data) and check_col < end_col:
+            cell = header_row_data[check_col]
+            if pd.notna(cell):
+                cell_norm = normalize_text(str(cell))
+                if 'remarque' in cell_norm or 'commentaire' in cell_norm or 'note' in cell_norm or 'comment' in cell_norm:
+                    col_indices['remark'] = check_col
+                    return col_indices, cell
+
+    # Si pas trouvé par nom, essayer +7, +8, +6 dans cet ordre (+6 est souvent Moyenne)
+    for remark_col in (start_col + 7, start_col + 8, start_col + 6):
+        if remark_col < end_col and remark_col < len(header_row_data):
+            col_indices['remark'] = remark_col
+            break
+    return col_indices, None
+
+
+def iter_suivi_be_blocks(df, blocks):
+    """
+    Parcourt les blocs : (bloc, colonnes mappées, en-tête de la remarque, sous-table du bloc).
+    La sous-table a 7 colonnes (Joueur, 5 métriques, Remarque). Ligne d'en-têtes et grille ne sont lues
+    qu'une fois par ligne d'en-têtes, et seulement sur les colonnes des blocs demandés : le coût suit
+    le nombre de blocs, pas la largeur de l'onglet.
+    """
+    n_cols = len(df.columns)
+    header_rows = {}
+    layouts = []
+    for block in blocks:
+        header_row_idx = block['header_row']
+        if header_row_idx not in header_rows:
+            # En-têtes hors des blocs demandés jamais consultés : laissés vides
+            spans = [(b['start_col'], b['end_col']) for b in blocks if b['header_row'] == header_row_idx]
+            lo, hi = min(s for s, _ in spans), max(e for _, e in spans)
+            header_row = [np.nan] * n_cols
+            header_row[lo:hi] = df.iloc[header_row_idx:header_row_idx + 1, lo:hi].to_numpy(dtype=object)[0].tolist()
+            header_rows[header_row_idx] = header_row
+        col_indices, remark_header = suivi_be_block_columns(header_rows[header_row_idx], block)
+        # Une métrique peut déborder sur le bloc suivant, pas au-delà du fichier
+        columns = [col_indices['name']] + [col_indices[key] for key, _ in SUIVI_BE_METRIC_OFFSETS]
+        columns.append(col_indices.get('remark', n_cols))
+        layouts.append((block, col_indices, remark_header, columns))
+
+    grids = {}
+    for header_row_idx in header_rows:
+        used = sorted({col for block, _, _, columns in layouts if block['header_row'] == header_row_idx
+                       for col in columns if col < n_cols})
+        grids[header_row_idx] = (df.iloc[header_row_idx + 1:, used].to_numpy(dtype=object),
+                                 {col: j for j, col in enumerate(used)})
+
+    for block, col_indices, remark_header, columns in layouts:
+        grid, positions = grids[block['header_row']]
+        part = np.full((len(grid), 7), np.nan, dtype=object)
+        for j, col in enumerate(columns):
+            if col < n_cols:
+                part[:, j] = grid[:, positions[col]]
+        yield block, col_indices, remark_header, part
+
+
+def parse_suivi_be(df, blocks, selected_dates):
+    """
+    Analyse les blocs sélectionnés sans toucher à la session (étape pure, réutilisable en thread).
+    Chaque bloc est découpé (Joueur, 5 métriques, Remarque) et empilé dans une seule table :
+    masques de noms et conversion des métriques se font en une passe pour tous les blocs.
+    Retourne un résultat par bloc : entries, names (joueurs valides, ordre des lignes), skipped_*.
+    """
+    parsed_blocks = []
+    parts = []
+    selected = [block for block in blocks if block['date'] in selected_dates]
+    for block, col_indices, remark_header, part in iter_suivi_be_blocks(df, selected):
+        parsed_blocks.append({
+            'date': block['date'],
+            'date_str': block['date_str'],
+            'start_col': block['start_col'],
+            'end_col': block['end_col'],
+            'col_indices': col_indices,
+            'remark_header': remark_header,
+            'names': [],
+            'entries': [],
+            'skipped_reasons': {},
+            'skipped_players': [],
+        })
+        parts.append(part)
+
+    if not parts:
+        return parsed_blocks
+    table = np.concatenate(parts)
+    block_ids = np.repeat(np.arange(len(parts)), [len(part) for part in parts])
+
+    # Lignes vides, EQUIPE et en-têtes ignorés ; remarques (pas en majuscules ou mots-clés) rapportées
+    names = SUIVI_BE_NAMES.classify(table[:, 0])
+    rejected = names[names['status'].isin(('invalid', 'remark'))]
+    for row, name, status, pattern in zip(rejected.index.tolist(), rejected['name'].tolist(),
+                                          rejected['status'].tolist(), rejected['pattern'].tolist()):
+        if status == 'invalid':
+            reason = "pas en majuscules (nom invalide)"
+        else:
+            reason = f"pattern remarque: '{pattern}'"
+        parsed_blocks[block_ids[row]]['skipped_reasons'][name] = reason
+
+    kept = names.loc[names['status'] == 'player', 'name']
+    rows = kept.index.to_numpy()
+
+    # Métriques (0-5) - accepte 0 comme valeur valide : toutes les cellules converties en une passe
+    cells = table[rows, 1:6]
+    metrics = parse_metric_cells(pd.Series(cells.ravel())).to_numpy().reshape(cells.shape).tolist()
+
+    remarks = pd.Series(table[rows, 6])
+    remarks = remarks[remarks.notna()].map(str).str.strip()
+    remarks = remarks[~remarks.str.lower().isin(IMPORT_EMPTY_REMARKS)]
+    remarks = dict(zip(remarks.index.tolist(), remarks.tolist()))
+
+    metric_keys = [key for key, _ in SUIVI_BE_METRIC_OFFSETS]
+    for i, (block_id, name) in enumerate(zip(block_ids[rows].tolist(), kept.tolist())):
+        parsed = parsed_blocks[block_id]
+        parsed['names'].append(name)
+        entry = {'name': name}
+        for metric_key, value in zip(metric_keys, metrics[i]):
+            if value == value:
+                entry[metric_key] = value
+        # N'ajouter que si on a au moins une métrique (0 est valide!)
+        if len(entry) > 1:
+            if i in remarks:
+                entry['remark'] = remarks[i]
+            parsed['entries'].append(entry)
+        else:
+            parsed['skipped_players'].append(name)
+    return parsed_blocks
+
+
+def suivi_be_block_hashes(df, blocks):
+    """
+    Empreinte du contenu de chaque date "Suivi BE" (cellules du bloc et colonnes mappées), étape pure.
+    Sert à repérer les blocs inchangés depuis le dernier import.
+    """
+    hashes = {}
+    for block, col_indices, remark_header, part in iter_suivi_be_blocks(df, blocks):
+        date_key = block['date']
+        hashes[date_key] = section_hash([hashes.get(date_key), block['date_str'], col_indices,
+                                         remark_header, part.tolist()])[:16]
+    return hashes
+
+
+def get_import_watermark(sheet_name):
+    """Repère du dernier import d'un onglet : {'last_date', 'blocks': {date: {'hash', 'entries'}}}"""
+    import streamlit as st
+    watermarks = st.session_state.settings.get('import_watermarks', {})
+    return watermarks.get(sheet_name, {'last_date': None, 'blocks': {}})
+
+
+def changed_suivi_be_blocks(blocks, hashes, watermark, known_dates):
+    """
+    Blocs nouveaux ou modifiés depuis le repère. Un bloc inchangé est repris si sa date,
+    importée avec des entrées, a depuis disparu des données.
+    """
+    changed = []
+    for block in blocks:
+        mark = watermark['blocks'].get(block['date'])
+        if mark and mark['hash'] == hashes[block['date']] and (not mark['entries'] or block['date'] in known_dates):
+            continue
+        changed.append(block)
+    return changed
+
+
+def update_import_watermark(sheet_name, parsed_blocks, hashes):
+    """
+    Enregistre dans les paramètres l'empreinte des blocs analysés et la dernière date importée.
+    Les blocs antérieurs à la plage analysée (`hashes`) sont oubliés : le repère garde la taille
+    de cette plage au lieu de grandir à chaque import.
+    Retourne l'enregistrement du journal à sauvegarder avec l'import.
+    """
+    import streamlit as st
+    watermark = get_import_watermark(sheet_name)
+    oldest = min(hashes, default='')
+    marks = {d: m for d, m in watermark['blocks'].items() if d >= oldest}
+    entries = {}
+    for parsed in parsed_blocks:
+        entries[parsed['date']] = entries.get(parsed['date'], 0) + len(parsed['entries'])
+    for date_key, count in entries.items():
+        marks[date_key] = {'hash': hashes[date_key], 'entries': count}
+    imported = [d for d, count in entries.items() if count]
+    last_date = max(imported + ([watermark['last_date']] if watermark['last_date'] else []), default=None)
+    # Nouveaux objets : les paramètres chargés peuvent être partagés avec l'état commun
+    st.session_state.settings['import_watermarks'] = {
+        **st.session_state.settings.get('import_watermarks', {}),
+        sheet_name: {'last_date': last_date, 'blocks': marks},
+    }
+    return settings_record(['import_watermarks'])
 
 
-def process_suivi_be_data(df, selected_dates=None, debug=False):
+def create_missing_players(names):
+    """Crée les joueurs importés absents de l'effectif (poste par défaut). Retourne les nouveaux joueurs."""
+    registry = get_registry()
+    new_players = []
+    for name in names:
+        if name not in registry.by_name:
+            player = {
+                'id': f"p_{len(st.session_state.players) + 1}_{datetime.now().timestamp():.0f}",
+                'name': name,
+                'position': 'Pilier gauche',
+                'status': 'Apte',
+                'targetWeight': 95
+            }
+            registry.add(player)
+            new_players.append(player)
+    return new_players
+
+
+def load_import_seasons(date_keys):
+    """
+    Charge dans la session les saisons archivées des dates importées, avant toute fusion :
+    une date absente de la session serait sinon réécrite avec les seules entrées importées.
+    """
+    return ensure_partitions({season_of(d) for d in date_keys})
+
+
+def apply_suivi_be_blocks(parsed_blocks):
+    """
+    Applique des blocs analysés : joueurs manquants créés, journées fusionnées avec les données existantes.
+    La sauvegarde est laissée à l'appelant (une seule pour tout l'import).
+    Retourne (nouveaux joueurs, clés de dates importées).
+    """
+    import streamlit as st
+    load_import_seasons(parsed['date'] for parsed in parsed_blocks if parsed['entries'])
+    own_session_data()
+    new_players = create_missing_players(name for parsed in parsed_blocks for name in parsed['names'])
+
+    keys_imported = []
+    store = get_store()
+    for parsed in parsed_blocks:
+        entries = parsed['entries']
+        if not entries:
+            continue
+        date_key = parsed['date']
+        # Fusionner avec les données existantes ou créer
+        if date_key in st.session_state.data:
+            existing = {e['name']: e for e in st.session_state.data[date_key]}
+            for entry in entries:
+                existing[entry['name']] = entry
+            st.session_state.data[date_key] = list(existing.values())
+        else:
+            st.session_state.data[date_key] = entries
+        store.set_day(date_key, st.session_state.data[date_key])
+        keys_imported.append(date_key)
+    return new_players, keys_imported
+
+
+def show_suivi_be_debug(parsed):
+    """Affiche le détail du parsing d'un bloc (mode debug)"""
+    import streamlit as st
+    col_indices = parsed['col_indices']
+    st.write(f"📊 Traitement de **{parsed['date_str']}** (colonnes {parsed['start_col']}-{parsed['end_col']})")
+    if parsed['remark_header'] is not None:
+        st.write(f"  ✅ Remarque trouvée en colonne {col_indices['remark']} (header: '{parsed['remark_header']}')")
+    elif 'remark' in col_indices:
+        st.write(f"  📝 Remarque assignée par position par défaut à colonne {col_indices['remark']}")
+    st.write(f"  Colonnes mappées (par position): name={col_indices.get('name')}, sleep={col_indices.get('sleep')}, mentalLoad={col_indices.get('mentalLoad')}, motivation={col_indices.get('motivation')}, hdcState={col_indices.get('hdcState')}, bdcState={col_indices.get('bdcState')}, remark={col_indices.get('remark')}")
+
+    entries = parsed['entries']
+    skipped_reasons = parsed['skipped_reasons']
+    skipped_players = parsed['skipped_players']
+    entries_with_remarks = sum(1 for e in entries if e.get('remark'))
+    st.write(f"  → {len(entries)} joueurs avec données ({entries_with_remarks} avec remarques)")
+    if skipped_reasons:
+        with st.expander(f"⚠️ {len(skipped_reasons)} noms filtrés (pas des joueurs)"):
+            for name, reason in list(skipped_reasons.items())[:10]:
+                st.write(f"  • `{name}` - {reason}")
+    if skipped_players and len(skipped_players) <= 5:
+        st.write(f"  ⚠️ Joueurs sans métriques valides: {skipped_players}")
+    elif skipped_players:
+        st.write(f"  ⚠️ {len(skipped_players)} joueurs sans métriques valides")
+
+
+def process_suivi_be_data(df, selected_dates=None, debug=False, sheet_name=None):
     """
     Traite les données du format "Suivi BE" avec les jours côte à côte.
+    Avec sheet_name (import incrémental), les dates dont le bloc n'a pas changé depuis
+    le dernier import de cet onglet sont ignorées et le repère est mis à jour.
     """
     try:
         import streamlit as st
@@ -1370,238 +4554,40 @@ def process_suivi_be_data(df, selected_dates=None, debug=False):
                 'available_dates': [{'date': b['date'], 'label': b['date_str']} for b in blocks]
             }
         
-        # 2. Traiter chaque bloc sélectionné
-        total_entries = 0
-        players_created = 0
-        dates_imported = []
-        
-        for block in blocks:
-            if block['date'] not in selected_dates:
-                continue
-            
-            date_key = block['date']
-            start_col = block['start_col']
-            end_col = block['end_col']
-            header_row_idx = block['header_row']
-            
-            if debug:
-                st.write(f"📊 Traitement de **{block['date_str']}** (colonnes {start_col}-{end_col})")
-            
-            # Mapper les colonnes par POSITION relative depuis "Joueur"
-            # Structure: Joueur | Sommeil | Charge | Motivation | HDC | BDC | Moyenne | Remarque | [prochain Joueur]
-            header_row_data = df.iloc[header_row_idx]
-            col_indices = {'name': start_col}
-            
-            # Les en-têtes des métriques sont souvent vides (None) dans le CSV exporté
-            # On mappe par position relative depuis la colonne Joueur
-            col_indices['sleep'] = start_col + 1
-            col_indices['mentalLoad'] = start_col + 2
-            col_indices['motivation'] = start_col + 3
-            col_indices['hdcState'] = start_col + 4
-            col_indices['bdcState'] = start_col + 5
-            # +6 serait Moyenne (on l'ignore)
-            # +7 serait Remarque
-            
-            # Chercher la colonne Remarque explicitement d'abord
-            remark_found = False
-            # Chercher dans les colonnes après BDC jusqu'à la fin du bloc
-            for offset in range(5, min(15, end_col - start_col)):
-                check_col = start_col + offset
-                if check_col < len(header_row_data) and check_col < end_col:
-                    cell = header_row_data.iloc[check_col]
-                    if pd.notna(cell):
-                        cell_norm = normalize_text(str(cell))
-                        if 'remarque' in cell_norm or 'commentaire' in cell_norm or 'note' in cell_norm or 'comment' in cell_norm:
-                            col_indices['remark'] = check_col
-                            remark_found = True
-                            if debug:
-                                st.write(f"  ✅ Remarque trouvée en colonne {check_col} (header: '{cell}')")
-                            break
-            
-            # Si pas trouvé par nom, essayer plusieurs positions par défaut
-            if not remark_found:
-                # Essayer +7, +8, +6 dans cet ordre
-                possible_positions = [start_col + 7, start_col + 8, start_col + 6]
-                for remark_col in possible_positions:
-                    if remark_col < end_col and remark_col < len(header_row_data):
-                        col_indices['remark'] = remark_col
-                        if debug:
-                            st.write(f"  📝 Remarque assignée par position par défaut à colonne {remark_col}")
-                        break
-            
-            if debug:
-                st.write(f"  Colonnes mappées (par position): name={col_indices.get('name')}, sleep={col_indices.get('sleep')}, mentalLoad={col_indices.get('mentalLoad')}, motivation={col_indices.get('motivation')}, hdcState={col_indices.get('hdcState')}, bdcState={col_indices.get('bdcState')}, remark={col_indices.get('remark')}")
-            
-            # Extraire les données des joueurs
-            entries = []
-            skipped_players = []
-            skipped_reasons = {}
-            
-            for row_idx in range(header_row_idx + 1, len(df)):
-                row = df.iloc[row_idx]
-                
-                # Récupérer le nom
-                name_col = col_indices.get('name')
-                if name_col >= len(row):
-                    continue
-                
-                name = row.iloc[name_col]
-                if pd.isna(name):
-                    continue
-                
-                name = str(name).strip()
-                
-                # Ignorer lignes vides ou EQUIPE
-                if not name or len(name) < 2:
-                    continue
-                if name.upper() in ['EQUIPE', 'ÉQUIPE', 'TOTAL', 'MOYENNE']:
-                    continue
-                if name.lower() in ['joueur', 'nom', 'nan', 'none']:
-                    continue
-                
-                # Ignorer si le "nom" ressemble à une remarque (trop long ou contient des mots-clés)
-                name_lower = name.lower()
-                
-                # Mots-clés de remarque - phrases ou expressions qui indiquent clairement une remarque
-                # On utilise des expressions plus longues pour éviter les faux positifs sur les noms
-                remark_patterns = [
-                    # Expressions de douleur/blessure
-                    'douleur', 'courbature', 'fatigue', 'crampe', 'blessure', 
-                    'contracture', 'entorse', 'foulure', 'claquage', 'déchir',
-                    'inflamm', 'tendinite', 'élongation', 'lésion', 'lesion',
-                    # Parties du corps (comme début de remarque)
-                    'genou droit', 'genou gauche', 'cheville', 'épaule', 'mollet',
-                    'ischio', 'cuisse', 'adducteur', 'quadri', 'dos bloqué',
-                    'kyste', 'hernie', 'pubis', 'lombes', 'lombaire',
-                    # États
-                    'pas en forme', 'fatigué', 'malade', 'grippé', 'épuisé',
-                    'mieux', 'soucis', 'souci', 'problème', 'probleme',
-                    # Actions/situations
-                    'rien à signaler', 'tout va bien', 'en forme', 'récupération',
-                    'au repos', 'absent', 'indisponible',
-                    # Temporels (indiquent une remarque contextuelle)
-                    'ce matin', 'cette nuit', 'hier soir', 'depuis', 'toujours',
-                    'encore', 'gêné', 'gene',
-                    # Phrases types
-                    'mal au', 'mal à la', 'mal aux', 'douleur au', 'gêne au',
-                    'sensation de', 'léger problème', 'petit souci'
-                ]
-                
-                # RÈGLE PRINCIPALE: Les noms de joueurs sont en MAJUSCULES
-                # Si le texte n'est pas en majuscules, c'est probablement une remarque
-                def is_valid_player_name(text):
-                    """Vérifie si le texte ressemble à un nom de joueur"""
-                    # Doit être principalement en majuscules (au moins 80%)
-                    upper_chars = sum(1 for c in text if c.isupper())
-                    alpha_chars = sum(1 for c in text if c.isalpha())
-                    if alpha_chars == 0:
-                        return False
-                    uppercase_ratio = upper_chars / alpha_chars
-                    
-                    # Critères:
-                    # 1. Au moins 80% majuscules OU entièrement en majuscules
-                    # 2. Pas trop long (max 25 caractères)
-                    # 3. Pas trop d'espaces (max 2 pour les noms composés)
-                    return (
-                        (uppercase_ratio >= 0.8 or text.isupper()) and
-                        len(text) <= 25 and
-                        text.count(' ') <= 2
-                    )
-                
-                skip_reason = None
-                
-                # Vérifier si c'est un nom valide (MAJUSCULES)
-                if not is_valid_player_name(name):
-                    skip_reason = f"pas en majuscules (nom invalide)"
-                # Vérifier les patterns de remarque
-                elif any(pattern in name_lower for pattern in remark_patterns):
-                    matched = [p for p in remark_patterns if p in name_lower]
-                    skip_reason = f"pattern remarque: '{matched[0]}'"
-                
-                if skip_reason:
-                    skipped_reasons[name] = skip_reason
-                    continue
-                
-                # Créer le joueur s'il n'existe pas
-                if not any(p['name'] == name for p in st.session_state.players):
-                    st.session_state.players.append({
-                        'id': f"p_{len(st.session_state.players) + 1}_{datetime.now().timestamp():.0f}",
-                        'name': name,
-                        'position': 'Pilier gauche',
-                        'status': 'Apte',
-                        'targetWeight': 95
-                    })
-                    players_created += 1
-                
-                entry = {'name': name}
-                metrics_found = []
-                
-                # Métriques (0-5) - accepte 0 comme valeur valide
-                for metric_key in ['sleep', 'mentalLoad', 'motivation', 'hdcState', 'bdcState']:
-                    if metric_key in col_indices and col_indices[metric_key] < len(row):
-                        val = row.iloc[col_indices[metric_key]]
-                        if pd.notna(val):
-                            try:
-                                val_str = str(val).replace(',', '.').replace(' ', '')
-                                if val_str and val_str not in ['#DIV/0!', '#N/A', '#VALUE!', '-', '']:
-                                    num = float(val_str)
-                                    if 0 <= num <= 5:  # Accepte 0 comme note valide
-                                        entry[metric_key] = num
-                                        metrics_found.append(metric_key)
-                            except:
-                                pass
-                
-                # Remarque
-                if 'remark' in col_indices and col_indices['remark'] < len(row):
-                    val = row.iloc[col_indices['remark']]
-                    if pd.notna(val):
-                        remark = str(val).strip()
-                        if remark and remark.lower() not in ['nan', 'none', '', '#n/a']:
-                            entry['remark'] = remark
-                
-                # N'ajouter que si on a au moins une métrique (0 est valide!)
-                has_data = any(entry.get(m['key']) is not None for m in METRICS)
-                if has_data:
-                    entries.append(entry)
-                else:
-                    skipped_players.append(name)
-            
+        # 2. Import incrémental : écarter les blocs inchangés depuis le dernier import
+        skipped = 0
+        if sheet_name is not None:
+            selected = [b for b in blocks if b['date'] in selected_dates]
+            hashes = suivi_be_block_hashes(df, selected)
+            changed = changed_suivi_be_blocks(selected, hashes, get_import_watermark(sheet_name), data_dates(st.session_state.data))
+            skipped = len({b['date'] for b in selected}) - len({b['date'] for b in changed})
+            selected_dates = {b['date'] for b in changed}
             if debug:
-                entries_with_remarks = sum(1 for e in entries if e.get('remark'))
-                st.write(f"  → {len(entries)} joueurs avec données ({entries_with_remarks} avec remarques)")
-                if skipped_reasons:
-                    with st.expander(f"⚠️ {len(skipped_reasons)} noms filtrés (pas des joueurs)"):
-                        for name, reason in list(skipped_reasons.items())[:10]:
-                            st.write(f"  • `{name}` - {reason}")
-                if skipped_players and len(skipped_players) <= 5:
-                    st.write(f"  ⚠️ Joueurs sans métriques valides: {skipped_players}")
-                elif skipped_players:
-                    st.write(f"  ⚠️ {len(skipped_players)} joueurs sans métriques valides")
-            
-            if entries:
-                # Fusionner avec les données existantes ou créer
-                if date_key in st.session_state.data:
-                    existing = {e['name']: e for e in st.session_state.data[date_key]}
-                    for entry in entries:
-                        existing[entry['name']] = entry
-                    st.session_state.data[date_key] = list(existing.values())
-                else:
-                    st.session_state.data[date_key] = entries
-                
-                total_entries += len(entries)
-                dates_imported.append(block['date_str'])
+                st.write(f"⚡ {skipped} dates inchangées depuis le dernier import, {len(selected_dates)} à traiter")
         
-        if dates_imported:
-            # AUTO-SAVE après import réussi
-            save_data_to_file()
-            
+        # 3. Analyser chaque bloc sélectionné, puis appliquer le tout en une transaction
+        parsed_blocks = parse_suivi_be(df, blocks, selected_dates)
+        if debug:
+            for parsed in parsed_blocks:
+                show_suivi_be_debug(parsed)
+        new_players, keys_imported = apply_suivi_be_blocks(parsed_blocks)
+        records = [player_record(p) for p in new_players] + [day_record(d) for d in keys_imported]
+        if sheet_name is not None and parsed_blocks:
+            records.append(update_import_watermark(sheet_name, parsed_blocks, hashes))
+        if records:
+            # AUTO-SAVE après import réussi (journal : nouveaux joueurs + dates importées + repère)
+            save_changes(records, cloud=bool(keys_imported))
+        
+        imported = [p for p in parsed_blocks if p['entries']]
+        if imported or (skipped and not parsed_blocks):
             return {
                 'success': True,
                 'mode': 'imported',
-                'dates_imported': dates_imported,
-                'entries': total_entries,
-                'new_players': players_created,
-                'players': len(st.session_state.players)
+                'dates_imported': [p['date_str'] for p in imported],
+                'entries': sum(len(p['entries']) for p in imported),
+                'new_players': len(new_players),
+                'players': len(st.session_state.players),
+                'skipped': skipped
             }
         else:
             return {'success': False, 'error': "Aucune donnée importée. Activez le mode debug pour voir les détails du parsing."}
@@ -1613,6 +4599,140 @@ def process_suivi_be_data(df, selected_dates=None, debug=False):
         return {'success': False, 'error': str(e)}
 
 
+def parse_weight_cell(weight_val):
+    """Poids en kg d'une cellule (entre 50 et 200 kg pour un rugbyman), None si absent ou invalide"""
+    if pd.isna(weight_val):
+        return None
+    try:
+        if isinstance(weight_val, (int, float)):
+            weight = float(weight_val)
+        else:
+            weight = float(str(weight_val).replace(',', '.').strip())
+    except (TypeError, ValueError):
+        return None
+    if weight < 50 or weight > 200:
+        return None
+    return weight
+
+
+def parse_suivi_poids_dates(df):
+    """Dates de la première ligne de l'onglet "Suivi Poids" : [{'col_idx', 'date', 'date_str'}]"""
+    dates_info = []
+    for col_idx, cell in enumerate(df.iloc[0].tolist()[1:], start=1):
+        if pd.notna(cell):
+            cell_str = str(cell).strip()
+            # Essayer de parser la date (format DD/MM ou DD/MM/YY ou DD/MM/YYYY)
+            parsed_date = parse_short_date(cell_str)
+            if parsed_date:
+                dates_info.append({
+                    'col_idx': col_idx,
+                    'date': parsed_date,
+                    'date_str': cell_str
+                })
+    return dates_info
+
+
+def parse_suivi_poids(df, selected_dates=None):
+    """
+    Analyse l'onglet "Suivi Poids" sans toucher à la session (étape pure, réutilisable en thread).
+    
+    Format attendu :
+    - Ligne 0 : vide, puis dates (23/06, 24/06, etc.)
+    - Colonne 1 : noms des joueurs (colonne 0 = index)
+    - Cellules : poids en kg
+    
+    Seules les colonnes des dates de selected_dates sont lues (toutes si None, aucune si vide).
+    Retourne {'dates': [{'col_idx', 'date', 'date_str'}], 'rows': [(nom, [(date, poids ou None)])]}.
+    """
+    # 1. Extraire les dates depuis la première ligne
+    dates_info = parse_suivi_poids_dates(df)
+    
+    # 2. Poids par joueur (ligne) et par date (colonne), limités aux colonnes utiles
+    wanted = [d for d in dates_info if selected_dates is None or d['date'] in selected_dates]
+    rows = []
+    if wanted:
+        # COLONNE 1 = noms des joueurs, puis les colonnes des dates retenues
+        cells = df.iloc[1:, [1] + [d['col_idx'] for d in wanted]]
+        for player_name_raw, *values in cells.itertuples(index=False, name=None):
+            if pd.isna(player_name_raw):
+                continue
+            player_name_raw = str(player_name_raw).strip()
+            if not player_name_raw:
+                continue
+            rows.append((player_name_raw, [(d['date'], parse_weight_cell(v)) for d, v in zip(wanted, values)]))
+    return {'dates': dates_info, 'rows': rows}
+
+
+def apply_suivi_poids(parsed, selected_dates):
+    """
+    Met à jour le poids des entrées existantes aux dates sélectionnées (joueurs reconnus par nom).
+    La sauvegarde est laissée à l'appelant.
+    Retourne {'updates', 'players_updated', 'dates_updated', 'players_not_found', 'dates_not_found'}.
+    """
+    import streamlit as st
+    # Mapping des noms de joueurs existants
+    existing_players = {p['name'].upper().strip(): p['name'] for p in st.session_state.players}
+    load_import_seasons(selected_dates)
+    own_session_data()
+    updates_count = 0
+    players_updated = set()
+    dates_updated = set()
+    players_not_found = set()
+    dates_not_found = set()
+    
+    for player_name_raw, weights in parsed['rows']:
+        # Chercher le joueur dans les existants
+        player_name_upper = player_name_raw.upper()
+        matched_name = None
+        
+        # Correspondance exacte
+        if player_name_upper in existing_players:
+            matched_name = existing_players[player_name_upper]
+        else:
+            # Essayer une correspondance partielle
+            for key, name in existing_players.items():
+                if player_name_upper in key or key in player_name_upper:
+                    matched_name = name
+                    break
+        
+        if not matched_name:
+            players_not_found.add(player_name_raw)
+            continue
+        
+        # Parcourir les dates sélectionnées et mettre à jour le poids
+        for date_key, weight in weights:
+            if date_key not in selected_dates:
+                continue
+            
+            # Vérifier si cette date existe dans les données wellness
+            if date_key not in st.session_state.data:
+                dates_not_found.add(date_key)
+                continue
+            
+            if weight is None:
+                continue
+            
+            # Mettre à jour le poids dans les données wellness de cette date
+            for entry in st.session_state.data[date_key]:
+                if entry.get('name') == matched_name:
+                    entry['weight'] = round(weight, 1)
+                    updates_count += 1
+                    players_updated.add(matched_name)
+                    dates_updated.add(date_key)
+                    break
+    
+    store = get_store()
+    for date_key in dates_updated:
+        store.set_day(date_key, st.session_state.data[date_key])
+    return {
+        'updates': updates_count,
+        'players_updated': players_updated,
+        'dates_updated': dates_updated,
+        'players_not_found': players_not_found,
+        'dates_not_found': dates_not_found,
+    }
+
+
 def process_suivi_poids_data(df, selected_dates=None, debug=False):
     """
     Traite les données du format "Suivi Poids" - met à jour le poids des joueurs existants.
@@ -1634,44 +4754,16 @@ def process_suivi_poids_data(df, selected_dates=None, debug=False):
             if len(df) > 1 and len(df.columns) > 1:
                 st.write(f"  Col 1, Ligne 1 (1er joueur): `{df.iloc[1, 1]}`")
         
-        # 1. Extraire les dates depuis la première ligne
-        date_row = df.iloc[0]
-        dates_info = []
+        # 1. Extraire les dates (ligne 0) et les poids
+        parsed = parse_suivi_poids(df, selected_dates or ())
+        dates_info = parsed['dates']
         
         # Récupérer les dates existantes dans les données wellness pour référence
-        existing_wellness_dates = set(st.session_state.data.keys())
+        existing_wellness_dates = set(data_dates(st.session_state.data))
         
         if debug:
             st.write(f"**Dates wellness existantes (exemples):** {list(existing_wellness_dates)[:5]}")
         
-        for col_idx in range(1, len(date_row)):
-            cell = date_row.iloc[col_idx]
-            if pd.notna(cell):
-                cell_str = str(cell).strip()
-                # Essayer de parser la date (format DD/MM ou DD/MM/YY ou DD/MM/YYYY)
-                parsed_date = None
-                for fmt in ['%d/%m', '%d/%m/%y', '%d/%m/%Y', '%d-%m', '%d-%m-%y', '%d-%m-%Y']:
-                    try:
-                        parsed = datetime.strptime(cell_str, fmt)
-                        # Si pas d'année, utiliser l'année courante ou 2025/2026
-                        if fmt in ['%d/%m', '%d-%m']:
-                            # Déterminer l'année selon le mois
-                            if parsed.month >= 7:  # Juillet ou après → année de début
-                                parsed = parsed.replace(year=2025)
-                            else:  # Avant juillet → année de fin
-                                parsed = parsed.replace(year=2026)
-                        parsed_date = parsed.strftime('%Y-%m-%d')
-                        break
-                    except:
-                        continue
-                
-                if parsed_date:
-                    dates_info.append({
-                        'col_idx': col_idx,
-                        'date': parsed_date,
-                        'date_str': cell_str
-                    })
-        
         if not dates_info:
             return {'success': False, 'error': "Aucune date trouvée dans la première ligne."}
         
@@ -1692,100 +4784,20 @@ def process_suivi_poids_data(df, selected_dates=None, debug=False):
                 'available_dates': [{'date': d['date'], 'label': d['date_str']} for d in dates_info]
             }
         
-        # 2. Créer un mapping des noms de joueurs existants
-        existing_players = {p['name'].upper().strip(): p['name'] for p in st.session_state.players}
-        
         if debug:
-            st.write(f"**Joueurs existants:** {len(existing_players)}")
+            st.write(f"**Joueurs existants:** {len({p['name'].upper().strip() for p in st.session_state.players})}")
             st.write("**Premiers noms dans le fichier (colonne 1):**")
             for i in range(1, min(6, len(df))):
                 if len(df.columns) > 1:
                     st.write(f"  Ligne {i}: `{df.iloc[i, 1]}`")
         
-        # 3. Parcourir les lignes (joueurs) et colonnes (dates) pour mettre à jour le poids
-        updates_count = 0
-        players_updated = set()
-        dates_updated = set()
-        players_not_found = set()
-        dates_not_found = set()
-        
-        for row_idx in range(1, len(df)):  # Commencer à la ligne 1 (après les dates)
-            row = df.iloc[row_idx]
-            
-            # Les noms sont en colonne 1 (pas colonne 0 qui contient l'index)
-            if len(row) < 2:
-                continue
-            
-            player_name_raw = row.iloc[1]  # COLONNE 1 = noms des joueurs
-            
-            if pd.isna(player_name_raw):
-                continue
-            
-            player_name_raw = str(player_name_raw).strip()
-            if not player_name_raw:
-                continue
-            
-            # Chercher le joueur dans les existants
-            player_name_upper = player_name_raw.upper()
-            matched_name = None
-            
-            # Correspondance exacte
-            if player_name_upper in existing_players:
-                matched_name = existing_players[player_name_upper]
-            else:
-                # Essayer une correspondance partielle
-                for key, name in existing_players.items():
-                    if player_name_upper in key or key in player_name_upper:
-                        matched_name = name
-                        break
-            
-            if not matched_name:
-                players_not_found.add(player_name_raw)
-                continue
-            
-            # Parcourir les dates sélectionnées et mettre à jour le poids
-            for date_info in dates_info:
-                if date_info['date'] not in selected_dates:
-                    continue
-                
-                col_idx = date_info['col_idx']
-                date_key = date_info['date']
-                
-                if col_idx >= len(row):
-                    continue
-                
-                # Vérifier si cette date existe dans les données wellness
-                if date_key not in st.session_state.data:
-                    dates_not_found.add(date_key)
-                    continue
-                
-                weight_val = row.iloc[col_idx]
-                
-                if pd.isna(weight_val):
-                    continue
-                
-                # Parser le poids
-                try:
-                    if isinstance(weight_val, (int, float)):
-                        weight = float(weight_val)
-                    else:
-                        weight_str = str(weight_val).replace(',', '.').strip()
-                        weight = float(weight_str)
-                    
-                    # Valider le poids (entre 50 et 200 kg pour un rugbyman)
-                    if weight < 50 or weight > 200:
-                        continue
-                except:
-                    continue
-                
-                # Mettre à jour le poids dans les données wellness de cette date
-                for entry in st.session_state.data[date_key]:
-                    if entry.get('name') == matched_name:
-                        entry['weight'] = round(weight, 1)
-                        updates_count += 1
-                        players_updated.add(matched_name)
-                        dates_updated.add(date_key)
-                        break
+        # 2. Mettre à jour le poids des joueurs reconnus aux dates sélectionnées
+        result = apply_suivi_poids(parsed, selected_dates)
+        updates_count = result['updates']
+        players_updated = result['players_updated']
+        dates_updated = result['dates_updated']
+        players_not_found = result['players_not_found']
+        dates_not_found = result['dates_not_found']
         
         if debug:
             if players_not_found:
@@ -1795,8 +4807,8 @@ def process_suivi_poids_data(df, selected_dates=None, debug=False):
             st.write(f"**Mises à jour:** {updates_count}")
         
         if updates_count > 0:
-            # AUTO-SAVE après import réussi
-            save_data_to_file()
+            # AUTO-SAVE après import réussi (journal des dates modifiées)
+            save_changes([day_record(d) for d in sorted(dates_updated)])
             
             return {
                 'success': True,
@@ -1824,9 +4836,9 @@ def process_suivi_poids_data(df, selected_dates=None, debug=False):
         return {'success': False, 'error': str(e)}
 
 
-def process_imported_data(df, debug=False):
+def parse_imported_data(df, debug=False):
     """
-    Traite les données importées depuis Google Sheets.
+    Analyse l'onglet "Bien-être" (une journée) sans toucher à la session (étape pure, réutilisable en thread).
     Version améliorée avec détection flexible des en-têtes.
     
     Structure attendue :
@@ -1834,305 +4846,271 @@ def process_imported_data(df, debug=False):
     - Ligne d'en-têtes : Joueur, Poids, Sommeil, Charge mentale, Motivation, état général HDC, état général BDC, Moyenne, ..., Remarque
     - Ligne EQUIPE (à ignorer)
     - Données des joueurs
+    
+    Retourne {'success', 'date', 'entries', 'names' (joueurs des lignes retenues), 'columns_found'}.
     """
-    try:
-        debug_info = [] if debug else None
-        
-        if debug:
-            st.write("### 🔍 Analyse détaillée du fichier")
-            st.write(f"**Dimensions:** {len(df)} lignes × {len(df.columns)} colonnes")
-            st.write("**Aperçu des premières lignes:**")
-            st.dataframe(df.head(10))
-        
-        # 1. Chercher la date dans les premières lignes
-        date_found = None
-        for i in range(min(10, len(df))):
-            for j in range(len(df.columns)):
-                cell = df.iloc[i, j]
-                if pd.notna(cell):
-                    parsed = parse_date_french(str(cell))
-                    if parsed:
-                        date_found = parsed
-                        if debug:
-                            st.success(f"📅 Date trouvée ligne {i}, colonne {j}: **{format_date(date_found, 'full')}** (valeur: '{cell}')")
-                        break
-            if date_found:
-                break
-        
-        if not date_found:
-            date_found = datetime.now().strftime('%Y-%m-%d')
-            if debug:
-                st.warning(f"⚠️ Date non trouvée, utilisation de la date du jour: {date_found}")
-        
-        # 2. Chercher la ligne d'en-têtes avec plusieurs stratégies
-        header_row = None
-        col_indices = {}
-        
-        # Mots-clés pour détecter la ligne d'en-têtes
-        header_keywords = ['joueur', 'nom', 'poids', 'sommeil', 'motivation', 'charge']
-        
-        for i in range(min(20, len(df))):
-            row = df.iloc[i]
-            row_values = [str(x).lower().strip() for x in row if pd.notna(x)]
-            row_text = ' '.join(row_values)
-            
-            if debug:
-                debug_info.append(f"\n**Ligne {i}:** {row_values[:8]}")
-            
-            # Compter combien de mots-clés d'en-tête sont présents
-            keywords_found = sum(1 for kw in header_keywords if kw in row_text)
-            
-            if debug:
-                debug_info.append(f"  Keywords trouvés: {keywords_found}")
-            
-            # Si on trouve au moins 3 mots-clés, c'est probablement l'en-tête
-            if keywords_found >= 3:
-                header_row = i
-                if debug:
-                    st.success(f"📋 En-tête détecté ligne {i} ({keywords_found} mots-clés)")
-                
-                # Mapper les colonnes avec des recherches flexibles
-                col_indices['name'] = find_column_index(row, ['joueur', 'nom'], debug_info)
-                col_indices['weight'] = find_column_index(row, ['poids', 'weight'], debug_info)
-                col_indices['sleep'] = find_column_index(row, ['sommeil', 'sleep'], debug_info)
-                col_indices['mentalLoad'] = find_column_index(row, ['charge mentale', 'charge', 'mental'], debug_info)
-                col_indices['motivation'] = find_column_index(row, ['motivation'], debug_info)
-                col_indices['hdcState'] = find_column_index(row, ['hdc', 'etat general hdc', 'etat hdc'], debug_info)
-                col_indices['bdcState'] = find_column_index(row, ['bdc', 'etat general bdc', 'etat bdc'], debug_info)
-                col_indices['remark'] = find_column_index(row, ['remarque', 'commentaire', 'note'], debug_info)
-                
-                # Filtrer les None
-                col_indices = {k: v for k, v in col_indices.items() if v is not None}
-                break
-        
-        if debug and debug_info:
-            with st.expander("🔧 Détails du parsing"):
-                for line in debug_info:
-                    st.write(line)
-        
-        if header_row is None:
-            # Stratégie de fallback: chercher une ligne avec "Joueur" ou "JOUEUR"
-            for i in range(min(20, len(df))):
-                row = df.iloc[i]
-                for j, cell in enumerate(row):
-                    if pd.notna(cell) and normalize_text(cell) in ['joueur', 'nom']:
-                        header_row = i
-                        col_indices['name'] = j
-                        if debug:
-                            st.warning(f"🔄 Fallback: en-tête trouvé ligne {i} via 'Joueur'")
-                        break
-                if header_row is not None:
+    debug_info = [] if debug else None
+    
+    if debug:
+        st.write("### 🔍 Analyse détaillée du fichier")
+        st.write(f"**Dimensions:** {len(df)} lignes × {len(df.columns)} colonnes")
+        st.write("**Aperçu des premières lignes:**")
+        st.dataframe(df.head(10))
+    
+    # 1. Chercher la date dans les premières lignes
+    date_found = None
+    for i in range(min(10, len(df))):
+        for j, cell in enumerate(df.iloc[i].tolist()):
+            if pd.notna(cell):
+                parsed = parse_date_french(str(cell))
+                if parsed:
+                    date_found = parsed
+                    if debug:
+                        st.success(f"📅 Date trouvée ligne {i}, colonne {j}: **{format_date(date_found, 'full')}** (valeur: '{cell}')")
                     break
+        if date_found:
+            break
+    
+    if not date_found:
+        date_found = datetime.now().strftime('%Y-%m-%d')
+        if debug:
+            st.warning(f"⚠️ Date non trouvée, utilisation de la date du jour: {date_found}")
+    
+    # 2. Chercher la ligne d'en-têtes avec plusieurs stratégies
+    header_row = None
+    col_indices = {}
+    
+    # Mots-clés pour détecter la ligne d'en-têtes
+    header_keywords = ['joueur', 'nom', 'poids', 'sommeil', 'motivation', 'charge']
+    
+    for i in range(min(20, len(df))):
+        row = df.iloc[i]
+        row_values = [str(x).lower().strip() for x in row if pd.notna(x)]
+        row_text = ' '.join(row_values)
         
-        if header_row is None:
-            return {'success': False, 'error': "Ligne d'en-tête non trouvée. Le fichier doit contenir une ligne avec 'Joueur', 'Poids', 'Sommeil', etc."}
+        if debug:
+            debug_info.append(f"\n**Ligne {i}:** {row_values[:8]}")
         
-        if 'name' not in col_indices:
-            return {'success': False, 'error': "Colonne 'Joueur' non trouvée. Vérifiez que la colonne des noms est présente."}
+        # Compter combien de mots-clés d'en-tête sont présents
+        keywords_found = sum(1 for kw in header_keywords if kw in row_text)
         
         if debug:
-            st.write(f"**Colonnes mappées:** {col_indices}")
+            debug_info.append(f"  Keywords trouvés: {keywords_found}")
         
-        # 3. Si on n'a pas trouvé toutes les colonnes de métriques, essayer de les déduire par position
-        if len([k for k in col_indices if k in ['sleep', 'mentalLoad', 'motivation', 'hdcState', 'bdcState']]) < 3:
+        # Si on trouve au moins 3 mots-clés, c'est probablement l'en-tête
+        if keywords_found >= 3:
+            header_row = i
             if debug:
-                st.warning("⚠️ Peu de colonnes métriques trouvées, tentative de mapping par position...")
+                st.success(f"📋 En-tête détecté ligne {i} ({keywords_found} mots-clés)")
             
-            # Supposer un ordre standard après 'name'
-            # Structure: Joueur | Poids | Sommeil | Charge | Motivation | HDC | BDC | Moyenne | Remarque
-            #              +0      +1      +2        +3        +4         +5    +6     +7        +8
-            name_col = col_indices.get('name', 0)
+            # Mapper les colonnes avec des recherches flexibles
+            col_indices['name'] = find_column_index(row, ['joueur', 'nom'], debug_info)
+            col_indices['weight'] = find_column_index(row, ['poids', 'weight'], debug_info)
+            col_indices['sleep'] = find_column_index(row, ['sommeil', 'sleep'], debug_info)
+            col_indices['mentalLoad'] = find_column_index(row, ['charge mentale', 'charge', 'mental'], debug_info)
+            col_indices['motivation'] = find_column_index(row, ['motivation'], debug_info)
+            col_indices['hdcState'] = find_column_index(row, ['hdc', 'etat general hdc', 'etat hdc'], debug_info)
+            col_indices['bdcState'] = find_column_index(row, ['bdc', 'etat general bdc', 'etat bdc'], debug_info)
+            col_indices['remark'] = find_column_index(row, ['remarque', 'commentaire', 'note'], debug_info)
             
-            position_map = {
-                'weight': name_col + 1,
-                'sleep': name_col + 2,
-                'mentalLoad': name_col + 3,
-                'motivation': name_col + 4,
-                'hdcState': name_col + 5,
-                'bdcState': name_col + 6,
-                # +7 = Moyenne (on l'ignore)
-                'remark': name_col + 8
-            }
-            
-            for metric, pos in position_map.items():
-                if metric not in col_indices:
-                    col_indices[metric] = pos
+            # Filtrer les None
+            col_indices = {k: v for k, v in col_indices.items() if v is not None}
+            break
+    
+    if debug and debug_info:
+        with st.expander("🔧 Détails du parsing"):
+            for line in debug_info:
+                st.write(line)
+    
+    if header_row is None:
+        # Stratégie de fallback: chercher une ligne avec "Joueur" ou "JOUEUR"
+        for i in range(min(20, len(df))):
+            row = df.iloc[i]
+            for j, cell in enumerate(row):
+                if pd.notna(cell) and normalize_text(cell) in ['joueur', 'nom']:
+                    header_row = i
+                    col_indices['name'] = j
                     if debug:
-                        st.write(f"  → {metric} assigné à la colonne {pos}")
-        
-        # Ajouter la remarque par position si pas trouvée
-        if 'remark' not in col_indices:
-            # La remarque est après BDC + Moyenne, donc +2
-            last_metric_col = max([col_indices.get(k, 0) for k in ['sleep', 'mentalLoad', 'motivation', 'hdcState', 'bdcState'] if k in col_indices], default=0)
-            if last_metric_col > 0:
-                # +1 serait Moyenne, +2 est Remarque
-                col_indices['remark'] = last_metric_col + 2
+                        st.warning(f"🔄 Fallback: en-tête trouvé ligne {i} via 'Joueur'")
+                    break
+            if header_row is not None:
+                break
+    
+    if header_row is None:
+        return {'success': False, 'error': "Ligne d'en-tête non trouvée. Le fichier doit contenir une ligne avec 'Joueur', 'Poids', 'Sommeil', etc."}
+    
+    if 'name' not in col_indices:
+        return {'success': False, 'error': "Colonne 'Joueur' non trouvée. Vérifiez que la colonne des noms est présente."}
+    
+    if debug:
+        st.write(f"**Colonnes mappées:** {col_indices}")
+    
+    # 3. Si on n'a pas trouvé toutes les colonnes de métriques, essayer de les déduire par position
+    if len([k for k in col_indices if k in ['sleep', 'mentalLoad', 'motivation', 'hdcState', 'bdcState']]) < 3:
+        if debug:
+            st.warning("⚠️ Peu de colonnes métriques trouvées, tentative de mapping par position...")
+        
+        # Supposer un ordre standard après 'name'
+        # Structure: Joueur | Poids | Sommeil | Charge | Motivation | HDC | BDC | Moyenne | Remarque
+        #              +0      +1      +2        +3        +4         +5    +6     +7        +8
+        name_col = col_indices.get('name', 0)
+        
+        position_map = {
+            'weight': name_col + 1,
+            'sleep': name_col + 2,
+            'mentalLoad': name_col + 3,
+            'motivation': name_col + 4,
+            'hdcState': name_col + 5,
+            'bdcState': name_col + 6,
+            # +7 = Moyenne (on l'ignore)
+            'remark': name_col + 8
+        }
+        
+        for metric, pos in position_map.items():
+            if metric not in col_indices:
+                col_indices[metric] = pos
                 if debug:
-                    st.write(f"  → remark assigné à la colonne {col_indices['remark']} (après Moyenne)")
+                    st.write(f"  → {metric} assigné à la colonne {pos}")
+    
+    # Ajouter la remarque par position si pas trouvée
+    if 'remark' not in col_indices:
+        # La remarque est après BDC + Moyenne, donc +2
+        last_metric_col = max([col_indices.get(k, 0) for k in ['sleep', 'mentalLoad', 'motivation', 'hdcState', 'bdcState'] if k in col_indices], default=0)
+        if last_metric_col > 0:
+            # +1 serait Moyenne, +2 est Remarque
+            col_indices['remark'] = last_metric_col + 2
+            if debug:
+                st.write(f"  → remark assigné à la colonne {col_indices['remark']} (après Moyenne)")
+    
+    # 4. Extraire les données (lignes après l'en-tête)
+    entries = []
+    player_names = []
+    skipped_rows = []
+    
+    # Classer toute la colonne des noms en un appel
+    name_col = col_indices['name']
+    classes = []
+    if name_col < len(df.columns):
+        names = IMPORT_NAMES.classify(df.iloc[header_row + 1:, name_col])
+        classes = list(zip(names['status'].tolist(), names['name'].tolist(), names['pattern'].tolist()))
+    
+    for row_idx, (status, name, pattern) in enumerate(classes, start=header_row + 1):
+        row = df.iloc[row_idx]
         
-        # 4. Extraire les données (lignes après l'en-tête)
-        entries = []
-        players_created = 0
-        skipped_rows = []
+        # Ignorer lignes vides, EQUIPE, ou non-joueurs
+        if status in ('empty', 'header'):
+            continue
+        if status == 'team':
+            if debug:
+                skipped_rows.append(f"Ligne {row_idx}: '{name}' (ligne équipe)")
+            continue
         
-        for row_idx in range(header_row + 1, len(df)):
-            row = df.iloc[row_idx]
-            
-            # Récupérer le nom
-            name_col = col_indices.get('name')
-            if name_col is None or name_col >= len(row):
-                continue
-            
-            name = row.iloc[name_col]
-            if pd.isna(name):
-                continue
-            
-            name = str(name).strip()
-            
-            # Ignorer lignes vides, EQUIPE, ou non-joueurs
-            if not name or len(name) < 2:
-                continue
-            name_upper = name.upper()
-            if name_upper in ['EQUIPE', 'ÉQUIPE', 'TOTAL', 'MOYENNE', 'AVERAGE', 'TEAM']:
-                if debug:
-                    skipped_rows.append(f"Ligne {row_idx}: '{name}' (ligne équipe)")
-                continue
-            if name.lower() in ['joueur', 'nom', 'nan', 'none', 'player']:
-                continue
-            
-            # Ignorer si le "nom" ressemble à une remarque (trop long ou contient des mots-clés)
-            name_lower = name.lower()
-            
-            # Mots-clés de remarque - phrases ou expressions qui indiquent clairement une remarque
-            remark_patterns = [
-                'douleur', 'courbature', 'fatigue', 'crampe', 'blessure', 
-                'contracture', 'entorse', 'foulure', 'claquage', 'déchir',
-                'inflamm', 'tendinite', 'élongation', 'lésion', 'lesion',
-                'genou droit', 'genou gauche', 'cheville', 'épaule', 'mollet',
-                'ischio', 'cuisse', 'adducteur', 'quadri', 'dos bloqué',
-                'kyste', 'hernie', 'pubis', 'lombes', 'lombaire',
-                'pas en forme', 'fatigué', 'malade', 'grippé', 'épuisé',
-                'mieux', 'soucis', 'souci', 'problème', 'probleme',
-                'rien à signaler', 'tout va bien', 'en forme', 'récupération',
-                'au repos', 'absent', 'indisponible',
-                'ce matin', 'cette nuit', 'hier soir', 'depuis', 'toujours',
-                'encore', 'gêné', 'gene',
-                'mal au', 'mal à la', 'mal aux', 'douleur au', 'gêne au',
-                'sensation de', 'léger problème', 'petit souci'
-            ]
-            
-            # RÈGLE PRINCIPALE: Les noms de joueurs sont en MAJUSCULES
-            def is_valid_player_name(text):
-                """Vérifie si le texte ressemble à un nom de joueur"""
-                upper_chars = sum(1 for c in text if c.isupper())
-                alpha_chars = sum(1 for c in text if c.isalpha())
-                if alpha_chars == 0:
-                    return False
-                uppercase_ratio = upper_chars / alpha_chars
-                return (
-                    (uppercase_ratio >= 0.8 or text.isupper()) and
-                    len(text) <= 25 and
-                    text.count(' ') <= 2
-                )
-            
-            skip_as_remark = False
-            skip_reason = ""
-            
-            # Vérifier si c'est un nom valide (MAJUSCULES)
-            if not is_valid_player_name(name):
-                skip_as_remark = True
-                skip_reason = "pas en majuscules"
-            # Vérifier les patterns de remarque
-            elif any(pattern in name_lower for pattern in remark_patterns):
-                skip_as_remark = True
-                skip_reason = "pattern remarque détecté"
-            
-            if skip_as_remark:
-                if debug:
-                    skipped_rows.append(f"Ligne {row_idx}: '{name}' ({skip_reason})")
-                continue
-            
-            # Ignorer les lignes qui semblent être des erreurs Excel (#DIV/0!, etc.)
-            row_values = [str(x) for x in row if pd.notna(x)]
-            if all('#' in v or 'DIV' in v.upper() for v in row_values[1:] if v):
-                if debug:
-                    skipped_rows.append(f"Ligne {row_idx}: '{name}' (erreurs Excel)")
-                continue
-            
-            # Créer le joueur s'il n'existe pas
-            if not any(p['name'] == name for p in st.session_state.players):
-                st.session_state.players.append({
-                    'id': f"p_{len(st.session_state.players) + 1}_{datetime.now().timestamp():.0f}",
-                    'name': name,
-                    'position': 'Pilier gauche',
-                    'status': 'Apte',
-                    'targetWeight': 95
-                })
-                players_created += 1
-            
-            entry = {'name': name}
-            
-            # Poids
-            if 'weight' in col_indices and col_indices['weight'] < len(row):
-                val = row.iloc[col_indices['weight']]
+        # Ignorer si le "nom" ressemble à une remarque (pas en MAJUSCULES ou contient des mots-clés)
+        if status in ('invalid', 'remark'):
+            if debug:
+                skip_reason = "pas en majuscules" if status == 'invalid' else f"pattern remarque: '{pattern}'"
+                skipped_rows.append(f"Ligne {row_idx}: '{name}' ({skip_reason})")
+            continue
+        
+        # Ignorer les lignes qui semblent être des erreurs Excel (#DIV/0!, etc.)
+        row_values = [str(x) for x in row if pd.notna(x)]
+        if all('#' in v or 'DIV' in v.upper() for v in row_values[1:] if v):
+            if debug:
+                skipped_rows.append(f"Ligne {row_idx}: '{name}' (erreurs Excel)")
+            continue
+        
+        # Joueur à créer s'il n'existe pas (à l'application)
+        player_names.append(name)
+        
+        entry = {'name': name}
+        
+        # Poids
+        if 'weight' in col_indices and col_indices['weight'] < len(row):
+            val = row.iloc[col_indices['weight']]
+            if pd.notna(val):
+                try:
+                    # Gérer les formats avec virgule
+                    num = float(str(val).replace(',', '.').replace(' ', ''))
+                    if 40 <= num <= 200:
+                        entry['weight'] = num
+                except:
+                    pass
+        
+        # Métriques (0-5) - accepte 0 comme valeur valide
+        for metric_key in ['sleep', 'mentalLoad', 'motivation', 'hdcState', 'bdcState']:
+            if metric_key in col_indices and col_indices[metric_key] < len(row):
+                val = row.iloc[col_indices[metric_key]]
                 if pd.notna(val):
                     try:
-                        # Gérer les formats avec virgule
-                        num = float(str(val).replace(',', '.').replace(' ', ''))
-                        if 40 <= num <= 200:
-                            entry['weight'] = num
+                        # Gérer divers formats
+                        val_str = str(val).replace(',', '.').replace(' ', '')
+                        if val_str and val_str not in ['#DIV/0!', '#N/A', '#VALUE!', '-', '']:
+                            num = float(val_str)
+                            if 0 <= num <= 5:  # Accepte 0 comme note valide
+                                entry[metric_key] = num
                     except:
                         pass
-            
-            # Métriques (0-5) - accepte 0 comme valeur valide
-            for metric_key in ['sleep', 'mentalLoad', 'motivation', 'hdcState', 'bdcState']:
-                if metric_key in col_indices and col_indices[metric_key] < len(row):
-                    val = row.iloc[col_indices[metric_key]]
-                    if pd.notna(val):
-                        try:
-                            # Gérer divers formats
-                            val_str = str(val).replace(',', '.').replace(' ', '')
-                            if val_str and val_str not in ['#DIV/0!', '#N/A', '#VALUE!', '-', '']:
-                                num = float(val_str)
-                                if 0 <= num <= 5:  # Accepte 0 comme note valide
-                                    entry[metric_key] = num
-                        except:
-                            pass
-            
-            # Remarque
-            if 'remark' in col_indices and col_indices['remark'] < len(row):
-                val = row.iloc[col_indices['remark']]
-                if pd.notna(val):
-                    remark = str(val).strip()
-                    if remark and remark.lower() not in ['nan', 'none', '', '#n/a']:
-                        entry['remark'] = remark
-            
-            # N'ajouter que si on a au moins le nom et le poids ou une métrique (0 est valide!)
-            has_data = entry.get('weight') is not None or any(entry.get(m['key']) is not None for m in METRICS)
-            if has_data:
-                entries.append(entry)
-            elif debug:
-                skipped_rows.append(f"Ligne {row_idx}: '{name}' (pas de données)")
-        
-        if debug and skipped_rows:
-            with st.expander(f"⏭️ {len(skipped_rows)} lignes ignorées"):
-                for r in skipped_rows:
-                    st.write(r)
-        
-        if entries:
-            st.session_state.data[date_found] = entries
-            # AUTO-SAVE après import réussi
-            save_data_to_file()
-            return {
-                'success': True,
-                'date': date_found,
-                'players': len(st.session_state.players),
-                'entries': len(entries),
-                'new_players': players_created,
-                'columns_found': list(col_indices.keys())
-            }
-        else:
-            return {'success': False, 'error': f"Aucune donnée de joueur valide trouvée. {len(skipped_rows)} lignes ont été ignorées. Activez le mode debug pour plus de détails."}
+        
+        # Remarque
+        if 'remark' in col_indices and col_indices['remark'] < len(row):
+            val = row.iloc[col_indices['remark']]
+            if pd.notna(val):
+                remark = str(val).strip()
+                if remark and remark.lower() not in ['nan', 'none', '', '#n/a']:
+                    entry['remark'] = remark
+        
+        # N'ajouter que si on a au moins le nom et le poids ou une métrique (0 est valide!)
+        has_data = entry.get('weight') is not None or any(entry.get(m['key']) is not None for m in METRICS)
+        if has_data:
+            entries.append(entry)
+        elif debug:
+            skipped_rows.append(f"Ligne {row_idx}: '{name}' (pas de données)")
+    
+    if debug and skipped_rows:
+        with st.expander(f"⏭️ {len(skipped_rows)} lignes ignorées"):
+            for r in skipped_rows:
+                st.write(r)
+    
+    if not entries:
+        return {'success': False, 'error': f"Aucune donnée de joueur valide trouvée. {len(skipped_rows)} lignes ont été ignorées. Activez le mode debug pour plus de détails."}
+    return {
+        'success': True,
+        'date': date_found,
+        'entries': entries,
+        'names': player_names,
+        'columns_found': list(col_indices.keys())
+    }
+
+
+def apply_imported_day(parsed):
+    """Applique une journée analysée : joueurs manquants créés, entrées de la date remplacées. Retourne les nouveaux joueurs."""
+    load_import_seasons([parsed['date']])
+    own_session_data()
+    new_players = create_missing_players(parsed['names'])
+    st.session_state.data[parsed['date']] = parsed['entries']
+    get_store().set_day(parsed['date'], parsed['entries'])
+    return new_players
+
+
+def process_imported_data(df, debug=False):
+    """
+    Traite les données importées depuis Google Sheets (onglet "Bien-être").
+    """
+    try:
+        parsed = parse_imported_data(df, debug)
+        if not parsed['success']:
+            return parsed
+        new_players = apply_imported_day(parsed)
+        # AUTO-SAVE après import réussi (journal : nouveaux joueurs + date importée)
+        save_changes([player_record(p) for p in new_players] + [day_record(parsed['date'])])
+        return {
+            'success': True,
+            'date': parsed['date'],
+            'players': len(st.session_state.players),
+            'entries': len(parsed['entries']),
+            'new_players': len(new_players),
+            'columns_found': parsed['columns_found']
+        }
         
     except Exception as e:
         import traceback
@@ -2142,6 +5120,117 @@ def process_imported_data(df, debug=False):
         return {'success': False, 'error': str(e)}
 
 
+# --- Synchronisation de tous les onglets ---
+IMPORT_SYNC_TABS = (('suivi_be', "Suivi BE"), ('daily', "Bien-être"), ('suivi_poids', "Suivi Poids"))
+SYNC_RECENT_DATES = 7  # Dates reprises des onglets multi-jours (comme le raccourci "7 derniers")
+
+
+def fetch_import_tab(doc_id, kind, sheet_name, watermark=None, known_dates=()):
+    """
+    Télécharge et analyse un onglet (exécuté dans un thread : réseau + étape pure, aucune lecture ni écriture en session).
+    Pour "Suivi BE", seuls les blocs récents modifiés depuis `watermark` sont analysés ; pour
+    "Suivi Poids", seules les colonnes des dernières dates présentes dans les données (`known_dates`,
+    relevées au lancement) et des dates plus récentes (importées par les autres onglets) sont lues.
+    """
+    df = read_sheet_csv(doc_id, sheet_name)
+    if kind == 'daily':
+        return parse_imported_data(df)
+    if kind == 'suivi_be':
+        blocks = detect_date_blocks(df)
+        if not blocks:
+            return {'success': False, 'error': "Aucun bloc de données trouvé."}
+        recent = blocks[-SYNC_RECENT_DATES:]
+        hashes = suivi_be_block_hashes(df, recent)
+        changed = changed_suivi_be_blocks(recent, hashes, watermark, known_dates)
+        return {'success': True, 'blocks': parse_suivi_be(df, changed, {b['date'] for b in changed}),
+                'hashes': hashes, 'skipped': len(hashes) - len({b['date'] for b in changed})}
+    dates = parse_suivi_poids_dates(df)
+    if not dates:
+        return {'success': False, 'error': "Aucune date trouvée dans la première ligne."}
+    recent = set([d['date'] for d in dates if d['date'] in known_dates][-SYNC_RECENT_DATES:])
+    last_known = max(known_dates, default='')
+    window = [d['date'] for d in dates if d['date'] in recent or d['date'] > last_known]
+    return {'success': True, 'window': window, **parse_suivi_poids(df, set(window))}
+
+
+def sync_all_tabs(doc_id, tabs=IMPORT_SYNC_TABS):
+    """
+    Import en un clic de tous les onglets : téléchargements et analyses en parallèle (un thread par onglet),
+    puis application en une seule transaction suivie d'une seule sauvegarde.
+    Ordre d'application : historique "Suivi BE", puis la journée "Bien-être" (plus complète, avec le poids),
+    puis les poids "Suivi Poids" sur les entrées existantes.
+    Si l'application échoue, la session est rétablie et rien n'est sauvegardé.
+    Retourne {type d'onglet: {'success', 'message' ou 'error'}}.
+    """
+    sheet_names = dict(tabs)
+    watermark = get_import_watermark(sheet_names.get('suivi_be'))
+    known_dates = data_dates(st.session_state.data)
+    with ThreadPoolExecutor(max_workers=len(tabs), thread_name_prefix='import') as pool:
+        futures = {kind: pool.submit(fetch_import_tab, doc_id, kind, sheet_name, watermark, known_dates)
+                   for kind, sheet_name in tabs}
+    results = {}
+    for kind, future in futures.items():
+        try:
+            results[kind] = future.result()
+        except Exception as e:
+            results[kind] = {'success': False, 'error': str(e)}
+
+    summary = {kind: result for kind, result in results.items() if not result['success']}
+    fetched = [kind for kind, result in results.items() if result['success']]
+    if not fetched:
+        return summary
+    new_players = []
+    days = []
+    records = []
+
+    # Application sur une copie privée : si une étape échoue, la session d'avant est rétablie
+    before = {key: st.session_state.get(key) for key in
+              ('players', 'data', 'injuries', 'content_hashes', 'wellness_store', 'player_registry', 'shared_data_version')}
+    settings = dict(st.session_state.settings)
+    try:
+        own_session_data(force=True)
+
+        parsed = results.get('suivi_be')
+        if parsed and parsed['success']:
+            players, keys = apply_suivi_be_blocks(parsed['blocks'])
+            new_players += players
+            days += keys
+            if parsed['blocks']:
+                records.append(update_import_watermark(sheet_names['suivi_be'], parsed['blocks'], parsed['hashes']))
+            entries = sum(len(p['entries']) for p in parsed['blocks'])
+            summary['suivi_be'] = {'success': True, 'message': f"{entries} entrées sur {len(keys)} dates ({parsed['skipped']} inchangées)"}
+
+        parsed = results.get('daily')
+        if parsed and parsed['success']:
+            new_players += apply_imported_day(parsed)
+            days.append(parsed['date'])
+            summary['daily'] = {'success': True, 'message': f"{format_date(parsed['date'], 'full')} — {len(parsed['entries'])} entrées"}
+
+        parsed = results.get('suivi_poids')
+        if parsed and parsed['success']:
+            known = data_dates(st.session_state.data)
+            matching = [d for d in parsed['window'] if d in known]
+            result = apply_suivi_poids(parsed, set(matching[-SYNC_RECENT_DATES:]))
+            days += sorted(result['dates_updated'])
+            if result['updates']:
+                summary['suivi_poids'] = {'success': True, 'message': f"{result['updates']} poids mis à jour sur {len(result['dates_updated'])} dates"}
+            else:
+                summary['suivi_poids'] = {'success': False, 'error': f"Aucun poids mis à jour ({len(result['players_not_found'])} joueurs non reconnus)."}
+    except Exception as e:
+        for key, value in before.items():
+            st.session_state[key] = value
+        st.session_state.settings = settings
+        for kind in fetched:
+            summary[kind] = {'success': False, 'error': f"Import annulé, aucune donnée modifiée : {e}"}
+        return summary
+
+    # Une seule sauvegarde (journal : nouveaux joueurs + toutes les dates touchées + repère de l'import)
+    records = [player_record(p) for p in new_players] + [day_record(d) for d in dict.fromkeys(days)] + records
+    if records:
+        save_changes(records, cloud=bool(days))
+    return summary
+
+
 # ==================== GRAPHIQUES ====================
 def create_radar_chart(data1, data2, label1, label2):
     """Crée un graphique radar comparatif"""
@@ -2267,7 +5356,7 @@ def create_weight_chart(player_name, days=30):
     if not dates:
         return None
     
-    p = next((p for p in st.session_state.players if p['name'] == player_name), None)
+    p = get_registry().by_name.get(player_name)
     target = p.get('targetWeight', 90) if p else 90
     
     chart_data = []
@@ -2369,61 +5458,29 @@ def create_group_evolution_chart(group_type, position=None, metric='global', day
     metric: 'global' ou une clé de métrique
     days: nombre de jours
     """
-    dates = sorted(st.session_state.data.keys())[-days:]
-    if len(dates) < 2:
+    store = get_store()
+    if len(store.dates[-days:]) < 2:
         return None
     
-    # Définir les postes Avants et Trois-quarts
-    avants_positions = ['pilier', 'talonneur', 'deuxième ligne', '2ème ligne', 'troisième ligne', '3ème ligne', 'flanker', 'numéro 8', 'n°8']
-    trois_quarts_positions = ['demi de mêlée', 'demi d\'ouverture', 'centre', 'ailier', 'arrière']
+    # Colonnes du store à inclure selon le groupe (même table de postes que get_team_avg)
+    registry = get_registry()
+    if group_type == 'team':
+        cols = store.player_mask(registry)
+    elif group_type in GROUP_CODES:
+        cols = store.player_mask(registry, group=group_type)
+    elif group_type == 'position' and position:
+        cols = store.player_mask(registry, position=position)
+    else:
+        cols = np.zeros(len(store.players), dtype=bool)
     
     chart_data = []
-    
-    for date in dates:
-        day_data = st.session_state.data.get(date, [])
-        if not day_data:
-            continue
-        
-        day_values = []
-        
-        for d in day_data:
-            # Trouver le joueur pour vérifier son poste
-            player = next((p for p in st.session_state.players if p['name'] == d['name']), None)
-            if not player:
-                continue
-            
-            player_position = player.get('position', '').lower()
-            
-            # Filtrer selon le groupe
-            include_player = False
-            
-            if group_type == 'team':
-                include_player = True
-            elif group_type == 'Avants':
-                include_player = any(pos in player_position for pos in avants_positions)
-            elif group_type == 'Trois-quarts':
-                include_player = any(pos in player_position for pos in trois_quarts_positions)
-            elif group_type == 'position' and position:
-                include_player = player.get('position', '') == position
-            
-            if not include_player:
-                continue
-            
-            # Calculer la valeur
-            if metric == 'global':
-                val = get_player_average(d)
-            else:
-                val = d.get(metric)
-            
-            if val is not None:
-                day_values.append(val)
-        
-        if day_values:
-            avg = sum(day_values) / len(day_values)
+    dates, means, counts = store.daily_means(metric, cols, days)
+    for date, avg, count in zip(dates, means, counts):
+        if count:
             chart_data.append({
                 'date': format_date(date),
-                'value': round(avg, 2),
-                'count': len(day_values)
+                'value': round(float(avg), 2),
+                'count': int(count)
             })
     
     if len(chart_data) < 2:
@@ -2488,64 +5545,27 @@ def create_group_evolution_chart(group_type, position=None, metric='global', day
 
 def zscore_series(metric='global', group=None, days=30):
     """Calcule la série de Z-Scores pour une métrique/groupe"""
-    dates = sorted(st.session_state.data.keys())[-days:]
-    if len(dates) < 5:
+    store = get_store()
+    if len(store.dates[-days:]) < 5:
         return []
     
-    result = []
-    for date in dates:
-        data = st.session_state.data.get(date, [])
-        if not data:
-            continue
-        
-        day_values = []
-        for d in data:
-            p = next((p for p in st.session_state.players if p['name'] == d['name']), None)
-            if not p:
-                continue
-            if group and get_player_group(p['position']) != group:
-                continue
-            
-            val = get_player_average(d) if metric == 'global' else d.get(metric)
-            if val is not None:
-                day_values.append(val)
-        
-        if day_values:
-            day_avg = sum(day_values) / len(day_values)
-            prev_avgs = [r['value'] for r in result[-14:]]
-            zscore = calculate_zscore(day_avg, prev_avgs) if len(prev_avgs) >= 3 else 0
-            result.append({'date': date, 'value': day_avg, 'zscore': round(zscore, 2)})
-    
-    return result
+    label = ('group', group) if group else ('team', None)
+    return get_zscore_table(metric).series(label, days)
 
 
 def get_absolute_values_series(metric='global', group=None, days=30):
     """Calcule la série de valeurs absolues moyennes pour une métrique/groupe"""
-    dates = sorted(st.session_state.data.keys())[-days:]
-    if len(dates) < 1:
+    store = get_store()
+    if len(store.dates[-days:]) < 1:
         return []
     
+    cols = store.player_mask(get_registry(), group=group)
+    dates, means, counts = store.daily_means(metric, cols, days)
+    
     result = []
-    for date in dates:
-        data = st.session_state.data.get(date, [])
-        if not data:
-            continue
-        
-        day_values = []
-        for d in data:
-            p = next((p for p in st.session_state.players if p['name'] == d['name']), None)
-            if not p:
-                continue
-            if group and get_player_group(p['position']) != group:
-                continue
-            
-            val = get_player_average(d) if metric == 'global' else d.get(metric)
-            if val is not None:
-                day_values.append(val)
-        
-        if day_values:
-            day_avg = sum(day_values) / len(day_values)
-            result.append({'date': date, 'value': round(day_avg, 2)})
+    for date, day_avg, count in zip(dates, means, counts):
+        if count:
+            result.append({'date': date, 'value': round(float(day_avg), 2)})
     
     return result
 
@@ -2607,24 +5627,11 @@ def create_absolute_values_chart(data):
 
 def player_zscore_series(player_name, days=30):
     """Calcule la série de Z-Scores pour un joueur"""
-    dates = sorted(st.session_state.data.keys())[-days:]
-    if len(dates) < 5:
+    store = get_store()
+    if len(store.dates[-days:]) < 5:
         return []
     
-    result = []
-    for date in dates:
-        data = st.session_state.data.get(date, [])
-        pd_data = next((d for d in data if d['name'] == player_name), None)
-        if not pd_data:
-            continue
-        
-        avg = get_player_average(pd_data)
-        if avg is not None:
-            prev_avgs = [r['value'] for r in result[-14:]]
-            zscore = calculate_zscore(avg, prev_avgs) if len(prev_avgs) >= 3 else 0
-            result.append({'date': date, 'value': avg, 'zscore': round(zscore, 2)})
-    
-    return result
+    return get_zscore_table('global').series(('player', player_name), days)
 
 
 # ==================== CALENDRIER WELLNESS ====================
@@ -2686,7 +5693,7 @@ def create_wellness_calendar(player_name, year=None, month=None):
 @st.dialog("📋 Fiche Joueur", width="large")
 def show_player_modal(player_id):
     """Affiche la fiche complète d'un joueur dans une modale"""
-    player = next((p for p in st.session_state.players if p['id'] == player_id), None)
+    player = get_registry().by_id.get(player_id)
     if not player:
         st.error("Joueur non trouvé")
         return
@@ -2844,6 +5851,12 @@ def show_player_modal(player_id):
             st.plotly_chart(evol_fig, use_container_width=True)
         else:
             st.info("Pas assez de données")
+        
+        # Z-Score du joueur (même moteur que la courbe du dashboard)
+        zscore_fig = create_zscore_chart(player_zscore_series(player['name']))
+        if zscore_fig:
+            st.markdown("**📊 Z-Score (moyenne globale)**")
+            st.plotly_chart(zscore_fig, use_container_width=True)
     
     with tab4:
         now = datetime.now()
@@ -2854,6 +5867,7 @@ def show_player_modal(player_id):
                 key="cal_month")
         with col_m2:
             cal_year = st.selectbox("Année", [now.year - 1, now.year, now.year + 1], index=1, key="cal_year")
+        ensure_history(since=f"{cal_year}-{cal_month:02d}-01")
         
         calendar_html = create_wellness_calendar(player['name'], cal_year, cal_month)
         st.markdown(calendar_html, unsafe_allow_html=True)
@@ -2876,11 +5890,11 @@ def show_player_modal(player_id):
     
     if new_status != player['status']:
         if st.button("💾 Sauvegarder", type="primary", use_container_width=True):
+            own_session_data()
             for p in st.session_state.players:
                 if p['id'] == player_id:
                     p['status'] = new_status
-            # Sauvegarder dans le cloud
-            cloud_save()
+                    save_changes([player_record(p)])
             st.success(f"✅ Statut mis à jour: {new_status}")
             st.rerun()
 
@@ -2998,6 +6012,12 @@ def page_dashboard():
                 <div style="color:#64748b;font-size:13px;margin-top:4px;">Tous les joueurs sont en forme !</div>
             </div>
             """, unsafe_allow_html=True)
+        
+        # Historique des alertes sur 7 jours
+        alert_counts = get_alert_counts(date_key, days=7)
+        if not alert_counts.empty:
+            with st.expander(f"📅 Alertes des 7 derniers jours ({int(alert_counts['Total'].sum())})"):
+                st.dataframe(alert_counts, use_container_width=True, hide_index=True)
     
     with col_avail:
         st.markdown("<h3 style='color:white;margin-bottom:16px;'>👥 Disponibilité</h3>", unsafe_allow_html=True)
@@ -3032,14 +6052,15 @@ def page_dashboard():
     # === TABLEAU DES JOUEURS ===
     rows = []
     player_ids = {}
+    registry = get_registry()
     
     for d in today_data:
-        p = next((p for p in st.session_state.players if p['name'] == d['name']), None)
+        p = registry.by_name.get(d['name'])
         if not p:
             continue
-        if filter_group not in ["Tous les groupes", "Tous"] and get_player_group(p['position']) != filter_group:
+        if filter_group not in ["Tous les groupes", "Tous"] and registry.groups[d['name']] != filter_group:
             continue
-        if filter_line not in ["Toutes les lignes", "Toutes"] and get_player_line(p['position']) != filter_line:
+        if filter_line not in ["Toutes les lignes", "Toutes"] and registry.lines[d['name']] != filter_line:
             continue
         
         avg = get_player_average(d)
@@ -3054,7 +6075,7 @@ def page_dashboard():
         rows.append({
             'name': d['name'],
             'position': p['position'],
-            'group': get_player_group(p['position']),
+            'group': registry.groups[d['name']],
             'status': p['status'],
             'weight': d.get('weight'),
             'metrics': {m['key']: d.get(m['key']) for m in METRICS},
@@ -3174,6 +6195,17 @@ def page_dashboard():
     else:
         st.info("Aucun joueur ne correspond aux filtres sélectionnés.")
     
+    st.markdown("<div style='height:24px'></div>", unsafe_allow_html=True)
+    
+    # === JOUEURS LES PLUS DÉVIANTS (Z-SCORE INDIVIDUEL) ===
+    with st.expander("🎯 Joueurs les plus déviants (Z-Score individuel)", expanded=False):
+        deviant_df = get_most_deviant_players(date_key)
+        if deviant_df.empty:
+            st.info("Pas de données pour cette date")
+        else:
+            st.caption(f"Z-Score de chaque joueur vs ses {get_zscore_window()} dernières valeurs • cliquez sur une colonne pour trier")
+            st.dataframe(deviant_df, use_container_width=True, hide_index=True)
+    
     st.markdown("<div style='height:40px'></div>", unsafe_allow_html=True)
     
     # === GRAPHIQUES ===
@@ -3257,11 +6289,9 @@ def page_import():
                 st.error("❌ URL invalide")
             else:
                 doc_id = match.group(1)
-                encoded_sheet = urllib.parse.quote("Bien-être")
-                csv_url = f"https://docs.google.com/spreadsheets/d/{doc_id}/gviz/tq?tqx=out:csv&sheet={encoded_sheet}"
                 
                 with st.spinner("📡 Téléchargement..."):
-                    df = pd.read_csv(csv_url, header=None)
+                    df = read_sheet_csv(doc_id, "Bien-être")
                 
                 with st.spinner("🔄 Traitement..."):
                     result = process_imported_data(df, debug=False)
@@ -3281,6 +6311,27 @@ def page_import():
         except Exception as e:
             st.error(f"❌ Erreur: {str(e)}")
     
+    if st.button("🔄 Synchroniser tous les onglets", use_container_width=True, key="import_all",
+                 help=f"Bien-être, Suivi BE et Suivi Poids ({SYNC_RECENT_DATES} dernières dates) téléchargés en parallèle, une seule sauvegarde"):
+        match = re.search(r'/d/([a-zA-Z0-9-_]+)', url)
+        if not match:
+            st.error("❌ URL invalide")
+        else:
+            sheet_names = {
+                'suivi_be': st.session_state.get('sheet_suivi_adv', "Suivi BE"),
+                'daily': "Bien-être",
+                'suivi_poids': st.session_state.get('sheet_poids_adv', "Suivi Poids"),
+            }
+            tabs = tuple((kind, sheet_names[kind]) for kind, _ in IMPORT_SYNC_TABS)
+            with st.spinner("📡 Téléchargement des onglets..."):
+                summary = sync_all_tabs(match.group(1), tabs)
+            for kind, sheet_name in tabs:
+                result = summary[kind]
+                if result['success']:
+                    st.success(f"✅ **{sheet_name}** : {result['message']}")
+                else:
+                    st.warning(f"⚠️ **{sheet_name}** : {result['error']}")
+    
     st.markdown("</div>", unsafe_allow_html=True)
     
     st.markdown("<div style='height:20px'></div>", unsafe_allow_html=True)
@@ -3318,7 +6369,7 @@ def page_import():
     # Bouton Sauvegarder principal
     if st.button("💾 Sauvegarder", type="primary", use_container_width=True):
         with st.spinner("Sauvegarde en cours..."):
-            success, msg = cloud_save()
+            success, msg = cloud_save(background=False)
             if success:
                 st.success(msg)
             else:
@@ -3365,9 +6416,7 @@ def page_import():
                         match = re.search(r'/d/([a-zA-Z0-9-_]+)', url)
                         if match:
                             doc_id = match.group(1)
-                            encoded_sheet = urllib.parse.quote(sheet_suivi)
-                            csv_url = f"https://docs.google.com/spreadsheets/d/{doc_id}/gviz/tq?tqx=out:csv&sheet={encoded_sheet}"
-                            df = pd.read_csv(csv_url, header=None)
+                            df = read_sheet_csv(doc_id, sheet_suivi)
                             st.success(f"✅ {len(df)} lignes × {len(df.columns)} colonnes")
                             st.dataframe(df.iloc[:8, :12])
                     except Exception as e:
@@ -3379,9 +6428,7 @@ def page_import():
                         match = re.search(r'/d/([a-zA-Z0-9-_]+)', url)
                         if match:
                             doc_id = match.group(1)
-                            encoded_sheet = urllib.parse.quote(sheet_suivi)
-                            csv_url = f"https://docs.google.com/spreadsheets/d/{doc_id}/gviz/tq?tqx=out:csv&sheet={encoded_sheet}"
-                            df = pd.read_csv(csv_url, header=None)
+                            df = read_sheet_csv(doc_id, sheet_suivi)
                             result = process_suivi_be_data(df, selected_dates=None, debug=debug_mode)
                             if result['success'] and result.get('mode') == 'list_dates':
                                 st.session_state['suivi_be_dates'] = result['available_dates']
@@ -3411,12 +6458,18 @@ def page_import():
                     default=st.session_state.get('sel_be', []), 
                     format_func=lambda x: date_options.get(x, x), key="ms_be")
                 
+                last_import = get_import_watermark(sheet_suivi)['last_date']
+                incremental = st.checkbox("⚡ Ignorer les dates inchangées depuis le dernier import", value=True, key="inc_be",
+                    help=f"Dernière date importée : {format_date(last_import, 'full')}" if last_import else "Aucun import enregistré pour cet onglet")
+                
                 if st.button(f"📥 Importer {len(selected)} dates", type="primary", disabled=len(selected)==0, key="imp_be"):
                     df = st.session_state.get('suivi_be_df')
-                    result = process_suivi_be_data(df, selected_dates=selected, debug=debug_mode)
+                    result = process_suivi_be_data(df, selected_dates=selected, debug=debug_mode,
+                                                   sheet_name=sheet_suivi if incremental else None)
                     if result['success']:
                         st.balloons()
-                        st.success(f"✅ {result['entries']} entrées importées !")
+                        st.success(f"✅ {result['entries']} entrées importées !"
+                                   + (f" ({result['skipped']} dates inchangées ignorées)" if result['skipped'] else ""))
                         del st.session_state['suivi_be_dates']
                         del st.session_state['suivi_be_df']
                     else:
@@ -3439,9 +6492,7 @@ def page_import():
                         match = re.search(r'/d/([a-zA-Z0-9-_]+)', url)
                         if match:
                             doc_id = match.group(1)
-                            encoded_sheet = urllib.parse.quote(sheet_poids)
-                            csv_url = f"https://docs.google.com/spreadsheets/d/{doc_id}/gviz/tq?tqx=out:csv&sheet={encoded_sheet}"
-                            df = pd.read_csv(csv_url, header=None)
+                            df = read_sheet_csv(doc_id, sheet_poids)
                             st.success(f"✅ {len(df)} lignes × {len(df.columns)} colonnes")
                             st.dataframe(df.iloc[:10, :10])
                     except Exception as e:
@@ -3453,9 +6504,7 @@ def page_import():
                         match = re.search(r'/d/([a-zA-Z0-9-_]+)', url)
                         if match:
                             doc_id = match.group(1)
-                            encoded_sheet = urllib.parse.quote(sheet_poids)
-                            csv_url = f"https://docs.google.com/spreadsheets/d/{doc_id}/gviz/tq?tqx=out:csv&sheet={encoded_sheet}"
-                            df = pd.read_csv(csv_url, header=None)
+                            df = read_sheet_csv(doc_id, sheet_poids)
                             result = process_suivi_poids_data(df, selected_dates=None, debug=debug_mode)
                             if result['success'] and result.get('mode') == 'list_dates':
                                 st.session_state['suivi_poids_dates'] = result['available_dates']
@@ -3539,11 +6588,17 @@ def page_import():
         
         with col1:
             st.markdown("**📥 Restaurer un backup**")
-            uploaded_json = st.file_uploader("Fichier JSON", type=['json'], key="json_restore", label_visibility="collapsed")
+            uploaded_json = st.file_uploader("Fichier JSON ou binaire", type=['json', 'wts'], key="json_restore", label_visibility="collapsed")
             if uploaded_json:
                 if st.button("✅ Restaurer", use_container_width=True):
-                    content = uploaded_json.read().decode('utf-8')
-                    success, msg = import_data_from_json(content)
+                    # Lecture section par section (une date à la fois), avec avancement
+                    bar = st.progress(0.0, text="Lecture du backup...")
+                    if uploaded_json.getbuffer()[:4] == SNAPSHOT_MAGIC:
+                        sections = iter_backup_snapshot(uploaded_json.getbuffer())
+                    else:
+                        sections = iter_backup_json(uploaded_json, total=uploaded_json.size)
+                    success, msg = import_backup(sections, lambda f: bar.progress(f, text=f"Lecture du backup... {f:.0%}"))
+                    bar.empty()
                     if success:
                         st.success(f"✅ {msg}")
                         st.rerun()
@@ -3553,14 +6608,28 @@ def page_import():
         with col2:
             st.markdown("**📤 Télécharger backup**")
             if st.session_state.data or st.session_state.players:
-                json_data = export_data_to_json()
+                # Fichiers générés au clic (hors du script), à partir de l'état courant de la session
+                backup_state = (st.session_state.players, st.session_state.data, st.session_state.injuries, persistable_settings())
                 st.download_button(
                     "💾 Backup JSON",
-                    json_data,
+                    lambda: export_backup_file(iter_export_json(*backup_state)),
                     f"wellness_backup_{datetime.now().strftime('%Y%m%d')}.json",
                     "application/json",
                     use_container_width=True
                 )
+                st.download_button(
+                    "🗜️ Backup binaire (.wts)",
+                    lambda: encode_snapshot({
+                        'players': backup_state[0],
+                        'data': complete_data(backup_state[1]),
+                        'injuries': backup_state[2],
+                        'settings': backup_state[3],
+                    }, datetime.now().strftime('%Y-%m-%d %H:%M:%S')),
+                    f"wellness_backup_{datetime.now().strftime('%Y%m%d')}.wts",
+                    "application/octet-stream",
+                    use_container_width=True,
+                    help="Format compact (colonnes de largeur fixe), restaurable ici comme un JSON"
+                )
                 
                 # Export CSV
                 export_rows = []
@@ -3613,6 +6682,10 @@ def page_effectif():
         
         dates = sorted(st.session_state.data.keys(), reverse=True)
         latest_date = dates[0] if dates else None
+        latest_by_name = {}
+        if latest_date:
+            for d in st.session_state.data.get(latest_date, []):
+                latest_by_name.setdefault(d['name'], d)
         
         st.markdown(f"<div style='color:#64748b;font-size:13px;margin:12px 0;'>{len(players)} joueurs</div>", unsafe_allow_html=True)
         
@@ -3631,10 +6704,7 @@ def page_effectif():
         """, unsafe_allow_html=True)
         
         for p in sorted(players, key=lambda x: x['name']):
-            pd_data = {}
-            if latest_date:
-                today_data = st.session_state.data.get(latest_date, [])
-                pd_data = next((d for d in today_data if d['name'] == p['name']), {})
+            pd_data = latest_by_name.get(p['name'], {})
             
             status_colors = {'Apte': '#10b981', 'Blessé': '#ef4444', 'Réhabilitation': '#f59e0b', 'Réathlétisation': '#3b82f6'}
             status_color = status_colors.get(p['status'], '#64748b')
@@ -3688,14 +6758,16 @@ def page_effectif():
             cmp_date = st.selectbox("Date", dates[:30] if dates else [], format_func=lambda x: format_date(x, 'short'), key="cmp_date") if dates else None
         
         if len(sel_players) >= 2 and cmp_date:
-            today_data = st.session_state.data.get(cmp_date, [])
+            today_by_name = {}
+            for d in st.session_state.data.get(cmp_date, []):
+                today_by_name.setdefault(d['name'], d)
             
             fig = go.Figure()
             colors = ['#10b981', '#3b82f6', '#f59e0b', '#ef4444']
             categories = [m['label'] for m in METRICS]
             
             for i, name in enumerate(sel_players):
-                pd_data = next((d for d in today_data if d['name'] == name), {})
+                pd_data = today_by_name.get(name, {})
                 vals = [pd_data.get(m['key'], 0) or 0 for m in METRICS]
                 vals.append(vals[0])
                 
@@ -3749,6 +6821,8 @@ def page_effectif():
         
         with col2:
             period = st.selectbox("Période", [7, 14, 30, 60, 90], index=2, format_func=lambda x: f"{x} jours", key="evol_days")
+            # Période plus longue que les saisons chargées : archives chargées à la demande
+            ensure_history(days=period)
         
         with col3:
             sel_metric = st.selectbox("Métrique", ['global'] + [m['key'] for m in METRICS],
@@ -3878,11 +6952,12 @@ def page_infirmerie():
             new_status = st.selectbox("", STATUSES, index=STATUSES.index(p.get('status', 'Apte')),
                                       key=f"status_{p['id']}", label_visibility="collapsed")
             if new_status != p.get('status'):
+                own_session_data()
                 for player in st.session_state.players:
                     if player['id'] == p['id']:
                         player['status'] = new_status
-                # Sauvegarder dans le cloud
-                cloud_save()
+                        # Journaliser et sauvegarder dans le cloud
+                        save_changes([player_record(player)])
                 st.rerun()
         
         with col3:
@@ -3907,6 +6982,7 @@ def page_infirmerie():
                 col_s1, col_s2 = st.columns(2)
                 with col_s1:
                     if st.form_submit_button("💾 Enregistrer", use_container_width=True):
+                        own_session_data()
                         st.session_state.injuries.append({
                             'id': f"i_{len(st.session_state.injuries)}",
                             'playerId': p['id'],
@@ -3919,8 +6995,8 @@ def page_infirmerie():
                             'status': 'Active'
                         })
                         st.session_state[f'show_injury_{p["id"]}'] = False
-                        # Sauvegarder dans le cloud
-                        cloud_save()
+                        # Journaliser et sauvegarder dans le cloud
+                        save_changes([injury_record(st.session_state.injuries[-1])])
                         st.success("✅ Blessure enregistrée")
                         st.rerun()
                 with col_s2:
@@ -3966,11 +7042,12 @@ def page_infirmerie():
             
             with col3:
                 if st.button("✅ Guéri", key=f"heal_{inj['id']}", use_container_width=True):
+                    own_session_data()
                     for injury in st.session_state.injuries:
                         if injury['id'] == inj['id']:
                             injury['status'] = 'Healed'
-                    # Sauvegarder dans le cloud
-                    cloud_save()
+                            # Journaliser et sauvegarder dans le cloud
+                            save_changes([injury_record(injury)])
                     st.success("✅ Joueur marqué comme guéri")
                     st.rerun()
             
@@ -3997,12 +7074,13 @@ def page_joueurs():
             if st.form_submit_button("➕ Ajouter le joueur", use_container_width=True, type="primary"):
                 if name and len(name) >= 2:
                     if not any(p['name'].lower() == name.lower() for p in st.session_state.players):
-                        st.session_state.players.append({
+                        own_session_data()
+                        get_registry().add({
                             'id': f"p_{len(st.session_state.players)}_{datetime.now().timestamp():.0f}",
                             'name': name, 'position': position, 'targetWeight': weight, 'status': status
                         })
-                        # Sauvegarder dans le cloud
-                        cloud_save()
+                        # Journaliser et sauvegarder dans le cloud
+                        save_changes([player_record(st.session_state.players[-1])])
                         st.success(f"✅ {name} ajouté à l'effectif !")
                         st.rerun()
                     else:
@@ -4033,27 +7111,34 @@ def page_joueurs():
                     index=ALL_POSITIONS.index(p['position']) if p['position'] in ALL_POSITIONS else 0,
                     key=f"pos_{p['id']}", label_visibility="collapsed")
                 if new_pos != p['position']:
+                    own_session_data()
                     for player in st.session_state.players:
                         if player['id'] == p['id']:
                             player['position'] = new_pos
+                            save_changes([player_record(player)], cloud=False)
+                    get_registry().rebuild()
             
             with col3:
                 new_weight = st.number_input("", value=float(p.get('targetWeight', 90)), min_value=50.0, max_value=200.0, step=0.5,
                     key=f"weight_{p['id']}", label_visibility="collapsed")
                 if new_weight != p.get('targetWeight'):
+                    own_session_data()
                     for player in st.session_state.players:
                         if player['id'] == p['id']:
                             player['targetWeight'] = new_weight
+                            save_changes([player_record(player)], cloud=False)
+                    get_registry().rebuild()
             
             with col4:
                 new_status = st.selectbox("", STATUSES, index=STATUSES.index(p.get('status', 'Apte')),
                     key=f"st_{p['id']}", label_visibility="collapsed")
                 if new_status != p.get('status'):
+                    own_session_data()
                     for player in st.session_state.players:
                         if player['id'] == p['id']:
                             player['status'] = new_status
-                    # Sauvegarder dans le cloud
-                    cloud_save()
+                            # Journaliser et sauvegarder dans le cloud
+                            save_changes([player_record(player)])
                     st.rerun()
             
             with col5:
@@ -4067,13 +7152,19 @@ def page_joueurs():
                     btn_cols = st.columns(2)
                     with btn_cols[0]:
                         if st.button("✅", key=f"confirm_{p['id']}", help="Confirmer"):
-                            st.session_state.players = [x for x in st.session_state.players if x['id'] != p['id']]
+                            # Les entrées du joueur sont aussi retirées des saisons archivées
+                            ensure_partitions()
+                            own_session_data()
+                            # Modification en place : les empreintes de contenu restent liées à la liste
+                            st.session_state.players[:] = [x for x in st.session_state.players if x['id'] != p['id']]
                             # Nettoyer aussi les données du joueur
                             for date in st.session_state.data:
                                 st.session_state.data[date] = [e for e in st.session_state.data[date] if e.get('name') != p['name']]
+                            get_registry().rebuild()
+                            get_store().rebuild()
                             st.session_state[confirm_key] = False
                             # Auto-save après suppression
-                            save_data_to_file()
+                            save_changes([player_delete_record(p)])
                             st.success(f"✅ {p['name']} supprimé")
                             st.rerun()
                     with btn_cols[1]:
@@ -4106,6 +7197,7 @@ def page_joueurs():
 def page_parametres():
     """Page Paramètres"""
     st.markdown("# ⚙️ Paramètres")
+    settings_before = dict(st.session_state.settings)
     
     # === SEUILS D'ALERTE ===
     st.markdown("### 🚨 Seuils d'alerte")
@@ -4124,7 +7216,7 @@ def page_parametres():
             "Seuil variation", 
             value=float(st.session_state.settings['variationThreshold']),
             min_value=0.5, max_value=3.0, step=0.5,
-            help="Alerte si variation jour/jour ≥ ce seuil"
+            help="Alerte si une métrique baisse de plus de ce seuil vs la dernière saisie ou la moyenne récente"
         )
     with col3:
         st.session_state.settings['weightThreshold'] = st.number_input(
@@ -4163,6 +7255,11 @@ def page_parametres():
             help="Z-Score en dessous duquel une alerte est déclenchée (rouge)"
         )
     
+    # Journaliser les seuils modifiés
+    changed_settings = [k for k, v in st.session_state.settings.items() if settings_before.get(k) != v]
+    if changed_settings:
+        save_changes([settings_record(changed_settings)], cloud=False)
+    
     st.markdown("<div style='height:32px'></div>", unsafe_allow_html=True)
     
     # === STOCKAGE CLOUD ===
@@ -4233,34 +7330,92 @@ def page_parametres():
         3. Effacez tout le code existant et collez ceci :
         """)
         
-        script_code = '''function doGet(e) {
+        script_code = '''// A1 : instantané complet, B1 : date, C1 : version courante, D1 : version de l'instantané
+// Onglet APP_PATCHES : un patch par ligne [version, version de base, patch compressé]
+function json_(obj) {
+  return ContentService.createTextOutput(JSON.stringify(obj)).setMimeType(ContentService.MimeType.JSON);
+}
+
+function patchSheet_() {
+  var ss = SpreadsheetApp.getActiveSpreadsheet();
+  return ss.getSheetByName("APP_PATCHES") || ss.insertSheet("APP_PATCHES");
+}
+
+function patchRows_() {
+  var patches = patchSheet_();
+  return patches.getLastRow() ? patches.getRange(1, 1, patches.getLastRow(), 3).getValues() : [];
+}
+
+function doGet(e) {
   var sheet = SpreadsheetApp.getActiveSpreadsheet().getSheetByName("APP_DATA");
   if (!sheet) {
-    return ContentService.createTextOutput(JSON.stringify({error: "Onglet APP_DATA non trouvé"}))
-      .setMimeType(ContentService.MimeType.JSON);
+    return json_({error: "Onglet APP_DATA non trouvé"});
+  }
+  
+  var version = Number(sheet.getRange("C1").getValue()) || 0;
+  
+  // Version déjà connue du client : réponse minimale, rien n'est relu
+  if (e && e.parameter && e.parameter.version !== undefined && Number(e.parameter.version) === version) {
+    return json_({version: version, unchanged: true});
+  }
+  
+  var snapshotVersion = Number(sheet.getRange("D1").getValue()) || 0;
+  var rows = patchRows_();
+  
+  // Seulement les patchs postérieurs à une version connue du client
+  var since = (e && e.parameter && e.parameter.since !== undefined) ? Number(e.parameter.since) : null;
+  if (since !== null && since >= snapshotVersion && since <= version) {
+    var newer = [];
+    for (var i = 0; i < rows.length; i++) {
+      if (Number(rows[i][0]) > since) newer.push(rows[i][2]);
+    }
+    return json_({version: version, since: since, patches: newer});
   }
   
   var data = sheet.getRange("A1").getValue();
   if (!data) {
-    return ContentService.createTextOutput(JSON.stringify({}))
-      .setMimeType(ContentService.MimeType.JSON);
+    return json_({version: version});
   }
   
-  return ContentService.createTextOutput(data).setMimeType(ContentService.MimeType.JSON);
+  var result = JSON.parse(data);
+  result.version = version;
+  result.patches = rows.map(function(r) { return r[2]; });
+  return json_(result);
 }
 
 function doPost(e) {
-  var sheet = SpreadsheetApp.getActiveSpreadsheet().getSheetByName("APP_DATA");
-  if (!sheet) {
-    sheet = SpreadsheetApp.getActiveSpreadsheet().insertSheet("APP_DATA");
+  var lock = LockService.getScriptLock();
+  lock.waitLock(30000);
+  try {
+    var sheet = SpreadsheetApp.getActiveSpreadsheet().getSheetByName("APP_DATA");
+    if (!sheet) {
+      sheet = SpreadsheetApp.getActiveSpreadsheet().insertSheet("APP_DATA");
+    }
+    
+    var version = Number(sheet.getRange("C1").getValue()) || 0;
+    var body = JSON.parse(e.postData.contents);
+    
+    if (body.patch) {
+      // Patch : accepté seulement s'il part de la version courante
+      if (Number(body.base_version) !== version) {
+        return json_({success: false, conflict: true, version: version});
+      }
+      version += 1;
+      patchSheet_().appendRow([version, body.base_version, body.data]);
+    } else {
+      // Instantané complet : remplace l'instantané et vide les patchs
+      version += 1;
+      sheet.getRange("A1").setValue(e.postData.contents);
+      sheet.getRange("D1").setValue(version);
+      patchSheet_().clear();
+    }
+    
+    sheet.getRange("B1").setValue(new Date().toISOString());
+    sheet.getRange("C1").setValue(version);
+    return json_({success: true, version: version});
+  } finally {
+    lock.releaseLock();
   }
-  
-  var data = e.postData.contents;
-  sheet.getRange("A1").setValue(data);
-  sheet.getRange("B1").setValue(new Date().toISOString());
-  
-  return ContentService.createTextOutput(JSON.stringify({success: true}))
-    .setMimeType(ContentService.MimeType.JSON);
 }'''
         
         st.code(script_code, language="javascript")
@@ -4302,12 +7457,27 @@ function doPost(e) {
             sync_text = st.session_state.last_cloud_save.strftime("%d/%m %H:%M")
         st.caption(f"⏱️ Dernière sauvegarde : {sync_text}")
     
+    # Synchronisation différentielle (script avec versions)
+    if is_gsheet and 'gsheet_sync' in st.session_state:
+        sync = st.session_state.gsheet_sync
+        if sync.version is not None:
+            st.caption(f"🔁 Synchronisation différentielle active - version cloud {sync.version}, {len(sync.dirty)} modification(s) en attente")
+        else:
+            st.caption("🔁 Synchronisation complète - redéployez le script ci-dessus pour n'envoyer que les modifications")
+
+    # Empreinte du contenu : dernière version acquittée par le cloud
+    marker = read_sync_marker()
+    if marker.get('hash'):
+        up_to_date = marker['hash'] == get_content_hashes().digest()
+        st.caption(f"🔐 Empreinte synchronisée : `{marker['hash'][:12]}` ({marker.get('synced_at', '?')}) - "
+                   + ("contenu identique" if up_to_date else "modifications non envoyées"))
+
     # Boutons
     col1, col2 = st.columns(2)
     with col1:
         if st.button("💾 Sauvegarder maintenant", use_container_width=True, type="primary"):
             with st.spinner("Sauvegarde..."):
-                success, msg = cloud_save()
+                success, msg = cloud_save(background=False)
                 if success:
                     st.success(f"✅ {msg}")
                     if st.session_state.get('new_cloud_id_created'):
@@ -4339,6 +7509,12 @@ function doPost(e) {
     
     # Debug Google Sheets
     with st.expander("🔧 Debug Google Sheets"):
+        # Connexions HTTP réutilisées par le client partagé
+        http_stats = get_http_client().host_stats()
+        if not http_stats.empty:
+            st.caption("📡 Trafic HTTP depuis le démarrage du serveur")
+            st.dataframe(http_stats, hide_index=True, use_container_width=True)
+
         script_url = get_gsheet_script_url()
         if script_url:
             st.code(f"URL: {script_url[:50]}...{script_url[-20:]}" if len(script_url) > 70 else f"URL: {script_url}")
@@ -4349,8 +7525,7 @@ function doPost(e) {
                 if st.button("🧪 Tester LECTURE (GET)", key="test_gsheet_get"):
                     with st.spinner("Test lecture..."):
                         try:
-                            session = requests.Session()
-                            response = session.get(script_url, timeout=30, allow_redirects=True)
+                            response = get_http_client().get(script_url, timeout=30, allow_redirects=True)
                             
                             st.write(f"**Status:** {response.status_code}")
                             response_text = response.text[:300]
@@ -4374,7 +7549,7 @@ function doPost(e) {
                             # Envoyer un petit test
                             test_data = json.dumps({"test": True, "time": datetime.now().strftime('%H:%M:%S')})
                             
-                            response = requests.post(
+                            response = get_http_client().post(
                                 script_url,
                                 data=test_data,
                                 headers={'Content-Type': 'application/json'},
@@ -4429,7 +7604,7 @@ function doPost(e) {
                         num_chunks = (len(envelope) // 40000) + 1
                         st.info(f"📦 Sera stocké en {num_chunks} cellule(s) dans Google Sheets")
                         
-                        response = requests.post(
+                        response = get_http_client().post(
                             script_url,
                             data=envelope.encode('utf-8'),
                             headers={'Content-Type': 'application/json'},
@@ -4464,6 +7639,45 @@ function doPost(e) {
     
     st.markdown("<div style='height:32px'></div>", unsafe_allow_html=True)
     
+    # === STOCKAGE LOCAL ===
+    st.markdown("### 🗄️ Stockage local")
+    
+    sqlite_active = use_sqlite()
+    backend = st.radio(
+        "Format de sauvegarde sur le serveur",
+        ["JSON", "SQLite"],
+        index=1 if sqlite_active else 0,
+        horizontal=True,
+        help="SQLite : une ligne par entrée, joueur et blessure (index par date, joueur et statut) ; "
+             "chaque modification est une écriture de lignes au lieu d'un fichier complet."
+    )
+    if (backend == "SQLite") != sqlite_active:
+        label = "🗄️ Migrer vers SQLite" if backend == "SQLite" else "📄 Revenir au fichier JSON"
+        if st.button(label, use_container_width=True):
+            try:
+                migrate_local_storage(backend == "SQLite")
+                publish_session_data()
+                st.success(f"✅ Stockage local : {backend}")
+                st.rerun()
+            except Exception as e:
+                st.error(f"❌ Erreur: {str(e)}")
+    elif sqlite_active:
+        try:
+            counts = SqliteStorage().counts()
+            st.caption(f"🗄️ {DB_FILE} - {counts['players']} joueurs, {counts['entries']} entrées, "
+                       f"{counts['injuries']} blessures ({os.path.getsize(DB_FILE) // 1024} Ko)")
+        except Exception as e:
+            st.error(f"❌ Base SQLite illisible: {str(e)}")
+    else:
+        st.caption(f"📄 {DATA_FILE} + journal des modifications")
+        archived = getattr(st.session_state.data, 'archived', {})
+        seasons = sorted(read_partition_index())
+        if seasons:
+            st.caption("📦 Saisons archivées (" + PARTITION_DIR + ") : " +
+                       ", ".join(f"{s}{'' if s in archived else ' (chargée)'}" for s in seasons))
+    
+    st.markdown("<div style='height:32px'></div>", unsafe_allow_html=True)
+    
     # === ACTIONS ===
     st.markdown("### 🔧 Actions")
     
@@ -4471,6 +7685,7 @@ function doPost(e) {
     with col1:
         if st.button("🔄 Réinitialiser les paramètres", use_container_width=True):
             st.session_state.settings = DEFAULT_SETTINGS.copy()
+            save_changes([settings_record()], cloud=False)
             st.success("✅ Paramètres réinitialisés aux valeurs par défaut")
     
     with col2:
@@ -4532,8 +7747,91 @@ function doPost(e) {
 
 
 # ==================== MAIN ====================
+def get_sync_text():
+    """Texte d'état de la synchronisation cloud pour la barre latérale"""
+    if get_shared_dataset().reconciling:
+        return "🔄 Vérification du cloud..."
+    worker = poll_cloud_sync()
+    if worker and worker.pending:
+        if worker.failures and worker.next_retry:
+            return f"⚠️ Échec, nouvel essai à {worker.next_retry.strftime('%H:%M:%S')}"
+        return "⏳ Synchronisation..."
+    if worker and worker.last_result and not worker.last_result[0]:
+        return f"⚠️ {worker.last_result[1][:40]}"
+    if 'last_cloud_save' in st.session_state:
+        time_diff = datetime.now() - st.session_state.last_cloud_save
+        if time_diff.total_seconds() < 60:
+            sync_text = "à l'instant"
+        elif time_diff.total_seconds() < 3600:
+            sync_text = f"il y a {int(time_diff.total_seconds() / 60)} min"
+        else:
+            sync_text = st.session_state.last_cloud_save.strftime("%H:%M")
+        return f"Sync {sync_text}"
+    return None
+
+def is_sync_active():
+    """Envoi cloud en attente ou vérification du cloud en cours"""
+    worker = st.session_state.get('sync_worker')
+    return bool(worker and worker.pending) or get_shared_dataset().reconciling
+
+def render_storage_indicator():
+    """Indicateur de statut stockage de la barre latérale (rafraîchi seulement pendant une synchronisation)"""
+    if is_sync_active():
+        poll_storage_indicator()
+    else:
+        show_storage_indicator()
+
+@st.fragment(run_every=timedelta(seconds=SYNC_DEBOUNCE_SECONDS))
+def poll_storage_indicator():
+    """Indicateur rafraîchi périodiquement ; la page est relancée à la fin de la synchronisation"""
+    # Envoi ou réconciliation terminé : relancer la page pour l'appliquer et arrêter le rafraîchissement
+    if not is_sync_active():
+        st.rerun()
+    show_storage_indicator()
+
+def show_storage_indicator():
+    """Indicateur de statut stockage de la barre latérale"""
+    # Réconciliation cloud terminée depuis le dernier affichage : relancer la page pour l'appliquer
+    update = get_shared_dataset().cloud_update
+    if update is not None and update[0] > st.session_state.get('cloud_update_seen', 0):
+        st.rerun()
+    is_gsheet = is_gsheet_configured()
+    cloud_connected, _ = get_cloud_status()
+    sync_text = get_sync_text()
+    sync_html = f'<div style="font-size:9px;color:#64748b;">{sync_text}</div>' if sync_text else ''
+    
+    if is_gsheet:
+        # Google Sheets configuré - parfait !
+        st.markdown(f"""
+        <div style="background:rgba(16,185,129,0.1);border:1px solid rgba(16,185,129,0.3);border-radius:8px;padding:10px;text-align:center;">
+            <div style="font-size:11px;color:#10b981;">📊 Google Sheets ✅</div>
+            {sync_html}
+        </div>
+        """, unsafe_allow_html=True)
+    elif cloud_connected:
+        # JSONBlob (legacy)
+        st.markdown(f"""
+        <div style="background:rgba(245,158,11,0.15);border:1px solid rgba(245,158,11,0.4);border-radius:8px;padding:10px;text-align:center;">
+            <div style="font-size:11px;color:#f59e0b;">☁️ JSONBlob (legacy)</div>
+            <div style="font-size:9px;color:#94a3b8;">Migrez vers Google Sheets</div>
+            {sync_html}
+        </div>
+        """, unsafe_allow_html=True)
+    else:
+        # Pas configuré
+        st.markdown("""
+        <div style="background:rgba(59,130,246,0.1);border:1px solid rgba(59,130,246,0.3);border-radius:8px;padding:10px;text-align:center;">
+            <div style="font-size:11px;color:#3b82f6;">☁️ Non configuré</div>
+            <div style="font-size:9px;color:#94a3b8;">Voir Paramètres</div>
+        </div>
+        """, unsafe_allow_html=True)
+
 def main():
     """Point d'entrée principal"""
+    # Résultats des sauvegardes cloud terminées en arrière-plan
+    poll_cloud_sync()
+    check_cloud_update()
+    
     with st.sidebar:
         st.markdown("""
         <div style="text-align:center;padding:1.5rem 0;">
@@ -4589,51 +7887,8 @@ def main():
         
         st.markdown("<div style='height:16px'></div>", unsafe_allow_html=True)
         
-        # Indicateur de statut stockage
-        storage_type, storage_name = get_storage_status()
-        is_gsheet = is_gsheet_configured()
-        cloud_connected, _ = get_cloud_status()
-        
-        if is_gsheet:
-            # Google Sheets configuré - parfait !
-            if 'last_cloud_save' in st.session_state:
-                time_diff = datetime.now() - st.session_state.last_cloud_save
-                if time_diff.total_seconds() < 60:
-                    sync_text = "à l'instant"
-                elif time_diff.total_seconds() < 3600:
-                    sync_text = f"il y a {int(time_diff.total_seconds() / 60)} min"
-                else:
-                    sync_text = st.session_state.last_cloud_save.strftime("%H:%M")
-                
-                st.markdown(f"""
-                <div style="background:rgba(16,185,129,0.1);border:1px solid rgba(16,185,129,0.3);border-radius:8px;padding:10px;text-align:center;">
-                    <div style="font-size:11px;color:#10b981;">📊 Google Sheets ✅</div>
-                    <div style="font-size:9px;color:#64748b;">Sync {sync_text}</div>
-                </div>
-                """, unsafe_allow_html=True)
-            else:
-                st.markdown("""
-                <div style="background:rgba(16,185,129,0.1);border:1px solid rgba(16,185,129,0.3);border-radius:8px;padding:10px;text-align:center;">
-                    <div style="font-size:11px;color:#10b981;">📊 Google Sheets ✅</div>
-                </div>
-                """, unsafe_allow_html=True)
-                
-        elif cloud_connected:
-            # JSONBlob (legacy)
-            st.markdown("""
-            <div style="background:rgba(245,158,11,0.15);border:1px solid rgba(245,158,11,0.4);border-radius:8px;padding:10px;text-align:center;">
-                <div style="font-size:11px;color:#f59e0b;">☁️ JSONBlob (legacy)</div>
-                <div style="font-size:9px;color:#94a3b8;">Migrez vers Google Sheets</div>
-            </div>
-            """, unsafe_allow_html=True)
-        else:
-            # Pas configuré
-            st.markdown("""
-            <div style="background:rgba(59,130,246,0.1);border:1px solid rgba(59,130,246,0.3);border-radius:8px;padding:10px;text-align:center;">
-                <div style="font-size:11px;color:#3b82f6;">☁️ Non configuré</div>
-                <div style="font-size:9px;color:#94a3b8;">Voir Paramètres</div>
-            </div>
-            """, unsafe_allow_html=True)
+        # Indicateur de statut stockage (rafraîchi pendant la synchronisation en arrière-plan)
+        render_storage_indicator()
         
         # Indicateur si chargé depuis le cloud
         if st.session_state.get('cloud_loaded'):
@@ -4650,7 +7905,7 @@ def main():
         # Bouton Sauvegarder
         if st.button("💾 Sauvegarder", use_container_width=True, help="Sauvegarder dans Google Sheets"):
             with st.spinner("Sauvegarde..."):
-                success, msg = cloud_save()
+                success, msg = cloud_save(background=False)
                 if success:
                     st.success("✅ Sauvegardé !")
                 else:
@@ -0,0 +1,98 @@
+"""
+Fixtures communes : app.py chargé comme module, avec pour chaque test un dossier de travail
+vide (fichiers locaux), une session Streamlit neuve et un jeu de données partagé réinitialisé.
+"""
+import logging
+import os
+import sys
+
+import pytest
+import streamlit as st
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+# Streamlit hors `streamlit run` : avertissements "missing ScriptRunContext" sans intérêt ici
+for name in ('streamlit', 'streamlit.runtime.scriptrunner_utils.script_run_context'):
+    logging.getLogger(name).setLevel(logging.ERROR)
+
+
+def pytest_addoption(parser):
+    parser.addoption('--benchmark', action='store_true', help="lance aussi les comparaisons de durée (marqueur benchmark)")
+
+
+def pytest_configure(config):
+    config.addinivalue_line('markers', "benchmark: comparaison de durées, lancée seulement avec --benchmark")
+
+
+def pytest_collection_modifyitems(config, items):
+    # Mesures de temps sensibles à la charge de la machine : hors de la suite par défaut
+    if config.getoption('--benchmark'):
+        return
+    skip = pytest.mark.skip(reason="comparaison de durées : lancer avec --benchmark")
+    for item in items:
+        if 'benchmark' in item.keywords:
+            item.add_marker(skip)
+
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    # Import depuis un dossier vide : le chargement de démarrage d'app.py ne lit aucune sauvegarde locale
+    cwd = os.getcwd()
+    os.chdir(tmp_path_factory.mktemp('import'))
+    try:
+        import app
+    finally:
+        os.chdir(cwd)
+    return app
+
+
+@pytest.fixture
+def app(app_module, tmp_path, monkeypatch):
+    """Module app.py isolé : dossier temporaire, session vide, pas de stockage cloud configuré"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(app_module, 'get_gsheet_script_url', lambda: None)
+    st.session_state.clear()
+    app_module.init_session()
+    app_module.get_shared_dataset.clear()
+    yield app_module
+    st.session_state.clear()
+    app_module.get_shared_dataset.clear()
+
+
+@pytest.fixture
+def gas(app, monkeypatch):
+    """Stand-in local du script Apps Script, utilisé comme stockage Google Sheets"""
+    from gas_standin import GasStandin
+    server = GasStandin()
+    monkeypatch.setattr(app, 'get_gsheet_script_url', lambda: server.url)
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def jsonblob(app, monkeypatch):
+    """Stand-in local de l'API JSONBlob, identifiant `blob1` dans le fichier local (créé au premier envoi)"""
+    from jsonblob_standin import JsonBlobStandin
+    server = JsonBlobStandin()
+    monkeypatch.setattr(app, 'JSONBLOB_API_URL', server.url)
+    with open(app.CLOUD_ID_FILE, 'w') as f:
+        f.write('blob1')
+    yield server
+    server.close()
+
+
+@pytest.fixture
+def sheets(app, monkeypatch):
+    """Stand-in local de l'export CSV Google Sheets, servant les onglets de tests/fixtures (0,3 s par requête)"""
+    from sheets_standin import SheetsStandin
+    fixtures = os.path.join(os.path.dirname(__file__), 'fixtures')
+    tabs = {}
+    for sheet, filename in (("Bien-être", 'bien_etre.csv'), ("Suivi BE", 'suivi_be.csv'), ("Suivi Poids", 'suivi_poids.csv')):
+        with open(os.path.join(fixtures, filename), encoding='utf-8') as f:
+            tabs[sheet] = f.read()
+    server = SheetsStandin(tabs, delay=0.3)
+    monkeypatch.setattr(app, 'GSHEET_CSV_URL', server.url)
+    yield server
+    server.close()
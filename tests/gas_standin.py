@@ -0,0 +1,101 @@
+"""
+Stand-in local du web app Apps Script (même protocole doGet / doPost) pour les tests.
+
+- POST {'compressed', 'data'} : instantané complet, nouvelle version, patchs effacés.
+- POST {'patch', 'base_version', 'data'} : patch accepté si base_version est la version courante,
+  sinon {'conflict': True}.
+- GET : instantané + patchs ; `since` : patchs postérieurs seulement ; `version` égale à la
+  version courante : {'unchanged': True}.
+- legacy=True : ancien script sans versions (renvoie le dernier POST tel quel).
+"""
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class GasStandin:
+    def __init__(self, legacy=False):
+        self.legacy = legacy
+        self.snapshot = ''       # Dernier instantané reçu (JSON brut)
+        self.version = 0
+        self.snapshot_version = 0
+        self.patches = []        # (version, base_version, patch compressé)
+        self.posts = []          # (type, taille en octets) de chaque POST
+        self.gets = []           # 'full', 'since' ou 'unchanged'
+        self.lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self._server.server_address[1]}/exec'
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _get(self, query):
+        if self.legacy:
+            return self.snapshot or '{}'
+        known = query.get('version', [None])[0]
+        if known is not None and int(known) == self.version:
+            self.gets.append('unchanged')
+            return {'version': self.version, 'unchanged': True}
+        since = query.get('since', [None])[0]
+        if since is not None and self.snapshot_version <= int(since) <= self.version:
+            self.gets.append('since')
+            return {'version': self.version, 'since': int(since),
+                    'patches': [data for version, _, data in self.patches if version > int(since)]}
+        self.gets.append('full')
+        if not self.snapshot:
+            return {'version': self.version}
+        response = json.loads(self.snapshot)
+        response['version'] = self.version
+        response['patches'] = [data for _, _, data in self.patches]
+        return response
+
+    def _post(self, raw):
+        if self.legacy:
+            self.posts.append(('full', len(raw)))
+            self.snapshot = raw
+            return {'success': True}
+        body = json.loads(raw)
+        if body.get('patch'):
+            self.posts.append(('patch', len(raw)))
+            if int(body['base_version']) != self.version:
+                return {'success': False, 'conflict': True, 'version': self.version}
+            self.version += 1
+            self.patches.append((self.version, body['base_version'], body['data']))
+        else:
+            self.posts.append(('full', len(raw)))
+            self.version += 1
+            self.snapshot = raw
+            self.snapshot_version = self.version
+            self.patches = []
+        return {'success': True, 'version': self.version}
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, payload):
+                body = (payload if isinstance(payload, str) else json.dumps(payload)).encode()
+                self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                with standin.lock:
+                    payload = standin._get(parse_qs(urlparse(self.path).query))
+                self._send(payload)
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers['Content-Length'])).decode()
+                with standin.lock:
+                    payload = standin._post(raw)
+                self._send(payload)
+
+        return Handler
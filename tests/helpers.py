@@ -0,0 +1,45 @@
+"""Jeux de données de test déterministes et mise en place d'une session"""
+import copy
+import random
+from datetime import date, timedelta
+
+import streamlit as st
+
+POSITIONS = ['Pilier gauche', 'Talonneur', 'Pilier droit', '2ème ligne', '3ème ligne aile', 'Demi de mêlée',
+             "Demi d'ouverture", 'Centre', 'Ailier', 'Arrière']
+METRIC_KEYS = ['sleep', 'mentalLoad', 'motivation', 'hdcState', 'bdcState']
+
+
+def make_season(ndays=60, nplayers=20, seed=1, start=date(2025, 7, 1)):
+    """(joueurs, données) : ndays jours consécutifs à partir de `start`, quelques trous et poids"""
+    rnd = random.Random(seed)
+    players = [{'id': f'p_{i}', 'name': f'JOUEUR {i}', 'position': rnd.choice(POSITIONS),
+                'status': 'Apte', 'targetWeight': rnd.choice([85, 95, 105])} for i in range(nplayers)]
+    data = {}
+    for k in range(ndays):
+        entries = []
+        for player in players:
+            if rnd.random() < 0.15:
+                continue
+            entry = {'name': player['name']}
+            for key in METRIC_KEYS:
+                if rnd.random() < 0.9:
+                    entry[key] = float(rnd.randint(0, 5))
+            if rnd.random() < 0.5:
+                entry['weight'] = round(player['targetWeight'] + rnd.uniform(-4, 4), 1)
+            entries.append(entry)
+        data[(start + timedelta(days=k)).isoformat()] = entries
+    return players, data
+
+
+def set_session(players, data, injuries=()):
+    """Session Streamlit avec une copie des données"""
+    st.session_state.players = copy.deepcopy(players)
+    st.session_state.data = copy.deepcopy(data)
+    st.session_state.injuries = copy.deepcopy(list(injuries))
+
+
+def new_session(app):
+    """Nouvelle session (autre onglet ou redémarrage) dans le même processus"""
+    st.session_state.clear()
+    app.init_session()
@@ -0,0 +1,82 @@
+"""
+Stand-in local de l'API JSONBlob pour les tests.
+
+- GET /api/jsonBlob/<id> : contenu du blob avec un ETag (empreinte du contenu) ; 304 sans corps
+  si If-None-Match correspond ; 404 si le blob n'existe pas.
+- PUT /api/jsonBlob/<id> : remplace le contenu.
+- POST /api/jsonBlob : crée un blob (201 + Location).
+"""
+import hashlib
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class JsonBlobStandin:
+    def __init__(self):
+        self.blobs = {}          # id -> contenu JSON brut
+        self.gets = []           # (id, If-None-Match, statut) de chaque GET
+        self.lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self._server.server_address[1]}/api/jsonBlob'
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @staticmethod
+    def etag(raw):
+        return '"' + hashlib.sha1(raw.encode()).hexdigest() + '"'
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, raw=None, headers=()):
+                body = raw.encode() if raw is not None else b''
+                self.send_response(status)
+                for name, value in headers:
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _blob_id(self):
+                return self.path.rstrip('/').split('/')[-1]
+
+            def do_GET(self):
+                blob_id, if_none_match = self._blob_id(), self.headers.get('If-None-Match')
+                with standin.lock:
+                    raw = standin.blobs.get(blob_id)
+                    if raw is None:
+                        status = 404
+                    elif if_none_match == standin.etag(raw):
+                        status = 304
+                    else:
+                        status = 200
+                    standin.gets.append((blob_id, if_none_match, status))
+                if status == 200:
+                    self._send(200, raw, [('Content-Type', 'application/json'), ('ETag', standin.etag(raw))])
+                else:
+                    self._send(status)
+
+            def do_PUT(self):
+                raw = self.rfile.read(int(self.headers['Content-Length'])).decode()
+                with standin.lock:
+                    if self._blob_id() not in standin.blobs:
+                        self._send(404)
+                        return
+                    standin.blobs[self._blob_id()] = raw
+                self._send(200, raw, [('Content-Type', 'application/json')])
+
+            def do_POST(self):
+                raw = self.rfile.read(int(self.headers['Content-Length'])).decode()
+                with standin.lock:
+                    blob_id = f'blob{len(standin.blobs) + 1}'
+                    standin.blobs[blob_id] = raw
+                self._send(201, raw, [('Location', f'{standin.url}/{blob_id}')])
+
+        return Handler
@@ -0,0 +1,63 @@
+"""
+Stand-in local de l'export CSV des onglets Google Sheets pour les tests.
+
+GET /<doc_id>?sheet=<onglet> : contenu CSV de l'onglet (404 s'il n'existe pas), après `delay` secondes.
+Chaque requête est journalisée (onglet, instant de réception) ; `max_in_flight` est le plus grand
+nombre de requêtes traitées en même temps.
+"""
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class SheetsStandin:
+    def __init__(self, tabs, delay=0.0):
+        self.tabs = dict(tabs)   # nom d'onglet -> texte CSV
+        self.delay = delay
+        self.requests = []       # (onglet, time.perf_counter() à la réception)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.url = f'http://127.0.0.1:{self._server.server_address[1]}/{{doc_id}}?sheet={{sheet}}'
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _handler(self):
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                sheet = parse_qs(urlparse(self.path).query)['sheet'][0]
+                with standin._lock:
+                    standin.requests.append((sheet, time.perf_counter()))
+                    standin.in_flight += 1
+                    standin.max_in_flight = max(standin.max_in_flight, standin.in_flight)
+                try:
+                    self._respond(sheet)
+                finally:
+                    with standin._lock:
+                        standin.in_flight -= 1
+
+            def _respond(self, sheet):
+                time.sleep(standin.delay)
+                if sheet not in standin.tabs:
+                    self.send_response(404)
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                body = standin.tabs[sheet].encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/csv; charset=utf-8')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return Handler
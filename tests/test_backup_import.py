@@ -0,0 +1,46 @@
+"""Restauration d'un backup : la session n'est modifiée qu'une fois l'import validé sur disque"""
+
+import pytest
+import streamlit as st
+
+from helpers import make_season
+
+
+def backup_sections(players, data, settings):
+    yield ('players', None, players), 0.0
+    for i, (date_key, entries) in enumerate(data.items()):
+        yield ('date', date_key, entries), (i + 1) / len(data)
+    yield ('injuries', None, []), 1.0
+    yield ('settings', None, settings), 1.0
+
+
+def test_failed_commit_leaves_session_untouched(app, monkeypatch):
+    players, data = make_season(30)
+    st.session_state.settings['team_name'] = 'Avant import'
+    before = dict(st.session_state.settings)
+
+    def fail(self):
+        raise OSError("disque plein")
+    monkeypatch.setattr(app.FileCommit, 'commit', fail)
+
+    success, message = app.import_backup(backup_sections(players, data, {'team_name': 'Backup', 'cloud_blob_id': 'x'}))
+
+    assert not success and 'disque plein' in message
+    assert dict(st.session_state.settings) == before
+    assert st.session_state.players == [] and not st.session_state.data
+
+
+@pytest.mark.parametrize('sqlite', [False, True])
+def test_settings_applied_after_import(app, sqlite):
+    if sqlite:
+        app.SqliteStorage().write_state({'players': [], 'data': {}, 'injuries': [], 'settings': {}}, 'inconnue')
+    players, data = make_season(30)
+
+    success, message = app.import_backup(backup_sections(players, data, {'team_name': 'Backup', 'cloud_blob_id': 'x'}))
+
+    assert success, message
+    assert st.session_state.settings['team_name'] == 'Backup'
+    assert st.session_state.settings.get('cloud_blob_id') != 'x'
+    saved = app.read_local_state()
+    assert saved['settings']['team_name'] == 'Backup' and 'cloud_blob_id' not in saved['settings']
+    assert app.complete_data(saved['data']) == data
@@ -0,0 +1,100 @@
+"""Copie binaire de DATA_FILE (.wts) : chargement à la demande, projection gardée puis fermée, régénération"""
+import os
+
+import numpy as np
+
+from helpers import make_season
+
+
+def write_state(app, ndays=40):
+    players, data = make_season(ndays)
+    first = sorted(data)[0]
+    data[first][0]['remark'] = 'Genou douloureux'
+    data[first][1]['sleep'] = 4           # Entier : hors colonnes (extras)
+    state = {'players': players, 'data': data, 'injuries': [], 'settings': {}}
+    app.write_state_file(state)
+    return state
+
+
+def pending(app, data):
+    """Dates dont les entrées n'ont pas encore été construites"""
+    return [d for d in dict.keys(data) if dict.__getitem__(data, d) is app._PENDING_DAY]
+
+
+def test_entries_are_built_on_first_access(app):
+    state = write_state(app)
+    app.read_local_state()               # Première lecture : JSON, copie binaire écrite
+
+    loaded, store = app.load_local_state()
+
+    data = loaded['data']
+    assert isinstance(data, app.SnapshotDays)
+    assert len(pending(app, data)) == len(state['data'])
+    assert app.content_hash(loaded) == app.content_hash(state)
+    assert len(pending(app, data)) == len(state['data'])
+    # Store construit depuis les colonnes, identique à celui des dicts
+    reference = app.WellnessStore(state['data'])
+    assert store.dates == reference.dates and store.players == reference.players
+    assert np.array_equal(store.values, reference.values, equal_nan=True)
+    assert np.array_equal(store.present, reference.present)
+
+    first = sorted(state['data'])[0]
+    assert data[first] == state['data'][first]
+    assert len(pending(app, data)) == len(state['data']) - 1
+    assert dict(data) == state['data']
+    assert not pending(app, data)
+
+
+def test_projection_kept_until_all_days_are_built(app):
+    state = write_state(app)
+    app.read_local_state()
+
+    snapshots = []
+    data = app.read_local_state(snapshots)['data']
+
+    # Entrées lues dans la projection elle-même, sans copie du fichier
+    assert isinstance(data, app.SnapshotDays) and data.snapshot is snapshots[0]
+    assert isinstance(data.snapshot.buffer, app.mmap.mmap)
+    first, last = sorted(state['data'])[0], sorted(state['data'])[-1]
+    assert data[first] == state['data'][first] and not data.snapshot.buffer.closed
+    data.materialize()
+    assert data.snapshot.buffer.closed
+    assert data[last] == state['data'][last]
+
+
+def test_projection_released_when_shared_version_is_replaced(app):
+    state = write_state(app)
+    app.read_local_state()
+    loaded = app.read_local_state()
+    shared = app.get_shared_dataset()
+    shared.publish(loaded, 'local', loaded=True)
+    data = loaded['data']
+    assert data.pending_hashes() and not data.snapshot.buffer.closed
+
+    shared.publish({**loaded, 'data': app.SeasonData(state['data'])})
+
+    # Une session encore sur l'ancienne version la lit toujours
+    assert data.snapshot.buffer.closed and not pending(app, data)
+    assert dict(data) == state['data']
+
+
+def test_copy_is_rewritten_only_when_content_changes(app):
+    state = write_state(app)
+    app.read_local_state()
+    written = os.stat(app.SNAPSHOT_CACHE_FILE).st_mtime_ns
+
+    # Même contenu, date de modification différente (copie, restauration)
+    stat = os.stat(app.DATA_FILE)
+    os.utime(app.DATA_FILE, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    loaded = app.read_local_state()
+    assert isinstance(loaded['data'], app.SnapshotDays)
+    assert os.stat(app.SNAPSHOT_CACHE_FILE).st_mtime_ns == written
+
+    # Contenu modifié : relu en JSON et copie réécrite
+    first = sorted(state['data'])[0]
+    state['data'][first] = state['data'][first][:1]
+    app.write_state_file(state)
+    loaded = app.read_local_state()
+    assert not isinstance(loaded['data'], app.SnapshotDays)
+    assert loaded['data'][first] == state['data'][first]
+    assert app.read_local_state()['data'][first] == state['data'][first]
@@ -0,0 +1,110 @@
+"""Jetons de version du cloud : version Apps Script au démarrage, ETag / If-None-Match JSONBlob"""
+import time
+
+from helpers import make_season, new_session, set_session
+
+
+def restart(app):
+    """Redémarrage du processus : sauvegarde locale publiée puis réconciliation cloud en arrière-plan"""
+    app.get_shared_dataset.clear()
+    new_session(app)
+    shared = app.get_shared_dataset()
+    with shared.lock, shared.file_lock:
+        state, store = app.load_local_state()
+        shared.publish(state, 'local', store=store, loaded=True)
+    app.start_cloud_reconcile(shared)
+    deadline = time.monotonic() + 10
+    while shared.reconciling and time.monotonic() < deadline:
+        time.sleep(0.01)
+    assert not shared.reconciling
+    return shared
+
+
+def save_season(app, ndays=30, seed=1):
+    players, data = make_season(ndays, seed=seed)
+    set_session(players, data)
+    app.write_snapshot()
+    success, message = app.cloud_save(background=False)
+    assert success, message
+    return data
+
+
+def test_startup_skips_download_when_gsheet_version_is_known(app, gas, monkeypatch):
+    save_season(app)
+    decompressed = []
+    original = app.decompress_data
+    monkeypatch.setattr(app, 'decompress_data', lambda *a, **k: decompressed.append(1) or original(*a, **k))
+
+    shared = restart(app)
+
+    assert gas.gets == ['unchanged']
+    assert shared.cloud_update[1] == 'same'
+    assert shared.cloud_version == gas.version
+    assert decompressed == []
+
+
+def test_startup_downloads_when_cloud_advanced(app, gas, tmp_path, monkeypatch):
+    save_season(app)
+    # Un autre poste envoie un nouvel instantané
+    device = tmp_path / 'other'
+    device.mkdir()
+    monkeypatch.chdir(device)
+    new_session(app)
+    other = save_season(app, ndays=12, seed=7)
+    monkeypatch.chdir(tmp_path)
+
+    shared = restart(app)
+
+    assert gas.gets == ['full']
+    assert shared.cloud_update[1] == 'cloud'
+    assert shared.cloud_version == gas.version == 2
+    assert app.complete_data(shared.state['data']) == other
+
+
+def test_version_of_another_target_is_not_reused(app, gas):
+    save_season(app)
+    marker = app.read_sync_marker()
+    app.write_sync_marker(marker['hash'], marker['cloud_version'], marker['settings_hash'], target='jsonblob:autre')
+
+    shared = restart(app)
+
+    assert gas.gets == ['full']
+    assert shared.cloud_update[1] == 'same'
+
+
+def test_jsonblob_reload_uses_etag(app, jsonblob):
+    save_season(app)
+    new_session(app)
+
+    first = app.load_from_cloud()
+    second = app.load_from_cloud()
+
+    assert first[0] and second == (True, "☁️ Déjà à jour (aucune modification dans le cloud)")
+    assert [(inm is not None, status) for _, inm, status in jsonblob.gets] == [(False, 200), (True, 304)]
+
+
+def test_jsonblob_reload_after_local_edit_downloads_again(app, jsonblob):
+    data = save_season(app)
+    new_session(app)
+    app.load_from_cloud()
+    app.own_session_data()
+    app.st.session_state.data[sorted(data)[0]][0]['sleep'] = 0.0
+    app.save_changes([app.day_record(sorted(data)[0])], cloud=False)
+
+    success, message = app.load_from_cloud()
+
+    assert success and message.startswith("☁️ Chargé")
+    assert jsonblob.gets[-1][1:] == (None, 200)
+    assert app.st.session_state.data[sorted(data)[0]] == data[sorted(data)[0]]
+
+
+def test_jsonblob_startup_etag(app, jsonblob):
+    save_season(app)
+    shared = restart(app)
+    assert shared.cloud_update[1] == 'same'
+    etag = app.read_sync_marker()['etag']
+    assert etag == jsonblob.etag(jsonblob.blobs['blob1'])
+
+    assert app.fetch_jsonblob_state('blob1', etag) == (None, etag, True)
+    restart(app)
+    assert [status for _, _, status in jsonblob.gets] == [200, 304, 304]
@@ -0,0 +1,146 @@
+"""Protocole de synchronisation différentielle avec Apps Script (stand-in local)"""
+import threading
+import time
+
+from helpers import make_season, new_session, set_session
+
+
+def start(app, gas, ndays=40):
+    """Session sauvegardée localement et envoyée en instantané complet"""
+    players, data = make_season(ndays)
+    set_session(players, data)
+    app.write_snapshot()
+    assert app.cloud_save(background=False)[0]
+    assert gas.posts == [('full', gas.posts[0][1])] and gas.version == 1
+    return players, data
+
+
+def edit_day(app, date_key, sleep):
+    app.own_session_data()
+    app.st.session_state.data[date_key][0]['sleep'] = sleep
+    app.save_changes([app.day_record(date_key)], cloud=False)
+
+
+def test_changes_are_sent_as_one_small_patch(app, gas):
+    _, data = start(app, gas)
+    date_key = sorted(data)[-1]
+    for sleep in (1.0, 2.0, 3.0):
+        edit_day(app, date_key, sleep)
+
+    success, message = app.cloud_save(background=False, delta=True)
+
+    assert success, message
+    assert [kind for kind, _ in gas.posts] == ['full', 'patch']
+    assert gas.posts[1][1] < gas.posts[0][1] / 10
+    # Une seule version de la date (la plus récente) dans le patch
+    records = app.read_gsheet_patches({'patches': [gas.patches[0][2]]})
+    assert [(r['op'], r['date'], r['entries'][0]['sleep']) for r in records] == [('day', date_key, 3.0)]
+    assert app.get_gsheet_sync().version == gas.version == 2
+    assert not app.is_cloud_dirty()
+
+
+def test_fresh_session_full_load_applies_patches(app, gas):
+    _, data = start(app, gas)
+    date_key = sorted(data)[0]
+    edit_day(app, date_key, 0.0)
+    app.cloud_save(background=False, delta=True)
+    expected = app.complete_data(app.st.session_state.data)
+
+    new_session(app)
+    success, message = app.load_from_gsheet()
+
+    assert success, message
+    assert gas.gets[-1] == 'full'
+    assert dict(app.st.session_state.data) == expected
+    assert app.get_gsheet_sync().version == gas.version
+
+
+def test_load_since_version_fetches_patches_and_persists_them(app, gas):
+    _, data = start(app, gas)
+    date_key = sorted(data)[-1]
+    other = app.GsheetDeltaSync()
+    other.reset(gas.version)
+    entries = [dict(e, sleep=5.0) for e in data[date_key]]
+    other.add([{'op': 'day', 'date': date_key, 'entries': entries},
+               {'op': 'settings', 'settings': {'zscoreDays': 21}}])
+    assert other.sync(gas.url)[0]
+
+    success, message = app.cloud_load()
+
+    assert success, message
+    assert gas.gets[-1] == 'since'
+    assert app.st.session_state.data[date_key] == entries
+    assert app.st.session_state.settings['zscoreDays'] == 21
+    # Rien n'est renvoyé au cloud, et les patchs reçus survivent à un redémarrage
+    assert len(gas.posts) == 2 and not app.is_cloud_dirty()
+    state = app.read_local_state()
+    assert state['data'][date_key] == entries
+    assert state['settings']['zscoreDays'] == 21
+
+
+def test_load_at_known_version_downloads_nothing(app, gas):
+    start(app, gas)
+
+    success, message = app.cloud_load()
+
+    assert success, message
+    assert gas.gets == ['unchanged']
+
+
+def test_stale_base_version_falls_back_to_full_snapshot(app, gas):
+    _, data = start(app, gas)
+    other = app.GsheetDeltaSync()
+    other.reset(gas.version)
+    other.add([{'op': 'settings', 'settings': {'zscoreDays': 20}}])
+    assert other.sync(gas.url)[0]
+    edit_day(app, sorted(data)[0], 4.0)
+
+    success, _ = app.cloud_save(background=False, delta=True)
+
+    # Patch refusé : un instantané complet est programmé aussitôt
+    assert not success
+    assert gas.posts[-1][0] == 'patch' and app.get_gsheet_sync().full is not None
+    assert app.cloud_save(background=False, delta=True)[0]
+    assert gas.posts[-1][0] == 'full' and gas.patches == []
+    assert app.get_gsheet_sync().version == gas.version
+
+
+def test_records_marked_during_an_upload_are_kept(app, gas, monkeypatch):
+    start(app, gas)
+    sync = app.GsheetDeltaSync()
+    sync.reset(gas.version)
+    sync.add([{'op': 'settings', 'settings': {'zscoreDays': 10}}])
+    post = app.post_to_gsheet
+    in_flight = threading.Event()
+
+    def slow_post(url, envelope):
+        in_flight.set()
+        time.sleep(0.2)
+        return post(url, envelope)
+
+    monkeypatch.setattr(app, 'post_to_gsheet', slow_post)
+    upload = threading.Thread(target=sync.sync, args=(gas.url,))
+    upload.start()
+    in_flight.wait()
+    # Rechargement pendant l'envoi, puis nouvelle modification
+    sync.reset(sync.version)
+    sync.add([{'op': 'settings', 'settings': {'zscoreAlert': -2.0}}])
+    upload.join()
+
+    assert len(sync.dirty) == 1 and 'zscoreAlert' in sync.dirty[0][2]
+
+
+def test_script_without_versions_gets_full_snapshots(app, monkeypatch):
+    from gas_standin import GasStandin
+    legacy = GasStandin(legacy=True)
+    monkeypatch.setattr(app, 'get_gsheet_script_url', lambda: legacy.url)
+    try:
+        set_session(*make_season(20))
+        app.write_snapshot()
+        assert app.cloud_save(background=False)[0]
+        edit_day(app, sorted(app.st.session_state.data)[0], 1.0)
+        assert app.cloud_save(background=False, delta=True)[0]
+        assert [kind for kind, _ in legacy.posts] == ['full', 'full']
+        assert app.get_gsheet_sync().version is None
+    finally:
+        legacy.close()
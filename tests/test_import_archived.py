@@ -0,0 +1,82 @@
+"""Imports de dates appartenant à une saison archivée (non chargée dans la session)"""
+from datetime import date
+
+import streamlit as st
+
+from helpers import make_season
+
+
+def archived_session(app):
+    """Deux saisons sauvegardées ; session rechargée avec la plus ancienne archivée"""
+    players, data = make_season(500, start=date(2024, 7, 1))
+    app.write_state_file({'players': players, 'data': data, 'injuries': [], 'settings': {}})
+    state = app.read_local_state()
+    st.session_state.players = state['players']
+    st.session_state.data = state['data']
+    old = '2024-10-01'
+    assert old not in st.session_state.data and '2024-2025' in st.session_state.data.archived
+    return data, old
+
+
+def saved_day(app, date_key):
+    """Journée telle que relue depuis le disque après sauvegarde"""
+    app.write_snapshot()
+    return app.complete_data(app.read_local_state()['data'])[date_key]
+
+
+def test_suivi_be_block_merges_into_archived_day(app):
+    data, old = archived_session(app)
+    entry = {**data[old][0], 'sleep': 0.0}
+
+    _, keys = app.apply_suivi_be_blocks([{'date': old, 'entries': [entry], 'names': [entry['name']]}])
+    app.save_changes([app.day_record(d) for d in keys], cloud=False)
+
+    expected = [entry] + data[old][1:]
+    assert st.session_state.data[old] == expected
+    assert saved_day(app, old) == expected
+
+
+def test_daily_import_replaces_archived_day_only(app):
+    data, old = archived_session(app)
+    entry = {**data[old][-1], 'motivation': 1.0}
+
+    app.apply_imported_day({'date': old, 'entries': [entry], 'names': [entry['name']]})
+    app.save_changes([app.day_record(old)], cloud=False)
+
+    app.write_snapshot()
+    saved = app.complete_data(app.read_local_state()['data'])
+    assert saved[old] == [entry]
+    assert {d: e for d, e in saved.items() if d != old} == {d: e for d, e in data.items() if d != old}
+
+
+def test_daily_import_replaces_live_day(app):
+    data, _ = archived_session(app)
+    live = max(data)
+    entry = {**data[live][0], 'sleep': 0.0}
+
+    app.apply_imported_day({'date': live, 'entries': [entry], 'names': [entry['name']]})
+    app.save_changes([app.day_record(live)], cloud=False)
+
+    assert st.session_state.data[live] == [entry]
+    assert saved_day(app, live) == [entry]
+
+
+def test_suivi_be_block_keeps_rows_of_new_date(app):
+    archived_session(app)
+    rows = [{'name': 'JOUEUR 1', 'sleep': 3.0}, {'name': 'JOUEUR 1', 'sleep': 4.0}]
+
+    app.apply_suivi_be_blocks([{'date': '2030-01-01', 'entries': rows, 'names': ['JOUEUR 1']}])
+
+    assert st.session_state.data['2030-01-01'] == rows
+
+
+def test_weights_update_archived_dates(app):
+    data, old = archived_session(app)
+    name = data[old][0]['name']
+
+    result = app.apply_suivi_poids({'rows': [(name, [(old, 101.3)])]}, {old})
+    app.save_changes([app.day_record(old)], cloud=False)
+
+    assert result['dates_updated'] == {old} and not result['dates_not_found']
+    day = saved_day(app, old)
+    assert len(day) == len(data[old]) and day[0]['weight'] == 101.3
@@ -0,0 +1,104 @@
+"""Synchronisation de tous les onglets : téléchargements en parallèle, une seule sauvegarde"""
+import copy
+
+import pytest
+import streamlit as st
+
+from helpers import make_season, set_session
+
+
+@pytest.fixture
+def saves(app, monkeypatch):
+    """Sauvegardes effectuées (nombre d'enregistrements), sans envoi cloud"""
+    calls = []
+    save_changes = app.save_changes
+
+    def counting(records, cloud=True):
+        calls.append(len(records))
+        return save_changes(records, cloud=False)
+    monkeypatch.setattr(app, 'save_changes', counting)
+    return calls
+
+
+def season_session(app):
+    """Deux mois de données, sauvegardés localement"""
+    players, data = make_season(60)
+    set_session(players, data)
+    app.write_snapshot()
+    return players, data
+
+
+def sequential_import(app):
+    """Les trois imports un par un, avec les mêmes sélections que la synchronisation"""
+    df = app.read_sheet_csv('doc', "Suivi BE")
+    dates = [d['date'] for d in app.process_suivi_be_data(df)['available_dates']]
+    assert app.process_suivi_be_data(df, selected_dates=dates[-app.SYNC_RECENT_DATES:])['success']
+    assert app.process_imported_data(app.read_sheet_csv('doc', "Bien-être"))['success']
+    df = app.read_sheet_csv('doc', "Suivi Poids")
+    available = app.process_suivi_poids_data(df)['available_dates']
+    selected = [d['date'] for d in available if d['date'] in st.session_state.data][-app.SYNC_RECENT_DATES:]
+    assert app.process_suivi_poids_data(df, selected_dates=selected)['success']
+    return copy.deepcopy(dict(st.session_state.data)), [p['name'] for p in st.session_state.players]
+
+
+def test_sync_matches_sequential_imports(app, sheets, saves):
+    season_session(app)
+    expected = sequential_import(app)
+    assert len(saves) == 3
+
+    season_session(app)
+    saves.clear()
+    sheets.requests.clear()
+    sheets.max_in_flight = 0
+    summary = app.sync_all_tabs('doc')
+
+    assert all(result['success'] for result in summary.values()), summary
+    assert (dict(st.session_state.data), [p['name'] for p in st.session_state.players]) == expected
+    assert len(saves) == 1
+    # Trois onglets téléchargés en même temps
+    assert len(sheets.requests) == 3
+    assert sheets.max_in_flight == 3
+    assert app.complete_data(app.read_local_state()['data']) == expected[0]
+
+
+def test_failing_tab_does_not_block_the_others(app, sheets, saves):
+    _, data = season_session(app)
+
+    summary = app.sync_all_tabs('doc', (('suivi_be', "Absent"), ('daily', "Bien-être"), ('suivi_poids', "Suivi Poids")))
+
+    assert not summary['suivi_be']['success'] and '404' in summary['suivi_be']['error']
+    assert summary['daily']['success'] and summary['suivi_poids']['success']
+    assert '2025-08-30' in st.session_state.data and '2025-08-30' not in data
+    assert len(saves) == 1
+
+
+def test_weights_read_only_for_recent_dates(app, sheets):
+    _, data = season_session(app)
+
+    parsed = app.fetch_import_tab('doc', 'suivi_poids', "Suivi Poids", known_dates=frozenset(data))
+
+    # 7 dernières dates connues, plus celles que les autres onglets peuvent ajouter
+    recent = [f'2025-08-{day}' for day in range(23, 30)]
+    assert parsed['window'] == recent + ['2025-08-30']
+    assert len(parsed['dates']) == 30
+    assert {d for _, weights in parsed['rows'] for d, _ in weights} == set(parsed['window'])
+
+
+def test_failed_apply_leaves_session_untouched(app, sheets, saves, monkeypatch):
+    players, data = season_session(app)
+    session_data = st.session_state.data
+    settings = copy.deepcopy(dict(st.session_state.settings))
+
+    def fail(parsed, selected_dates):
+        raise ValueError("poids illisible")
+    monkeypatch.setattr(app, 'apply_suivi_poids', fail)
+
+    summary = app.sync_all_tabs('doc')
+
+    assert set(summary) == {'suivi_be', 'daily', 'suivi_poids'}
+    assert all(not result['success'] and 'poids illisible' in result['error'] for result in summary.values())
+    assert st.session_state.data is session_data and dict(st.session_state.data) == data
+    assert [p['name'] for p in st.session_state.players] == [p['name'] for p in players]
+    assert dict(st.session_state.settings) == settings
+    assert not saves
+    assert app.get_store().source is session_data
@@ -0,0 +1,56 @@
+"""Import incrémental "Suivi BE" : repère par onglet, dates archivées, taille du repère"""
+import os
+from datetime import date
+
+import pandas as pd
+import streamlit as st
+
+from helpers import make_season
+
+SHEET = "Suivi BE"
+
+
+def suivi_be():
+    return pd.read_csv(os.path.join(os.path.dirname(__file__), 'fixtures', 'suivi_be.csv'), header=None)
+
+
+def block_dates(app, df):
+    return list(dict.fromkeys(d['date'] for d in app.process_suivi_be_data(df)['available_dates']))
+
+
+def reload_session(app):
+    """Session relue depuis le disque : saisons anciennes archivées, paramètres conservés"""
+    state = app.read_local_state()
+    st.session_state.players = state['players']
+    st.session_state.data = state['data']
+
+
+def test_unchanged_blocks_of_archived_dates_are_skipped(app):
+    # Données jusqu'à fin 2026 : la saison 2025-2026 des blocs importés sera archivée
+    players, data = make_season(500, start=date(2025, 8, 20))
+    app.write_state_file({'players': players, 'data': data, 'injuries': [], 'settings': {}})
+    reload_session(app)
+    df = suivi_be()
+    dates = block_dates(app, df)[-7:]
+    assert all(app.season_of(d) in st.session_state.data.archived for d in dates)
+
+    first = app.process_suivi_be_data(df, selected_dates=dates, sheet_name=SHEET)
+    app.write_snapshot()
+    reload_session(app)
+    assert not set(dates) & set(st.session_state.data)
+    second = app.process_suivi_be_data(df, selected_dates=dates, sheet_name=SHEET)
+
+    assert first['success'] and first['skipped'] == 0
+    assert second['success'] and second['skipped'] == len(dates) and not second['dates_imported']
+
+
+def test_watermark_keeps_only_the_scanned_range(app):
+    df = suivi_be()
+    dates = block_dates(app, df)
+
+    for end in range(7, len(dates) + 1):
+        assert app.process_suivi_be_data(df, selected_dates=dates[end - 7:end], sheet_name=SHEET)['success']
+
+    watermark = app.get_import_watermark(SHEET)
+    assert sorted(watermark['blocks']) == dates[-7:]
+    assert watermark['last_date'] == max(d for d, m in watermark['blocks'].items() if m['entries'])
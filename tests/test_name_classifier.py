@@ -0,0 +1,122 @@
+"""NameClassifier : même résultat que l'ancien filtrage ligne par ligne des imports, en plus rapide"""
+import os
+import random
+import time
+
+import pandas as pd
+import pytest
+
+# Ancien filtrage des noms (process_suivi_be_data / process_imported_data), repris tel quel
+REMARK_PATTERNS = [
+    'douleur', 'courbature', 'fatigue', 'crampe', 'blessure',
+    'contracture', 'entorse', 'foulure', 'claquage', 'déchir',
+    'inflamm', 'tendinite', 'élongation', 'lésion', 'lesion',
+    'genou droit', 'genou gauche', 'cheville', 'épaule', 'mollet',
+    'ischio', 'cuisse', 'adducteur', 'quadri', 'dos bloqué',
+    'kyste', 'hernie', 'pubis', 'lombes', 'lombaire',
+    'pas en forme', 'fatigué', 'malade', 'grippé', 'épuisé',
+    'mieux', 'soucis', 'souci', 'problème', 'probleme',
+    'rien à signaler', 'tout va bien', 'en forme', 'récupération',
+    'au repos', 'absent', 'indisponible',
+    'ce matin', 'cette nuit', 'hier soir', 'depuis', 'toujours',
+    'encore', 'gêné', 'gene',
+    'mal au', 'mal à la', 'mal aux', 'douleur au', 'gêne au',
+    'sensation de', 'léger problème', 'petit souci'
+]
+
+
+def is_valid_player_name(text):
+    upper_chars = sum(1 for c in text if c.isupper())
+    alpha_chars = sum(1 for c in text if c.isalpha())
+    if alpha_chars == 0:
+        return False
+    uppercase_ratio = upper_chars / alpha_chars
+    return (
+        (uppercase_ratio >= 0.8 or text.isupper()) and
+        len(text) <= 25 and
+        text.count(' ') <= 2
+    )
+
+
+def reference_row(name, skip_upper, skip_lower):
+    """(statut, mot-clé) d'une cellule selon l'ancienne chaîne de tests"""
+    if name is None or pd.isna(name):
+        return 'empty', None
+    name = str(name).strip()
+    if not name or len(name) < 2:
+        return 'empty', None
+    if name.upper() in skip_upper:
+        return 'team', None
+    if name.lower() in skip_lower:
+        return 'header', None
+    name_lower = name.lower()
+    if not is_valid_player_name(name):
+        return 'invalid', None
+    if any(pattern in name_lower for pattern in REMARK_PATTERNS):
+        return 'remark', [p for p in REMARK_PATTERNS if p in name_lower][0]
+    return 'player', None
+
+
+NAMES = [f'JOUEUR {chr(65 + i)}{chr(65 + j)}' for i in range(6) for j in range(8)] + \
+    ['DUPONT', 'LE ROUX', 'JEAN-PIERRE M', 'ÉRIC DURAND', 'McDONALD', 'JEAN #1']
+NOISE = ['EQUIPE', 'équipe', 'Équipe', 'TOTAL', 'Moyenne', 'AVERAGE', 'Team', 'Joueur', 'NOM', 'player', 'nan', 'None',
+         'X', '', '   ', '123', '  AB  ', 'dupont', 'Mieux ce matin', 'douleur genou droit', 'KYSTE AU GENOU',
+         'KYSTE DOULEUR AU GENOU', 'MAL AU DOS', 'MAL AUX GENOUX', 'DOULEUR AU DOS', 'GÊNE AU DOS', 'ENCORE GÊNÉ',
+         'GENE AU MOLLET', 'SOUCIS', 'DéCHIRURE', 'ÉPAULE', 'TRES LONG NOM DE JOUEUR QUI DEPASSE', 'A B C D',
+         3.5, 12, float('nan'), None]
+
+
+def column(size, seed=0):
+    rnd = random.Random(seed)
+    return [rnd.choice(NAMES + NOISE) for _ in range(size)]
+
+
+@pytest.mark.parametrize('classifier', ['SUIVI_BE_NAMES', 'IMPORT_NAMES'])
+def test_same_result_as_row_by_row_filter(app, classifier):
+    names = getattr(app, classifier)
+    assert list(names.patterns) == REMARK_PATTERNS
+    cells = NAMES + NOISE + column(2000)
+
+    result = names.classify(pd.Series(cells, dtype=object))
+
+    expected = [reference_row(n, names.skip_upper, names.skip_lower) for n in cells]
+    assert list(zip(result['status'], result['pattern'])) == expected
+    assert [n for n, s in zip(result['name'], result['status']) if s == 'player'] == \
+        [str(n).strip() for n, (s, _) in zip(cells, expected) if s == 'player']
+
+
+def test_index_and_empty_columns(app):
+    names = app.IMPORT_NAMES
+    series = pd.Series(column(50), index=range(100, 150), dtype=object)
+    assert list(names.classify(series).index) == list(range(100, 150))
+    assert names.classify([]).shape == (0, 3)
+    assert names.classify(pd.Series([None, None])).status.tolist() == ['empty', 'empty']
+
+
+@pytest.mark.benchmark
+def test_faster_than_row_by_row_filter(app):
+    names = app.IMPORT_NAMES
+    cells = column(20000, seed=1)
+
+    def best(run):
+        times = []
+        for _ in range(3):
+            start = time.perf_counter()
+            run()
+            times.append(time.perf_counter() - start)
+        return min(times)
+
+    per_row = best(lambda: [reference_row(n, names.skip_upper, names.skip_lower) for n in cells])
+    classified = best(lambda: names.classify(pd.Series(cells, dtype=object)))
+    assert classified < per_row, f"classify {classified * 1000:.0f} ms, ligne par ligne {per_row * 1000:.0f} ms"
+
+
+def test_debug_reports_matched_remark_pattern(app, monkeypatch):
+    df = pd.read_csv(os.path.join(os.path.dirname(__file__), 'fixtures', 'bien_etre.csv'), header=None)
+    df.loc[len(df)] = ['MAL AU DOS', 3, 3, 3, 3, 3, 3, None, None]
+    written = []
+    monkeypatch.setattr(app.st, 'write', lambda *args, **kwargs: written.extend(args))
+
+    assert app.parse_imported_data(df, debug=True)['success']
+
+    assert f"Ligne {len(df) - 1}: 'MAL AU DOS' (pattern remarque: 'mal au')" in written
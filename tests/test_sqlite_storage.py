@@ -0,0 +1,95 @@
+"""Stockage local SQLite : bascule depuis/vers JSON, enregistrements du journal en lignes, index"""
+import copy
+import os
+from datetime import date
+
+import pytest
+import streamlit as st
+
+from helpers import make_season, set_session
+
+INJURIES = [{'id': 'i_1', 'playerId': 'p_1', 'status': 'Active', 'zone': 'Genou'},
+            {'id': 'i_2', 'playerId': 'p_2', 'status': 'Guérie', 'zone': 'Épaule'}]
+
+
+def base_state():
+    players, data = make_season(30)
+    return {'players': players, 'data': data, 'injuries': copy.deepcopy(INJURIES), 'settings': {'team_name': 'Base'}}
+
+
+def records(state):
+    first, last = sorted(state['data'])[0], sorted(state['data'])[-1]
+    return [
+        {'op': 'day', 'date': first, 'entries': [{'name': 'JOUEUR 3', 'sleep': 1.0}]},
+        {'op': 'day', 'date': last, 'entries': []},
+        {'op': 'day', 'date': '2030-01-01', 'entries': [{'name': 'JOUEUR 4', 'motivation': 2.0}]},
+        {'op': 'player', 'player': {**state['players'][2], 'status': 'Blessé'}},
+        {'op': 'player', 'player': {'id': 'p_new', 'name': 'NOUVEAU', 'position': 'Centre', 'status': 'Apte'}},
+        {'op': 'player_delete', 'id': 'p_5', 'name': 'JOUEUR 5'},
+        {'op': 'injury', 'injury': {**INJURIES[0], 'status': 'Guérie'}},
+        {'op': 'injury', 'injury': {'id': 'i_3', 'playerId': 'p_3', 'status': 'Active'}},
+        {'op': 'settings', 'settings': {'team_name': 'Après'}},
+    ]
+
+
+def test_apply_records_matches_journal_replay(app):
+    state = base_state()
+    storage = app.SqliteStorage()
+    storage.write_state(state, 'avant')
+    changes = records(state)
+
+    storage.apply_records(changes, 'après')
+
+    expected = copy.deepcopy(state)
+    for record in changes:
+        app.apply_journal_record(expected, record)
+    saved = storage.read_state()
+    assert saved.pop('saved_at') == 'après'
+    assert saved == expected
+    assert storage.counts() == {'players': len(expected['players']), 'injuries': 3,
+                                'entries': sum(len(e) for e in expected['data'].values())}
+
+
+@pytest.mark.parametrize('statement, index', [
+    ("UPDATE players SET status = 'x' WHERE pos = (SELECT MIN(pos) FROM players WHERE id = 'p_1')", 'idx_players_id'),
+    ("DELETE FROM players WHERE id = 'p_1'", 'idx_players_id'),
+    ("DELETE FROM entries WHERE name = 'JOUEUR 1'", 'idx_entries_player'),
+    ("DELETE FROM entries WHERE date = '2025-07-01'", 'PRIMARY KEY'),
+    ("UPDATE injuries SET status = 'x' WHERE pos = (SELECT MIN(pos) FROM injuries WHERE id = 'i_1')", 'idx_injuries_id'),
+])
+def test_row_updates_use_an_index(app, statement, index):
+    storage = app.SqliteStorage()
+    storage.write_state(base_state(), 'avant')
+    conn = storage.connect()
+    try:
+        plan = ' '.join(row[-1] for row in conn.execute("EXPLAIN QUERY PLAN " + statement))
+    finally:
+        conn.close()
+    assert index in plan and 'SCAN' not in plan.replace('SCAN CONSTANT ROW', ''), plan
+
+
+def test_migration_round_trip(app):
+    # Deux saisons dont une archivée, plus une modification encore dans le journal
+    players, data = make_season(500, start=date(2024, 7, 1))
+    app.write_state_file({'players': players, 'data': data, 'injuries': [], 'settings': {}})
+    state = app.read_local_state()
+    set_session(state['players'], state['data'])
+    last = max(data)
+    st.session_state.data[last] = st.session_state.data[last][:2]
+    app.save_changes([app.day_record(last)], cloud=False)
+    assert os.path.exists(app.JOURNAL_FILE)
+    expected = {**data, last: data[last][:2]}
+
+    app.migrate_local_storage(True)
+
+    assert app.use_sqlite() and not os.path.exists(app.JOURNAL_FILE)
+    assert app.read_local_state()['data'] == expected
+    # Le fichier JSON, conservé en sauvegarde, contient aussi la modification du journal
+    os.rename(app.DB_FILE, app.DB_FILE + '.off')
+    assert app.complete_data(app.read_local_state()['data']) == expected
+    os.rename(app.DB_FILE + '.off', app.DB_FILE)
+
+    app.migrate_local_storage(False)
+
+    assert not app.use_sqlite()
+    assert app.complete_data(app.read_local_state()['data']) == expected